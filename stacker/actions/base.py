@@ -2,13 +2,20 @@ import os
 import sys
 import logging
 import threading
+from collections import OrderedDict
 
-from ..dag import walk, ThreadedWalker, UnlimitedSemaphore
+from ..dag import walk, critical_path, ThreadedWalker, UnlimitedSemaphore
+from ..dag.aio import AsyncWalker
+from ..providers.aws.adaptive import AdaptiveConcurrency
 from ..plan import Step, build_plan, build_graph
 
 import botocore.exceptions
-from stacker.session_cache import get_session
+from stacker.session_cache import get_session, set_max_pool_connections
 from stacker.exceptions import PlanFailed
+from stacker.variables import (
+    has_batched_lookups,
+    resolve_lookups_in_batches,
+)
 
 from ..status import (
     COMPLETE
@@ -31,7 +38,8 @@ logger = logging.getLogger(__name__)
 STACK_POLL_TIME = int(os.environ.get("STACKER_STACK_POLL_TIME", 30))
 
 
-def build_walker(concurrency):
+def build_walker(concurrency, wait_concurrency=0, priorities=None,
+                 groups=None, group_limits=None):
     """This will return a function suitable for passing to
     :class:`stacker.plan.Plan` for walking the graph.
 
@@ -42,7 +50,23 @@ def build_walker(concurrency):
     fast as the graph topology allows.
 
     If concurrency is greater than 1, it will return a walker that will only
-    execute a maximum of concurrency steps at any given time.
+    execute a maximum of concurrency steps at any given time. Steps that have
+    been submitted, and are only waiting on CloudFormation, don't count
+    towards this limit; they're limited by wait_concurrency instead.
+
+    Args:
+        concurrency (int): the maximum number of steps actively doing work
+            (resolving, rendering, uploading and submitting) at once.
+        wait_concurrency (int, optional): the maximum number of submitted
+            steps waiting on CloudFormation at once. 0 means unlimited.
+        priorities (dict, optional): a mapping of step names to priorities
+            that override the default order ready steps are started in. Steps
+            with higher priorities start first, and steps with the same
+            priority start in :func:`stacker.dag.critical_path` order.
+        groups (dict, optional): a mapping of step names to the limit groups
+            they belong to (see :func:`stack_groups`).
+        group_limits (dict, optional): a mapping of limit groups to the
+            maximum number of their steps actively doing work at once.
 
     Returns:
         func: returns a function to walk a :class:`stacker.dag.DAG`.
@@ -54,7 +78,103 @@ def build_walker(concurrency):
     if concurrency > 1:
         semaphore = threading.Semaphore(concurrency)
 
-    return ThreadedWalker(semaphore).walk
+    wait_semaphore = UnlimitedSemaphore()
+    if wait_concurrency > 0:
+        wait_semaphore = threading.Semaphore(wait_concurrency)
+
+    return ThreadedWalker(
+        semaphore, wait_semaphore=wait_semaphore,
+        priority=_priority(priorities),
+        groups=groups, group_limits=group_limits).walk
+
+
+def build_async_walker(concurrency, wait_concurrency=0, priorities=None,
+                       groups=None, group_limits=None, poll_time=0,
+                       cancel=None):
+    """Like :func:`build_walker`, but returns a walker that runs the steps on
+    an asyncio event loop (see :class:`stacker.dag.aio.AsyncWalker`).
+
+    Args:
+        concurrency (int): the maximum number of steps actively doing work at
+            once. 0 means unlimited.
+        wait_concurrency (int, optional): the maximum number of submitted
+            steps waiting on CloudFormation at once. 0 means unlimited.
+        priorities (dict, optional): see :func:`build_walker`.
+        groups (dict, optional): see :func:`build_walker`.
+        group_limits (dict, optional): see :func:`build_walker`.
+        poll_time (int, optional): how long steps wait between polls.
+        cancel (threading.Event, optional): cuts waits short once set.
+
+    Returns:
+        func: returns a coroutine function to walk a
+            :class:`stacker.dag.DAG`.
+    """
+    return AsyncWalker(
+        concurrency, wait_concurrency, priority=_priority(priorities),
+        poll_time=poll_time, cancel=cancel,
+        groups=groups, group_limits=group_limits).walk
+
+
+def _priority(priorities):
+    priorities = priorities or {}
+
+    def priority(dag):
+        path = critical_path(dag)
+        return {node: (priorities.get(node, 0), path[node]) for node in path}
+
+    return priority
+
+
+def stack_priorities(stacks):
+    """Returns the priorities configured for each of the given stacks, for
+    :func:`build_walker`. Targets don't have a priority."""
+    priorities = {}
+    for stack in stacks:
+        priority = getattr(stack, "priority", None)
+        if priority is not None:
+            priorities[stack.name] = priority
+    return priorities
+
+
+def stack_groups(stacks, max_per_region=None, max_per_profile=None,
+                 default_region=None):
+    """Returns the limit groups of each of the given stacks, and the limit of
+    each group, for :func:`build_walker`.
+
+    Each stack belongs to a group for its region, and one for its profile.
+    Targets don't belong to any groups.
+
+    Args:
+        stacks (list): the :class:`stacker.stack.Stack` objects to group.
+        max_per_region (int, optional): the limit of each region's group, or
+            a function that takes a region and returns the limit (or a
+            semaphore to share) for its group.
+        max_per_profile (int, optional): the limit of each profile's group.
+        default_region (str, optional): the region of stacks that don't set
+            one.
+
+    Returns:
+        tuple: a dict of step names to groups, and a dict of groups to limits.
+    """
+    groups = {}
+    group_limits = {}
+    for stack in stacks:
+        if not hasattr(stack, "region"):
+            continue
+        groups[stack.name] = []
+        if max_per_region:
+            region = stack.region or default_region
+            group = ("region", region)
+            if group not in group_limits:
+                group_limits[group] = max_per_region
+                if callable(max_per_region):
+                    group_limits[group] = max_per_region(region)
+            groups[stack.name].append(group)
+        if max_per_profile:
+            group = ("profile", stack.profile)
+            group_limits[group] = max_per_profile
+            groups[stack.name].append(group)
+    return groups, group_limits
 
 
 def plan(description, stack_action, context,
@@ -126,6 +246,107 @@ def stack_template_url(bucket_name, blueprint, endpoint):
     return "%s/%s/%s" % (endpoint, bucket_name, key_name)
 
 
+def _may_change(stack):
+    """Returns False for stacks that are disabled, or locked and not forced,
+    which are never resolved when they exist, so their lookups are left for
+    them to resolve on their own if they need to."""
+    if not getattr(stack, "enabled", True):
+        return False
+    if getattr(stack, "locked", False):
+        return bool(getattr(stack, "force", False))
+    return True
+
+
+class LookupBatches(object):
+    """Resolves the lookups of stacks in batches as a plan is executed (see
+    :func:`stacker.variables.resolve_lookups_in_batches`).
+
+    When a stack is about to be launched, the lookups of every stack whose
+    dependencies are done are resolved along with its own, rather than the
+    lookups of each stack being looked up when it's launched. Lookups are
+    never looked up before the stacks that their stack requires are done,
+    since those stacks may change what they'd look up.
+
+    Args:
+        plan (:class:`stacker.plan.Plan`): the plan being executed.
+        context (:class:`stacker.context.Context`): stacker context
+        provider_for (func): returns the provider to look up a stack's
+            lookups with.
+    """
+
+    def __init__(self, plan, context, provider_for):
+        self.graph = plan.graph
+        self.context = context
+        self.provider_for = provider_for
+        # Only held while claiming stacks, never while looking anything up,
+        # so that stacks without batched lookups are never held up.
+        self.lock = threading.Lock()
+        # Only stacks with lookups that can be batched need to be batched.
+        self.pending = OrderedDict()
+        for step in plan.steps:
+            if not _may_change(step.stack):
+                continue
+            variables = getattr(step.stack, "variables", None)
+            if variables and has_batched_lookups(variables):
+                self.pending[step.name] = step
+        # Maps the names of the stacks in batches that are being looked up
+        # to an event that's set once their batch is done.
+        self.in_flight = {}
+
+    def resolve(self, stack):
+        """Resolves the lookups that can be batched of a stack that's about
+        to be launched, and of every other stack that's ready to be.
+
+        If the stack has already been claimed by another thread's batch, this
+        waits for that batch to be done instead.
+        """
+        with self.lock:
+            if stack.name in self.pending:
+                stacks = self._claim(stack)
+                done = threading.Event()
+                for ready in stacks:
+                    self.in_flight[ready.name] = done
+            else:
+                stacks = None
+                done = self.in_flight.get(stack.name)
+
+        if stacks is None:
+            if done is not None:
+                done.wait()
+            return
+
+        try:
+            self._resolve(stacks)
+        finally:
+            with self.lock:
+                for ready in stacks:
+                    del self.in_flight[ready.name]
+            done.set()
+
+    def _claim(self, stack):
+        """Takes the stack, and every other pending stack that's ready, off
+        of the pending stacks. Called with the lock held."""
+        del self.pending[stack.name]
+        stacks = [stack]
+        for name, step in list(self.pending.items()):
+            if all(dep.done for dep in self.graph.downstream(name)):
+                del self.pending[name]
+                stacks.append(step.stack)
+        return stacks
+
+    def _resolve(self, stacks):
+        by_provider = OrderedDict()
+        for ready in stacks:
+            provider = self.provider_for(ready)
+            by_provider.setdefault(id(provider), (provider, []))
+            by_provider[id(provider)][1].extend(ready.variables)
+        for provider, variables in by_provider.values():
+            resolved = resolve_lookups_in_batches(
+                variables, self.context, provider)
+            logger.debug("Resolved %d lookups of %d stacks in batches",
+                         resolved, len(stacks))
+
+
 class BaseAction(object):
 
     """Actions perform the actual work of each Command.
@@ -147,10 +368,94 @@ class BaseAction(object):
         self.provider_builder = provider_builder
         self.bucket_name = context.bucket_name
         self.cancel = cancel or threading.Event()
+        # How long stack actions wait before polling a stack again.
+        self.poll_time = STACK_POLL_TIME
+        # The adaptive concurrency controller, when the plan is executed with
+        # adaptive concurrency.
+        self.adaptive = None
+        # Resolves the lookups of stacks in batches, when the plan is being
+        # executed.
+        self.lookup_batches = None
         self.bucket_region = context.config.stacker_bucket_region
         if not self.bucket_region and provider_builder:
             self.bucket_region = provider_builder.region
-        self.s3_conn = get_session(self.bucket_region).client('s3')
+        self._s3_conn = None
+
+    @property
+    def s3_conn(self):
+        """The S3 client for the stacker bucket. It's only created when it's
+        first used, so actions that don't upload templates (e.g. graph, or
+        build with --outline or --dump) never need AWS credentials."""
+        if self._s3_conn is None:
+            self._s3_conn = get_session(self.bucket_region).client('s3')
+        return self._s3_conn
+
+    @s3_conn.setter
+    def s3_conn(self, value):
+        self._s3_conn = value
+
+    def _build_walker(self, plan, concurrency, wait_concurrency=0,
+                      engine="threads", adaptive=False):
+        """Returns a walker to execute the plan with.
+
+        Args:
+            plan (:class:`stacker.plan.Plan`): the plan to be executed.
+            concurrency (int): see :func:`build_walker`.
+            wait_concurrency (int, optional): see :func:`build_walker`.
+            engine (str, optional): either "threads" to run each step in a
+                thread, or "asyncio" to run every step on an event loop.
+            adaptive (bool, optional): if True, the number of steps worked on
+                at once in each region is adjusted based on how CloudFormation
+                is responding (see :mod:`stacker.providers.aws.adaptive`).
+        """
+        stacks = [step.stack for step in plan.steps]
+        priorities = stack_priorities(stacks)
+        config = self.context.config
+        max_per_region = config.max_parallel_per_region
+        if adaptive:
+            self.adaptive = AdaptiveConcurrency(maximum=max_per_region)
+            self.provider_builder.watch(self.adaptive)
+
+            def max_per_region(region):
+                return self.adaptive.limit(region).semaphore
+
+        groups, group_limits = stack_groups(
+            stacks,
+            max_per_region=max_per_region,
+            max_per_profile=config.max_parallel_per_profile,
+            default_region=getattr(self.provider_builder, "region", None))
+        if engine == "asyncio":
+            walker = build_async_walker(
+                concurrency, wait_concurrency, priorities,
+                groups=groups, group_limits=group_limits,
+                poll_time=self.poll_time, cancel=self.cancel)
+            # The walker waits between polls on the event loop, so the stack
+            # actions don't need to.
+            self.poll_time = 0
+            return walker
+        return build_walker(concurrency, wait_concurrency, priorities,
+                            groups=groups, group_limits=group_limits)
+
+    def _prefetch_stacks(self, plan):
+        """Looks up every stack in the plan before it's executed, with as
+        few calls as each provider allows (see
+        :meth:`stacker.providers.base.BaseProvider.prefetch_stacks`)."""
+        by_provider = OrderedDict()
+        for step in plan.steps:
+            stack = step.stack
+            if not hasattr(stack, "region"):
+                continue
+            key = (stack.region, stack.profile)
+            by_provider.setdefault(key, (stack, []))[1].append(stack.fqn)
+        for stack, stack_names in by_provider.values():
+            self.build_provider(stack).prefetch_stacks(stack_names)
+
+    def _resolve_stack(self, stack, provider):
+        """Resolves the variables of a stack, after resolving the lookups
+        that can be batched (see :class:`LookupBatches`)."""
+        if self.lookup_batches is not None:
+            self.lookup_batches.resolve(stack)
+        stack.resolve(self.context, provider)
 
     def ensure_cfn_bucket(self):
         """The CloudFormation bucket where templates will be stored."""
@@ -205,6 +510,18 @@ class BaseAction(object):
             logger.error(str(e))
             sys.exit(1)
 
+    def _size_connection_pools(self, plan, concurrency=0,
+                               wait_concurrency=0):
+        """Sizes the connection pools of AWS clients for the number of steps
+        of the plan that can use them at once.
+
+        Call this before the plan's stacks are looked up, since clients that
+        have already been created keep the size they were created with."""
+        size = len(plan.steps)
+        if concurrency > 0 and wait_concurrency > 0:
+            size = min(size, concurrency + wait_concurrency)
+        set_max_pool_connections(size)
+
     def pre_run(self, *args, **kwargs):
         pass
 
@@ -226,6 +543,6 @@ class BaseAction(object):
         hooks)."""
         return self.provider_builder.build()
 
-    def _tail_stack(self, stack, cancel, retries=0, **kwargs):
+    def _tail_stack(self, stack, **kwargs):
         provider = self.build_provider(stack)
-        return provider.tail_stack(stack, cancel, retries, **kwargs)
+        return provider.watch_stack(stack, **kwargs)
@@ -1,7 +1,6 @@
 import logging
 
-from .base import BaseAction, plan, build_walker
-from .base import STACK_POLL_TIME
+from .base import BaseAction, LookupBatches, plan
 
 from ..providers.base import Template
 from stacker.hooks import utils
@@ -255,7 +254,7 @@ class Action(BaseAction):
 
         """
         old_status = kwargs.get("status")
-        wait_time = 0 if old_status is PENDING else STACK_POLL_TIME
+        wait_time = 0 if old_status is PENDING else self.poll_time
         if self.cancel.wait(wait_time):
             return INTERRUPTED
 
@@ -265,7 +264,14 @@ class Action(BaseAction):
         provider = self.build_provider(stack)
 
         try:
-            provider_stack = provider.get_stack(stack.fqn)
+            if old_status == SUBMITTED:
+                provider_stack = provider.poll_stack(stack.fqn)
+            else:
+                # Only a step's first lookup can use the prefetched
+                # description, since a step that's waiting on the stack
+                # needs to see it change.
+                provider_stack = provider.get_stack(
+                    stack.fqn, refresh=old_status is not PENDING)
         except StackDoesNotExist:
             provider_stack = None
 
@@ -320,7 +326,7 @@ class Action(BaseAction):
                 return old_status
 
         logger.debug("Resolving stack %s", stack.fqn)
-        stack.resolve(self.context, self.provider)
+        self._resolve_stack(stack, self.provider)
 
         logger.debug("Launching stack %s now.", stack.fqn)
         template = self._template(stack.blueprint)
@@ -412,7 +418,8 @@ class Action(BaseAction):
         )
 
     def run(self, concurrency=0, outline=False,
-            tail=False, dump=False, *args, **kwargs):
+            tail=False, dump=False, wait_concurrency=0, engine="threads",
+            adaptive=False, *args, **kwargs):
         """Kicks off the build/update of the stacks in the stack_definitions.
 
         This is the main entry point for the Builder.
@@ -424,8 +431,17 @@ class Action(BaseAction):
         if not outline and not dump:
             plan.outline(logging.DEBUG)
             logger.debug("Launching stacks: %s", ", ".join(plan.keys()))
-            walker = build_walker(concurrency)
-            plan.execute(walker)
+            self._size_connection_pools(plan, concurrency, wait_concurrency)
+            self._prefetch_stacks(plan)
+            self.lookup_batches = LookupBatches(
+                plan, self.context, lambda stack: self.provider)
+            walker = self._build_walker(
+                plan, concurrency, wait_concurrency, engine, adaptive)
+            try:
+                plan.execute(walker)
+            finally:
+                if self.adaptive:
+                    self.adaptive.report()
         else:
             if outline:
                 plan.outline()
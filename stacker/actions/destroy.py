@@ -1,7 +1,6 @@
 import logging
 
-from .base import BaseAction, plan, build_walker
-from .base import STACK_POLL_TIME
+from .base import BaseAction, plan
 from ..exceptions import StackDoesNotExist
 from stacker.hooks.utils import handle_hooks
 from ..status import (
@@ -43,14 +42,17 @@ class Action(BaseAction):
 
     def _destroy_stack(self, stack, **kwargs):
         old_status = kwargs.get("status")
-        wait_time = 0 if old_status is PENDING else STACK_POLL_TIME
+        wait_time = 0 if old_status is PENDING else self.poll_time
         if self.cancel.wait(wait_time):
             return INTERRUPTED
 
         provider = self.build_provider(stack)
 
         try:
-            provider_stack = provider.get_stack(stack.fqn)
+            if old_status == SUBMITTED:
+                provider_stack = provider.poll_stack(stack.fqn)
+            else:
+                provider_stack = provider.get_stack(stack.fqn)
         except StackDoesNotExist:
             logger.debug("Stack %s does not exist.", stack.fqn)
             # Once the stack has been destroyed, it doesn't exist. If the
@@ -85,7 +87,8 @@ class Action(BaseAction):
                 provider=self.provider,
                 context=self.context)
 
-    def run(self, force, concurrency=0, tail=False, *args, **kwargs):
+    def run(self, force, concurrency=0, tail=False, wait_concurrency=0,
+            engine="threads", adaptive=False, *args, **kwargs):
         plan = self._generate_plan(tail=tail)
         if not plan.keys():
             logger.warn('WARNING: No stacks detected (error in config?)')
@@ -93,8 +96,15 @@ class Action(BaseAction):
             # need to generate a new plan to log since the outline sets the
             # steps to COMPLETE in order to log them
             plan.outline(logging.DEBUG)
-            walker = build_walker(concurrency)
-            plan.execute(walker)
+            self._size_connection_pools(plan, concurrency, wait_concurrency)
+            self._prefetch_stacks(plan)
+            walker = self._build_walker(
+                plan, concurrency, wait_concurrency, engine, adaptive)
+            try:
+                plan.execute(walker)
+            finally:
+                if self.adaptive:
+                    self.adaptive.report()
         else:
             plan.outline(message="To execute this plan, run with \"--force\" "
                                  "flag.")
@@ -1,7 +1,7 @@
 import logging
 from operator import attrgetter
 
-from .base import plan, build_walker
+from .base import LookupBatches, plan, build_walker
 from . import build
 from .. import exceptions
 from ..status import (
@@ -166,7 +166,7 @@ class Action(build.Action):
 
         tags = build.build_stack_tags(stack)
 
-        stack.resolve(self.context, provider)
+        self._resolve_stack(stack, provider)
         parameters = self.build_parameters(stack)
 
         try:
@@ -193,6 +193,10 @@ class Action(build.Action):
             logger.info("Diffing stacks: %s", ", ".join(plan.keys()))
         else:
             logger.warn('WARNING: No stacks detected (error in config?)')
+        self._size_connection_pools(plan, concurrency)
+        self._prefetch_stacks(plan)
+        self.lookup_batches = LookupBatches(
+            plan, self.context, self.build_provider)
         walker = build_walker(concurrency)
         plan.execute(walker)
 
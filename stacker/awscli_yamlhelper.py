@@ -14,7 +14,9 @@ import json
 import yaml
 from yaml.resolver import ScalarNode, SequenceNode
 
-from botocore.compat import six
+# libyaml's parser is several times faster than PyYAML's pure python one, so
+# it's used when PyYAML was built with it.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def intrinsics_multi_constructor(loader, tag_prefix, node):
@@ -33,7 +35,7 @@ def intrinsics_multi_constructor(loader, tag_prefix, node):
 
     cfntag = prefix + tag
 
-    if tag == "GetAtt" and isinstance(node.value, six.string_types):
+    if tag == "GetAtt" and isinstance(node.value, str):
         # ShortHand notation for !GetAtt accepts Resource.Attribute format
         # while the standard notation is to use an array
         # [Resource, Attribute]. Convert shorthand to standard format
@@ -54,6 +56,14 @@ def intrinsics_multi_constructor(loader, tag_prefix, node):
     return {cfntag: value}
 
 
+class CloudFormationLoader(SafeLoader):
+    """A safe YAML loader that understands the short forms of
+    CloudFormation's intrinsic functions (e.g. ``!Ref``)."""
+
+
+CloudFormationLoader.add_multi_constructor("!", intrinsics_multi_constructor)
+
+
 def yaml_dump(dict_to_dump):
     """
     Dumps the dictionary as a YAML document
@@ -71,6 +81,4 @@ def yaml_parse(yamlstr):
         # json parser.
         return json.loads(yamlstr)
     except ValueError:
-        yaml.SafeLoader.add_multi_constructor(
-            "!", intrinsics_multi_constructor)
-        return yaml.safe_load(yamlstr)
+        return yaml.load(yamlstr, Loader=CloudFormationLoader)
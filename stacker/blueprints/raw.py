@@ -5,8 +5,6 @@ import json
 import os
 import sys
 
-from jinja2 import Template
-
 from ..util import parse_cloudformation_template
 from ..exceptions import InvalidConfig, UnresolvedVariable
 from .base import Blueprint
@@ -207,6 +205,7 @@ class RawTemplateBlueprint(Blueprint):
                 with open(template_path, 'r') as template:
                     if len(os.path.splitext(template_path)) == 2 and (
                             os.path.splitext(template_path)[1] == '.j2'):
+                        from jinja2 import Template
                         self._rendered = Template(template.read()).render(
                             context=self.context,
                             mappings=self.mappings,
@@ -6,11 +6,7 @@ from .info import Info
 from .diff import Diff
 from .graph import Graph
 from .base import BaseCommand
-from ...config import render_parse_load as load_config
-from ...context import Context
-from ...providers.aws import default
 from ... import __version__
-from ... import session_cache
 
 logger = logging.getLogger(__name__)
 
@@ -21,15 +17,38 @@ class Stacker(BaseCommand):
     subcommands = (Build, Destroy, Info, Diff, Graph)
 
     def configure(self, options, **kwargs):
+        # These pull in boto3, troposphere and friends, so they're only
+        # imported once a command is actually going to run (and not for
+        # --help or --version).
+        from ...config import render_parse_load as load_config
+        from ...config.cache import (
+            CompiledConfigCache,
+            RenderCache,
+            DEFAULT_CACHE_DIR,
+        )
+        from ...context import Context
+        from ...providers.aws import default
+        from ... import session_cache
 
         session_cache.default_profile = options.profile
 
+        render_cache = config_cache = None
+        if options.cache_config:
+            render_cache = RenderCache(DEFAULT_CACHE_DIR)
+            config_cache = CompiledConfigCache(DEFAULT_CACHE_DIR)
+
         self.config = load_config(
             options.config.read(),
             environment=options.environment,
             validate=True,
+            render_cache=render_cache,
+            config_cache=config_cache,
         )
 
+        if options.cache_credentials:
+            session_cache.use_file_credential_cache(
+                self.config.stacker_cache_dir)
+
         options.provider_builder = default.ProviderBuilder(
             region=options.region,
             interactive=options.interactive,
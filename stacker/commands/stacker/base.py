@@ -18,6 +18,9 @@ SIGNAL_NAMES = {
     signal.SIGTERM: "SIGTERM",
 }
 
+# The ways stacks can be executed in parallel (see --engine).
+ENGINES = ("threads", "asyncio")
+
 
 def cancel():
     """Returns a threading.Event() that will get set when SIGTERM, or
@@ -161,6 +164,18 @@ class BaseCommand(object):
             help="The default AWS profile to use for all AWS API calls. If "
                  "not specified, the default will be according to http://bo"
                  "to3.readthedocs.io/en/latest/guide/configuration.html.")
+        parser.add_argument(
+            "--cache-credentials", action="store_true",
+            help="Cache the credentials of assumed roles on disk, under the "
+                 "stacker cache directory, so that later runs of stacker can "
+                 "use them until they expire, without assuming the roles "
+                 "(or prompting for MFA codes) again.")
+        parser.add_argument(
+            "--cache-config", action="store_true",
+            help="Cache rendered and validated configs on disk, under "
+                 "~/.stacker, so that later runs of stacker with the same "
+                 "config and environment can skip rendering, merging in "
+                 "remote configs and validating them.")
         parser.add_argument(
             "-v", "--verbose", action="count", default=0,
             help="Increase output verbosity. May be specified up to twice.")
@@ -6,8 +6,7 @@ skip executing anything against the stack.
 
 """
 
-from .base import BaseCommand, cancel
-from ...actions import build
+from .base import BaseCommand, cancel, ENGINES
 
 
 class Build(BaseCommand):
@@ -36,7 +35,27 @@ class Build(BaseCommand):
                             help="The maximum number of stacks to execute in "
                                  "parallel. If not provided, the value will "
                                  "be constrained based on the underlying "
-                                 "graph.")
+                                 "graph. Stacks that are waiting on "
+                                 "CloudFormation don't count towards this "
+                                 "limit.")
+        parser.add_argument("--max-waiting", action="store", type=int,
+                            default=0,
+                            help="The maximum number of submitted stacks to "
+                                 "wait on CloudFormation for in parallel. If "
+                                 "not provided, there is no limit.")
+        parser.add_argument("--engine", choices=ENGINES, default="threads",
+                            help="How to run stacks in parallel: a thread "
+                                 "per stack (the default), or a single "
+                                 "asyncio event loop, which scales to many "
+                                 "more stacks waiting on CloudFormation at "
+                                 "once.")
+        parser.add_argument("--adaptive-concurrency", action="store_true",
+                            help="Adjust how many stacks are worked on at "
+                                 "once in each region based on how "
+                                 "CloudFormation is responding, backing off "
+                                 "when API calls are throttled. "
+                                 "max_parallel_per_region, if set in the "
+                                 "config, is the most that's allowed.")
         parser.add_argument("-t", "--tail", action="store_true",
                             help="Tail the CloudFormation logs while working "
                                  "with stacks")
@@ -45,6 +64,8 @@ class Build(BaseCommand):
                                  "to a directory")
 
     def run(self, options, **kwargs):
+        from ...actions import build
+
         super(Build, self).run(options, **kwargs)
         action = build.Action(options.context,
                               provider_builder=options.provider_builder,
@@ -52,7 +73,10 @@ class Build(BaseCommand):
         action.execute(concurrency=options.max_parallel,
                        outline=options.outline,
                        tail=options.tail,
-                       dump=options.dump)
+                       wait_concurrency=options.max_waiting,
+                       dump=options.dump,
+                       engine=options.engine,
+                       adaptive=options.adaptive_concurrency)
 
     def get_context_kwargs(self, options, **kwargs):
         return {"stack_names": options.targets, "force_stacks": options.force}
@@ -5,8 +5,7 @@ any manual requirements they specify or output values they rely on from other
 stacks.
 
 """
-from .base import BaseCommand, cancel
-from ...actions import destroy
+from .base import BaseCommand, cancel, ENGINES
 
 
 class Destroy(BaseCommand):
@@ -30,19 +29,44 @@ class Destroy(BaseCommand):
                             help="The maximum number of stacks to execute in "
                                  "parallel. If not provided, the value will "
                                  "be constrained based on the underlying "
-                                 "graph.")
+                                 "graph. Stacks that are waiting on "
+                                 "CloudFormation don't count towards this "
+                                 "limit.")
+        parser.add_argument("--max-waiting", action="store", type=int,
+                            default=0,
+                            help="The maximum number of submitted stacks to "
+                                 "wait on CloudFormation for in parallel. If "
+                                 "not provided, there is no limit.")
+        parser.add_argument("--engine", choices=ENGINES, default="threads",
+                            help="How to run stacks in parallel: a thread "
+                                 "per stack (the default), or a single "
+                                 "asyncio event loop, which scales to many "
+                                 "more stacks waiting on CloudFormation at "
+                                 "once.")
+        parser.add_argument("--adaptive-concurrency", action="store_true",
+                            help="Adjust how many stacks are worked on at "
+                                 "once in each region based on how "
+                                 "CloudFormation is responding, backing off "
+                                 "when API calls are throttled. "
+                                 "max_parallel_per_region, if set in the "
+                                 "config, is the most that's allowed.")
         parser.add_argument("-t", "--tail", action="store_true",
                             help="Tail the CloudFormation logs while working "
                                  "with stacks")
 
     def run(self, options, **kwargs):
+        from ...actions import destroy
+
         super(Destroy, self).run(options, **kwargs)
         action = destroy.Action(options.context,
                                 provider_builder=options.provider_builder,
                                 cancel=cancel())
         action.execute(concurrency=options.max_parallel,
                        force=options.force,
-                       tail=options.tail)
+                       tail=options.tail,
+                       wait_concurrency=options.max_waiting,
+                       engine=options.engine,
+                       adaptive=options.adaptive_concurrency)
 
     def get_context_kwargs(self, options, **kwargs):
         return {"stack_names": options.targets}
@@ -5,7 +5,6 @@ Sometimes small changes can have big impacts.  Run "stacker diff" before
 """
 
 from .base import BaseCommand
-from ...actions import diff
 
 
 class Diff(BaseCommand):
@@ -27,6 +26,8 @@ class Diff(BaseCommand):
                                  "config file.")
 
     def run(self, options, **kwargs):
+        from ...actions import diff
+
         super(Diff, self).run(options, **kwargs)
         action = diff.Action(options.context,
                              provider_builder=options.provider_builder)
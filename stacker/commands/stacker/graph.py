@@ -3,7 +3,10 @@
 """
 
 from .base import BaseCommand
-from ...actions import graph
+
+# The keys of stacker.actions.graph.FORMATTERS, which isn't imported until
+# the command runs.
+FORMATS = ("dot", "json")
 
 
 class Graph(BaseCommand):
@@ -14,7 +17,7 @@ class Graph(BaseCommand):
     def add_arguments(self, parser):
         super(Graph, self).add_arguments(parser)
         parser.add_argument("-f", "--format", default="dot",
-                            choices=graph.FORMATTERS,
+                            choices=FORMATS,
                             help="The format to print the graph in.")
         parser.add_argument("--reduce", action="store_true",
                             help="When provided, this will create a "
@@ -24,6 +27,8 @@ class Graph(BaseCommand):
                                  "noisy graph, it is slower.")
 
     def run(self, options, **kwargs):
+        from ...actions import graph
+
         super(Graph, self).run(options, **kwargs)
         action = graph.Action(options.context,
                               provider_builder=options.provider_builder)
@@ -1,7 +1,6 @@
 """Gets information on the CloudFormation stacks based on the given config."""
 
 from .base import BaseCommand
-from ...actions import info
 
 
 class Info(BaseCommand):
@@ -19,6 +18,8 @@ class Info(BaseCommand):
                                  "config file.")
 
     def run(self, options, **kwargs):
+        from ...actions import info
+
         super(Info, self).run(options, **kwargs)
         action = info.Action(options.context,
                              provider_builder=options.provider_builder)
@@ -20,6 +20,7 @@ from schematics.types import (
     StringType,
     BooleanType,
     DictType,
+    IntType,
     BaseType
 )
 
@@ -27,6 +28,8 @@ import yaml
 
 from ..lookups import register_lookup_handler
 from ..util import merge_map, yaml_to_ordered_dict, SourceProcessor
+from .cache import hash_file
+from ..stack import stack_requires
 from .. import exceptions
 from ..environment import DictWithSourceType
 
@@ -35,27 +38,71 @@ from .translators import *  # NOQA
 
 logger = logging.getLogger(__name__)
 
-
-def render_parse_load(raw_config, environment=None, validate=True):
+# Variable references in configs rendered with a YAML environment. This
+# regular expression is copied from string.template to match variable
+# references identically as the simple configuration case. We've got two
+# cases of this pattern, since python 2.7 doesn't support re.fullmatch(), so
+# we have to add the end of line anchor to the inner patterns.
+_IDPATTERN = r'[_a-z][_a-z0-9]*'
+REFERENCE_EXP = re.compile(r"""
+    %(delim)s(?:
+      (?P<named>%(id)s)         |   # delimiter and a Python identifier
+      {(?P<braced>%(id)s)}         # delimiter and a braced identifier
+    )
+    """ % {'delim': re.escape('$'),
+           'id': _IDPATTERN,
+           }, re.IGNORECASE | re.VERBOSE)
+FULL_REFERENCE_EXP = re.compile(r"""
+    %(delim)s(?:
+      (?P<named>%(id)s)$         |  # delimiter and a Python identifier
+      {(?P<braced>%(id)s)}$         # delimiter and a braced identifier
+    )
+    """ % {'delim': re.escape('$'),
+           'id': _IDPATTERN,
+           }, re.IGNORECASE | re.VERBOSE)
+
+
+def render_parse_load(raw_config, environment=None, validate=True,
+                      render_cache=None, config_cache=None):
     """Encapsulates the render -> parse -> validate -> load process.
 
+    The config is parsed once, into a tree of OrderedDicts and lists that
+    the environment is substituted into and remote configs are merged into,
+    and the :class:`Config` is built from that tree.
+
     Args:
         raw_config (str): the raw stacker configuration string.
         environment (dict, optional): any environment values that should be
             passed to the config
         validate (bool): if provided, the config is validated before being
             loaded.
+        render_cache (:class:`stacker.config.cache.RenderCache`, optional):
+            if provided, rendered configs are cached in it, and rendering is
+            skipped when the same raw config and environment were rendered
+            before.
+        config_cache (:class:`stacker.config.cache.CompiledConfigCache`,
+            optional): if provided, validated configs are cached in it, and
+            validation is skipped when the same rendered config was
+            validated before.
 
     Returns:
         :class:`Config`: the parsed stacker config.
 
     """
 
-    pre_rendered = render(raw_config, environment)
+    config_dict = render_tree(raw_config, environment, render_cache)
 
-    rendered = process_remote_sources(pre_rendered, environment)
+    key = entry = None
+    if config_cache is not None:
+        key = config_cache.key(config_dict, environment)
+        entry = config_cache.get(key)
+    if entry is not None:
+        logger.debug("Using cached compiled config.")
+        config = parse_tree(entry["config"])
+        config.stack_requires = entry["requires"]
+        return load(config)
 
-    config = parse(rendered)
+    config = parse_tree(config_dict)
 
     # For backwards compatibility, if the config doesn't specify a namespace,
     # we fall back to fetching it from the environment, if provided.
@@ -72,7 +119,150 @@ def render_parse_load(raw_config, environment=None, validate=True):
     if validate:
         config.validate()
 
-    return load(config)
+    config = load(config)
+
+    # Working out what each stack requires parses its variables, which can
+    # use the lookups the config registers, so it has to be loaded first.
+    if validate and config_cache is not None:
+        _cache_compiled_config(config_cache, key, config)
+
+    return config
+
+
+def _cache_compiled_config(config_cache, key, config):
+    requires = {}
+    for stack_def in config.stacks:
+        try:
+            requires[stack_def.name] = sorted(stack_requires(stack_def))
+        except ValueError:
+            # Leave circular references to be reported when the plan is
+            # built, as they are without the cache.
+            return
+        except Exception as e:
+            # As with any other error parsing the variables of the stacks.
+            logger.debug("Not caching compiled config: %s", e)
+            return
+    config_cache.put(key, {"config": config.to_primitive(),
+                           "requires": requires})
+
+
+def render_tree(raw_config, environment=None, render_cache=None):
+    """Renders a raw config with the environment, stages its package sources
+    and merges in any remote configs.
+
+    Args:
+        raw_config (str): the raw stacker configuration string.
+        environment (DictWithSourceType, optional): any environment values that
+            should be passed to the config
+        render_cache (:class:`stacker.config.cache.RenderCache`, optional):
+            a cache of rendered configs.
+
+    Returns:
+        OrderedDict: the rendered config.
+
+    """
+    key = entry = processor = None
+    if render_cache is not None:
+        key = render_cache.key(raw_config, environment)
+        entry = render_cache.get(key)
+    if entry is not None:
+        processor = stage_package_sources(entry["sources"])
+        if _hash_configs(processor) == entry["merged"]:
+            logger.debug("Using cached rendered config.")
+            return entry["config"]
+
+    config = _render_parse(raw_config, environment)
+    sources = _package_sources(config)
+    if entry is None or entry["sources"] != sources:
+        processor = stage_package_sources(sources)
+    if processor is not None and processor.configs_to_merge:
+        config = merge_remote_configs(config, processor.configs_to_merge,
+                                      environment)
+
+    if render_cache is not None:
+        render_cache.put(key, {"sources": sources,
+                               "merged": _hash_configs(processor),
+                               "config": config})
+    return config
+
+
+def _render_parse(raw_config, environment=None):
+    """Renders a raw config, and parses it into a tree."""
+    if environment and _is_yaml(environment):
+        config = yaml_to_ordered_dict(raw_config)
+        return substitute_references(config, environment, REFERENCE_EXP,
+                                     FULL_REFERENCE_EXP)
+    return yaml_to_ordered_dict(render(raw_config, environment))
+
+
+def _is_yaml(environment):
+    # If we have a naked dict, we got here through the old non-YAML path, so
+    # we can't have a YAML config file.
+    if type(environment) == DictWithSourceType:
+        return environment.source_type == 'yaml'
+    return False
+
+
+def _package_sources(config):
+    if not config or not config.get('package_sources'):
+        return None
+    return {"package_sources": config['package_sources'],
+            "stacker_cache_dir": config.get('stacker_cache_dir')}
+
+
+def stage_package_sources(sources):
+    """Makes the package sources of a config available.
+
+    Args:
+        sources (dict): the config's package_sources and stacker_cache_dir.
+
+    Returns:
+        :class:`stacker.util.SourceProcessor`: the processor that staged the
+            sources, or None if there weren't any.
+
+    """
+    if not sources:
+        return None
+    processor = SourceProcessor(
+        sources=sources['package_sources'],
+        stacker_cache_dir=sources['stacker_cache_dir']
+    )
+    processor.get_package_sources()
+    return processor
+
+
+def _hash_configs(processor):
+    if processor is None:
+        return []
+    return [(path, hash_file(path)) for path in processor.configs_to_merge]
+
+
+def merge_remote_configs(config, paths, environment=None):
+    """Merges remote configs into a rendered config, and renders the result
+    again, since the remote configs can have environment references of
+    their own.
+
+    Args:
+        config (OrderedDict): the rendered config.
+        paths (list): the paths of the remote configs, in the order they're
+            merged in.
+        environment (dict, optional): any environment values that should be
+            passed to the config
+
+    Returns:
+        OrderedDict: the merged config.
+
+    """
+    for path in paths:
+        logger.debug("Merging in remote config \"%s\"", path)
+        with open(path) as f:
+            remote_config = yaml_to_ordered_dict(f)
+        config = merge_map(remote_config, config)
+    environment = environment or {}
+    if _is_yaml(environment):
+        return substitute_references(config, environment, REFERENCE_EXP,
+                                     FULL_REFERENCE_EXP)
+    return substitute_templates(config, environment)
 
 
 def render(raw_config, environment=None):
@@ -90,64 +280,77 @@ def render(raw_config, environment=None):
     """
     if not environment:
         environment = {}
-    # If we have a naked dict, we got here through the old non-YAML path, so
-    # we can't have a YAML config file.
-    is_yaml = False
-    if type(environment) == DictWithSourceType:
-        is_yaml = environment.source_type == 'yaml'
 
-    if is_yaml:
+    if _is_yaml(environment):
         # First, read the config as yaml
         config = yaml.safe_load(raw_config)
 
         # Next, we need to walk the yaml structure, and find all things which
-        # look like variable references. This regular expression is copied from
-        # string.template to match variable references identically as the
-        # simple configuration case below. We've got two cases of this pattern,
-        # since python 2.7 doesn't support re.fullmatch(), so we have to add
-        # the end of line anchor to the inner patterns.
-        idpattern = r'[_a-z][_a-z0-9]*'
-        pattern = r"""
-            %(delim)s(?:
-              (?P<named>%(id)s)         |   # delimiter and a Python identifier
-              {(?P<braced>%(id)s)}         # delimiter and a braced identifier
-            )
-            """ % {'delim': re.escape('$'),
-                   'id': idpattern,
-                   }
-        full_pattern = r"""
-            %(delim)s(?:
-              (?P<named>%(id)s)$         |  # delimiter and a Python identifier
-              {(?P<braced>%(id)s)}$         # delimiter and a braced identifier
-            )
-            """ % {'delim': re.escape('$'),
-                   'id': idpattern,
-                   }
-        exp = re.compile(pattern, re.IGNORECASE | re.VERBOSE)
-        full_exp = re.compile(full_pattern, re.IGNORECASE | re.VERBOSE)
-        new_config = substitute_references(config, environment, exp, full_exp)
+        # look like variable references.
+        new_config = substitute_references(config, environment, REFERENCE_EXP,
+                                           FULL_REFERENCE_EXP)
         # Now, re-encode the whole thing as YAML and return that.
         return yaml.safe_dump(new_config)
     else:
-        t = Template(raw_config)
-        buff = StringIO()
-
-        try:
-            substituted = t.substitute(environment)
-        except KeyError as e:
-            raise exceptions.MissingEnvironment(e.args[0])
-        except ValueError:
-            # Support "invalid" placeholders for lookup placeholders.
-            substituted = t.safe_substitute(environment)
+        substituted = _substitute_template(raw_config, environment)
 
         if not isinstance(substituted, str):
             substituted = substituted.decode('utf-8')
 
+        buff = StringIO()
         buff.write(substituted)
         buff.seek(0)
         return buff.read()
 
 
+def _substitute_template(value, environment):
+    t = Template(value)
+    try:
+        return t.substitute(environment)
+    except KeyError as e:
+        raise exceptions.MissingEnvironment(e.args[0])
+    except ValueError:
+        # Support "invalid" placeholders for lookup placeholders.
+        return t.safe_substitute(environment)
+
+
+def substitute_templates(root, environment):
+    """Substitutes a simple (non-YAML) environment into every string in a
+    parsed config, keys included, as :func:`render` does for a raw config.
+
+    The config is treated as a single template: the strings are substituted
+    in the order they'd appear in the config's text, and if any of them has
+    an "invalid" placeholder (e.g. a lookup), variables missing from the
+    environment are left in place everywhere rather than raising
+    :class:`stacker.exceptions.MissingEnvironment`.
+    """
+    try:
+        return _substitute_templates(root, environment, strict=True)
+    except ValueError:
+        # Support "invalid" placeholders for lookup placeholders.
+        return _substitute_templates(root, environment, strict=False)
+
+
+def _substitute_templates(root, environment, strict):
+    if isinstance(root, list):
+        return [_substitute_templates(x, environment, strict) for x in root]
+    elif isinstance(root, dict):
+        result = type(root)()
+        for k, v in root.items():
+            k = _substitute_templates(k, environment, strict)
+            result[k] = _substitute_templates(v, environment, strict)
+        return result
+    elif isinstance(root, str):
+        t = Template(root)
+        if not strict:
+            return t.safe_substitute(environment)
+        try:
+            return t.substitute(environment)
+        except KeyError as e:
+            raise exceptions.MissingEnvironment(e.args[0])
+    return root
+
+
 def substitute_references(root, environment, exp, full_exp):
     # We need to check for something being a string in both python 2.7 and
     # 3+. The aliases in the future package don't work for yaml sourced
@@ -164,7 +367,7 @@ def substitute_references(root, environment, exp, full_exp):
             result.append(substitute_references(x, environment, exp, full_exp))
         return result
     elif isinstance(root, dict):
-        result = {}
+        result = type(root)()
         for k, v in root.items():
             result[k] = substitute_references(v, environment, exp, full_exp)
         return result
@@ -225,11 +428,24 @@ def parse(raw_config):
 
     """
 
+    return parse_tree(yaml_to_ordered_dict(raw_config))
+
+
+def parse_tree(config_dict):
+    """Builds a stacker config from a parsed (and rendered) config.
+
+    Args:
+        config_dict (dict): the parsed stacker configuration.
+
+    Returns:
+        :class:`Config`: the parsed stacker config.
+
+    """
+
     # Convert any applicable dictionaries back into lists
     # This is necessary due to the move from lists for these top level config
     # values to either lists or OrderedDicts.
     # Eventually we should probably just make them OrderedDicts only.
-    config_dict = yaml_to_ordered_dict(raw_config)
     if config_dict:
         for top_level_key in ['stacks', 'pre_build', 'post_build',
                               'pre_destroy', 'post_destroy']:
@@ -436,6 +652,8 @@ class Stack(Model):
 
     in_progress_behavior = StringType(serialize_when_none=False)
 
+    priority = IntType(serialize_when_none=False)
+
     notification_arns = ListType(
         StringType, serialize_when_none=False, default=[])
 
@@ -515,6 +733,10 @@ class Config(Model):
 
     service_role = StringType(serialize_when_none=False)
 
+    max_parallel_per_region = IntType(serialize_when_none=False)
+
+    max_parallel_per_profile = IntType(serialize_when_none=False)
+
     pre_build = ListType(ModelType(Hook), serialize_when_none=False)
 
     post_build = ListType(ModelType(Hook), serialize_when_none=False)
@@ -540,6 +762,12 @@ class Config(Model):
 
     log_formats = DictType(StringType, serialize_when_none=False)
 
+    # A mapping of stack names to the names of the stacks they require, when
+    # it was loaded along with a compiled config (see
+    # stacker.config.cache.CompiledConfigCache). It isn't part of the config
+    # itself.
+    stack_requires = None
+
     def _remove_excess_keys(self, data):
         excess_keys = set(data.keys())
         excess_keys -= self._schema.valid_input_keys
@@ -0,0 +1,140 @@
+"""On disk caches of the work done to load a stacker config."""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+
+from .. import __version__
+
+logger = logging.getLogger(__name__)
+
+# Where rendered configs are cached. The cache is read before a config is
+# rendered, so it can't be under the config's stacker_cache_dir.
+DEFAULT_CACHE_DIR = os.path.expanduser(os.path.join("~", ".stacker",
+                                                    "configs"))
+
+
+def hash_file(path):
+    """Returns the sha256 hex digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PickleCache(object):
+    """A directory of pickled entries, keyed by hashes of their inputs.
+
+    Cached configs can include values from the environment, so the
+    directory and its files are only accessible by their owner.
+
+    Args:
+        path (str): the directory to keep the cache in.
+    """
+
+    # Prepended to the names of the files of entries, so that caches can
+    # share a directory.
+    prefix = ""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _hash(self, *inputs):
+        try:
+            content = json.dumps([__version__] + list(inputs),
+                                 sort_keys=True, default=repr)
+        except TypeError:
+            return None
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, self.prefix + key + ".pickle")
+
+    def get(self, key):
+        """Returns the entry for the given key, or None if there isn't
+        one."""
+        if key is None:
+            return None
+        try:
+            with open(self._file(key), "rb") as f:
+                return pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, key, entry):
+        """Stores an entry under the given key.
+
+        The cache is only an optimization, so failing to write to it (e.g.
+        because the directory isn't writable, or the disk is full) is logged
+        rather than raised.
+        """
+        if key is None:
+            return
+        try:
+            content = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        except (TypeError, AttributeError, pickle.PicklingError) as e:
+            logger.debug("Not caching %s: %s", self._file(key), e)
+            return
+        try:
+            self._write(key, content)
+        except (IOError, OSError) as e:
+            logger.warning("Unable to cache %s: %s", self._file(key), e)
+
+    def _write(self, key, content):
+        # Other stacker processes may be creating the directory too.
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        # mkstemp creates files that only their owner can access.
+        fd, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, self._file(key))
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+
+class RenderCache(PickleCache):
+    """Caches rendered configs, so that later runs with the same raw config
+    and environment can skip rendering, parsing and merging in remote
+    configs.
+
+    Entries are keyed by a hash of the stacker version, the raw config and
+    the environment. Since the package sources of a config are fetched (and
+    added to ``sys.path``) on every run anyway, entries also record the
+    package sources, and a hash of each remote config that was merged in; an
+    entry is only used if fetching the same package sources gives the same
+    remote configs.
+    """
+
+    prefix = "rendered-"
+
+    def key(self, raw_config, environment):
+        """Returns the key of the entry for a raw config and environment, or
+        None if the environment can't be hashed."""
+        source_type = getattr(environment, "source_type", None)
+        return self._hash(raw_config, source_type, environment or {})
+
+
+class CompiledConfigCache(PickleCache):
+    """Caches validated configs, along with the stacks each stack requires,
+    so that later runs with the same rendered config can skip validating it,
+    and parsing the variables of its stacks to plan them.
+
+    Entries are keyed by a hash of the stacker version and the rendered
+    config, and hold the config in its primitive (serialized) form.
+    """
+
+    prefix = "compiled-"
+
+    def key(self, config_dict, environment):
+        """Returns the key of the entry for a rendered config, or None if it
+        can't be hashed."""
+        # The namespace can come from the environment (see
+        # stacker.config.render_parse_load).
+        namespace = (environment or {}).get("namespace")
+        return self._hash(config_dict, namespace)
@@ -148,6 +148,7 @@ class Context(object):
         if not hasattr(self, "_stacks"):
             stacks = []
             definitions = self._get_stack_definitions()
+            stack_requires = self.config.stack_requires or {}
             for stack_def in definitions:
                 stack = Stack(
                     definition=stack_def,
@@ -157,19 +158,31 @@ class Context(object):
                     locked=stack_def.locked,
                     enabled=stack_def.enabled,
                     protected=stack_def.protected,
-                    notification_arns=stack_def.notification_arns
+                    notification_arns=stack_def.notification_arns,
+                    requires=stack_requires.get(stack_def.name),
                 )
                 stacks.append(stack)
             self._stacks = stacks
+            # Stacks are looked up by name for every output lookup, so they're
+            # indexed rather than searched for.
+            self._stacks_by_name = {}
+            self._stacks_by_fqn = {}
+            for stack in stacks:
+                self._stacks_by_name.setdefault(stack.name, stack)
+                self._stacks_by_fqn.setdefault(stack.fqn, stack)
         return self._stacks
 
     def get_stack(self, name):
-        for stack in self.get_stacks():
-            if stack.name == name:
-                return stack
+        self.get_stacks()
+        return self._stacks_by_name.get(name)
+
+    def get_stack_by_fqn(self, fqn):
+        self.get_stacks()
+        return self._stacks_by_fqn.get(fqn)
 
     def get_stacks_dict(self):
-        return dict((stack.fqn, stack) for stack in self.get_stacks())
+        self.get_stacks()
+        return dict(self._stacks_by_fqn)
 
     def get_fqn(self, name=None):
         """Return the fully qualified name of an object within this context.
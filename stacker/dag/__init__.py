@@ -1,6 +1,10 @@
+import heapq
+import itertools
 import logging
-from threading import Thread
-from copy import copy, deepcopy
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import collections.abc
 from collections import deque, OrderedDict
 
@@ -8,11 +12,100 @@ logger = logging.getLogger(__name__)
 
 
 class DAGValidationError(Exception):
-    pass
+    """Raised when a change would make the graph invalid.
+
+    Args:
+        message (str): a description of the problem.
+        cycle (list, optional): if the graph would contain a cycle, the nodes
+            along it, starting and ending with the same node.
+        edge (tuple, optional): the (ind_node, dep_node) edge that closed the
+            cycle.
+    """
+
+    def __init__(self, message, cycle=None, edge=None):
+        super(DAGValidationError, self).__init__(message)
+        self.cycle = cycle
+        self.edge = edge
+
+
+def _cycle_message(cycle):
+    return "graph is not acyclic: %s" % " -> ".join(cycle)
+
+
+# Versions are drawn from a single counter, so that a graph that has been
+# reset never reuses a version that results were cached against before.
+_versions = itertools.count()
+
+
+class _GraphCache(dict):
+    """ Results computed from a graph, keyed by name and by which way round
+    the graph is, since a graph shares its cache with its transposed view.
+    """
+
+    def __init__(self):
+        super(_GraphCache, self).__init__()
+        self.version = next(_versions)
+
+    def invalidate(self):
+        self.version = next(_versions)
+        self.clear()
+
+
+class TransitiveClosure(object):
+    """ The reachability of every node in a :class:`DAG`.
+
+    The nodes each node can reach are stored as a bitset (an int), where the
+    bit for a node is its position in the topological order of the graph.
+
+    Args:
+        dag (:class:`DAG`): The graph to compute the closure of.
+
+    Raises:
+        ValueError: Raised if the graph is not acyclic.
+    """
+
+    def __init__(self, dag):
+        graph = dag.graph
+        self.order = dag.topological_sort()
+        self.bits = {node: 1 << i for i, node in enumerate(self.order)}
+        self.reach = {}
+        # Every dependency of a node comes after it in the topological order,
+        # so walking it backwards computes dependencies first.
+        for node in reversed(self.order):
+            reach = 0
+            for edge in graph[node]:
+                reach |= self.bits[edge] | self.reach[edge]
+            self.reach[node] = reach
+
+    def reachable(self, node):
+        """ Returns the nodes reachable from node, in topological order. """
+        return self.nodes(self.reach[node])
+
+    def is_reachable(self, ind_node, dep_node):
+        """ Returns whether dep_node can be reached from ind_node. """
+        return bool(self.reach[ind_node] & self.bits[dep_node])
+
+    def nodes(self, mask):
+        """ Returns the nodes whose bits are set in mask, in topological
+        order. """
+        order = self.order
+        nodes = []
+        while mask:
+            low = mask & -mask
+            nodes.append(order[low.bit_length() - 1])
+            mask ^= low
+        return nodes
 
 
 class DAG(object):
-    """ Directed acyclic graph implementation. """
+    """ Directed acyclic graph implementation.
+
+    Alongside the edges in ``graph``, the DAG keeps the reverse edges in
+    ``reverse`` (mapping each node to the nodes with an edge towards it), so
+    that predecessors can be found without scanning every node. Always use the
+    DAG's methods to modify it, so both stay consistent, and so that cached
+    results like the :meth:`transitive_closure` are invalidated.
+    """
 
     def __init__(self):
         """ Construct a new DAG with no nodes or edges. """
@@ -32,6 +125,8 @@ class DAG(object):
         if node_name in graph:
             raise KeyError('node %s already exists' % node_name)
         graph[node_name] = set()
+        self.reverse[node_name] = set()
+        self._cache.invalidate()
 
     def add_node_if_not_exists(self, node_name):
         """ Add a node if it does not exist yet, ignoring duplicates.
@@ -56,11 +151,12 @@ class DAG(object):
         graph = self.graph
         if node_name not in graph:
             raise KeyError('node %s does not exist' % node_name)
-        graph.pop(node_name)
-
-        for node, edges in graph.items():
-            if node_name in edges:
-                edges.remove(node_name)
+        reverse = self.reverse
+        for edge in graph.pop(node_name):
+            reverse[edge].remove(node_name)
+        for node in reverse.pop(node_name):
+            graph[node].remove(node_name)
+        self._cache.invalidate()
 
     def delete_node_if_exists(self, node_name):
         """ Deletes this node and all edges referencing it.
@@ -89,20 +185,126 @@ class DAG(object):
             KeyError: Either the ind_node, or dep_node do not exist.
             DAGValidationError: Raised if the resulting graph is invalid.
         """
+        graph = self.graph
+        self._check_edge(ind_node, dep_node)
+        if dep_node in graph[ind_node]:
+            return
+        # The new edge creates a cycle if ind_node can already be reached
+        # from dep_node.
+        path = self._find_path(dep_node, ind_node)
+        if path is not None:
+            cycle = [ind_node] + path
+            raise DAGValidationError(
+                _cycle_message(cycle), cycle=cycle, edge=(ind_node, dep_node))
+        graph[ind_node].add(dep_node)
+        self.reverse[dep_node].add(ind_node)
+        self._cache.invalidate()
+
+    def add_edges(self, edges):
+        """ Add many edges (dependencies) at once.
+
+        Unlike calling :meth:`add_edge` for each edge, the graph is only
+        validated once, after all of the edges have been added. If the
+        resulting graph is invalid, none of the edges are added.
+
+        Args:
+            edges (list): A list of (ind_node, dep_node) tuples.
+
+        Raises:
+            KeyError: A node referenced by one of the edges does not exist.
+            DAGValidationError: Raised if the resulting graph is invalid. The
+                edge in the cycle that was added last is reported as the
+                edge that closed it.
+        """
+        graph = self.graph
+        edges = list(edges)
+        for ind_node, dep_node in edges:
+            self._check_edge(ind_node, dep_node)
+
+        # Maps each newly added edge to the order it was added in.
+        added = {}
+        for ind_node, dep_node in edges:
+            if dep_node not in graph[ind_node]:
+                added[(ind_node, dep_node)] = len(added)
+                graph[ind_node].add(dep_node)
+
+        cycle = self.find_cycle()
+        if cycle is None:
+            reverse = self.reverse
+            for ind_node, dep_node in added:
+                reverse[dep_node].add(ind_node)
+            self._cache.invalidate()
+            return
+
+        for ind_node, dep_node in added:
+            graph[ind_node].discard(dep_node)
+
+        # Rotate the cycle so that it starts with the edge that was added
+        # last, which is the one that closed it.
+        cycle_edges = list(zip(cycle, cycle[1:]))
+        last = max(range(len(cycle_edges)),
+                   key=lambda i: added.get(cycle_edges[i], -1))
+        cycle = cycle[last:-1] + cycle[:last + 1]
+        raise DAGValidationError(
+            _cycle_message(cycle), cycle=cycle, edge=cycle_edges[last])
+
+    def _check_edge(self, ind_node, dep_node):
         graph = self.graph
         if ind_node not in graph:
             raise KeyError('independent node %s does not exist' % ind_node)
         if dep_node not in graph:
             raise KeyError('dependent node %s does not exist' % dep_node)
-        test_graph = deepcopy(graph)
-        test_graph[ind_node].add(dep_node)
-        test_dag = DAG()
-        test_dag.graph = test_graph
-        is_valid, message = test_dag.validate()
-        if is_valid:
-            graph[ind_node].add(dep_node)
-        else:
-            raise DAGValidationError(message)
+
+    def _find_path(self, start, end):
+        """ Returns a path of nodes from start to end, following edges, or
+        None if end can't be reached from start. """
+        graph = self.graph
+        parents = {start: None}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node == end:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
+            for edge in graph[node]:
+                if edge not in parents:
+                    parents[edge] = node
+                    stack.append(edge)
+        return None
+
+    def find_cycle(self):
+        """ Returns a cycle in the graph, if there is one.
+
+        Returns:
+            list: The nodes along the cycle, starting and ending with the same
+                  node, or None if the graph is acyclic.
+        """
+        graph = self.graph
+        # 0: not visited yet, 1: on the current path, 2: done
+        state = dict.fromkeys(graph, 0)
+        for root in graph:
+            if state[root]:
+                continue
+            state[root] = 1
+            path = [root]
+            iterators = [iter(graph[root])]
+            while iterators:
+                for node in iterators[-1]:
+                    if state[node] == 1:
+                        return path[path.index(node):] + [node]
+                    if not state[node]:
+                        state[node] = 1
+                        path.append(node)
+                        iterators.append(iter(graph[node]))
+                        break
+                else:
+                    state[path.pop()] = 2
+                    iterators.pop()
+        return None
 
     def delete_edge(self, ind_node, dep_node):
         """ Delete an edge from the graph.
@@ -121,21 +323,25 @@ class DAG(object):
                 "No edge exists between %s and %s." % (ind_node, dep_node)
             )
         graph[ind_node].remove(dep_node)
+        self.reverse[dep_node].remove(ind_node)
+        self._cache.invalidate()
 
     def transpose(self):
-        """ Builds a new graph with the edges reversed.
+        """ Returns a view of this graph with the edges reversed.
+
+        The transposed graph shares its edges and cached results with this
+        one, so it's cheap to create. It's a read-only view: modifying it
+        modifies this graph too, so copy it first (e.g. with
+        :meth:`from_dict`) to get a graph that can be changed on its own.
 
         Returns:
             :class:`stacker.dag.DAG`: The transposed graph.
         """
-        graph = self.graph
         transposed = DAG()
-        for node, edges in graph.items():
-            transposed.add_node(node)
-        for node, edges in graph.items():
-            # for each edge A -> B, transpose it so that B -> A
-            for edge in edges:
-                transposed.add_edge(edge, node)
+        transposed.graph = self.reverse
+        transposed.reverse = self.graph
+        # Changes to either graph need to invalidate both of their results.
+        transposed._cache = self._cache
         return transposed
 
     def walk(self, walk_func):
@@ -162,27 +368,47 @@ class DAG(object):
 
         See https://en.wikipedia.org/wiki/Transitive_reduction
         """
-        combinations = []
+        closure = self.transitive_closure()
+        bits = closure.bits
+        reach = closure.reach
         for node, edges in self.graph.items():
-            combinations += [[node, edge] for edge in edges]
+            # An edge is redundant if its node can be reached through any of
+            # the other edges. No node can reach itself, so we don't need to
+            # exclude each edge from the nodes reachable through the others.
+            covered = 0
+            for edge in edges:
+                covered |= reach[edge]
+            for edge in [e for e in edges if covered & bits[e]]:
+                self.delete_edge(node, edge)
+        # Reachability is unchanged, so the closure is still valid.
+        self._cache[("closure", id(self.graph))] = closure
 
-        while True:
-            new_combinations = []
-            for comb1 in combinations:
-                for comb2 in combinations:
-                    if not comb1[-1] == comb2[0]:
-                        continue
-                    new_entry = comb1 + comb2[1:]
-                    if new_entry not in combinations:
-                        new_combinations.append(new_entry)
-            if not new_combinations:
-                break
-            combinations += new_combinations
-
-        constructed = {(c[0], c[-1]) for c in combinations if len(c) != 2}
-        for node, edges in self.graph.items():
-            bad_nodes = {e for n, e in constructed if node == n}
-            self.graph[node] = edges - bad_nodes
+    def transitive_closure(self):
+        """ Returns the :class:`TransitiveClosure` of the DAG.
+
+        The closure is cached until the graph is next modified.
+
+        Returns:
+            :class:`stacker.dag.TransitiveClosure`: The closure of the graph.
+
+        Raises:
+            ValueError: Raised if the graph is not acyclic.
+        """
+        return self._cached("closure", TransitiveClosure)
+
+    @property
+    def version(self):
+        """ A number that changes every time the graph is modified or reset,
+        and is never reused. """
+        return self._cache.version
+
+    def _cached(self, name, fn):
+        key = (name, id(self.graph))
+        try:
+            return self._cache[key]
+        except KeyError:
+            result = self._cache[key] = fn(self)
+            return result
 
     def rename_edges(self, old_node_name, new_node_name):
         """ Change references to a node in existing edges.
@@ -192,15 +418,18 @@ class DAG(object):
             new_node_name (str): The new name for the node.
         """
         graph = self.graph
-        for node, edges in graph.items():
-            if node == old_node_name:
-                graph[new_node_name] = copy(edges)
-                del graph[old_node_name]
-
-            else:
-                if old_node_name in edges:
-                    edges.remove(old_node_name)
-                    edges.add(new_node_name)
+        reverse = self.reverse
+        if old_node_name not in graph:
+            return
+        edges = graph[new_node_name] = graph.pop(old_node_name)
+        predecessors = reverse[new_node_name] = reverse.pop(old_node_name)
+        for edge in edges:
+            reverse[edge].remove(old_node_name)
+            reverse[edge].add(new_node_name)
+        for node in predecessors:
+            graph[node].remove(old_node_name)
+            graph[node].add(new_node_name)
+        self._cache.invalidate()
 
     def predecessors(self, node):
         """ Returns a list of all immediate predecessors of the given node
@@ -211,8 +440,7 @@ class DAG(object):
         Returns:
             list: A list of nodes that are immediate predecessors to node.
         """
-        graph = self.graph
-        return [key for key in graph if node in graph[key]]
+        return list(self.reverse.get(node, ()))
 
     def downstream(self, node):
         """ Returns a list of all nodes this node has edges towards.
@@ -240,19 +468,9 @@ class DAG(object):
         Returns:
             list: A list of nodes that are downstream from the node.
         """
-        nodes = [node]
-        nodes_seen = set()
-        i = 0
-        while i < len(nodes):
-            downstreams = self.downstream(nodes[i])
-            for downstream_node in downstreams:
-                if downstream_node not in nodes_seen:
-                    nodes_seen.add(downstream_node)
-                    nodes.append(downstream_node)
-            i += 1
-        return [
-            node_ for node_ in self.topological_sort() if node_ in nodes_seen
-        ]
+        if node not in self.graph:
+            raise KeyError('node %s is not in graph' % node)
+        return self.transitive_closure().reachable(node)
 
     def filter(self, nodes):
         """ Returns a new DAG with only the given nodes and their
@@ -265,18 +483,31 @@ class DAG(object):
             :class:`stacker.dag.DAG`: The filtered graph.
         """
 
-        filtered_dag = DAG()
-
-        # Add only the nodes we need.
+        graph = self.graph
         for node in nodes:
-            filtered_dag.add_node_if_not_exists(node)
-            for edge in self.all_downstreams(node):
-                filtered_dag.add_node_if_not_exists(edge)
+            if node not in graph:
+                raise KeyError('node %s is not in graph' % node)
+
+        # Find the nodes we need with a single traversal from all of them.
+        seen = set(nodes)
+        stack = list(seen)
+        while stack:
+            for edge in graph[stack.pop()]:
+                if edge not in seen:
+                    seen.add(edge)
+                    stack.append(edge)
 
-        # Now, rebuild the graph for each node that's present.
-        for node, edges in self.graph.items():
-            if node in filtered_dag.graph:
-                filtered_dag.graph[node] = edges
+        filtered_dag = DAG()
+        for node in graph:
+            if node in seen:
+                filtered_dag.add_node(node)
+
+        # Now, rebuild the edges for each node that's present. Every
+        # dependency of a present node is also present.
+        for node, edges in filtered_dag.graph.items():
+            for edge in graph[node]:
+                edges.add(edge)
+                filtered_dag.reverse[edge].add(node)
 
         return filtered_dag
 
@@ -304,15 +535,19 @@ class DAG(object):
         self.reset_graph()
         for new_node in graph_dict:
             self.add_node(new_node)
+        edges = []
         for ind_node, dep_nodes in graph_dict.items():
             if not isinstance(dep_nodes, collections.abc.Iterable):
                 raise TypeError('%s: dict values must be lists' % ind_node)
             for dep_node in dep_nodes:
-                self.add_edge(ind_node, dep_node)
+                edges.append((ind_node, dep_node))
+        self.add_edges(edges)
 
     def reset_graph(self):
         """ Restore the graph to an empty state. """
         self.graph = OrderedDict()
+        self.reverse = OrderedDict()
+        self._cache = _GraphCache()
 
     def ind_nodes(self):
         """ Returns a list of all nodes in the graph with no dependencies.
@@ -320,32 +555,32 @@ class DAG(object):
         Returns:
             list: A list of all independent nodes.
         """
-        graph = self.graph
-
-        dependent_nodes = set(
-            node for dependents
-            in graph.values() for node in dependents)
-        return [node_ for node_ in graph if node_ not in dependent_nodes]
+        reverse = self.reverse
+        return [node for node in self.graph if not reverse[node]]
 
     def validate(self):
         """ Returns (Boolean, message) of whether DAG is valid. """
         if len(self.ind_nodes()) == 0:
             return (False, 'no independent nodes detected')
-        try:
-            self.topological_sort()
-        except ValueError as e:
-            return (False, str(e))
+        cycle = self.find_cycle()
+        if cycle is not None:
+            return (False, _cycle_message(cycle))
         return (True, 'valid')
 
     def topological_sort(self):
         """ Returns a topological ordering of the DAG.
 
+        The ordering is cached until the graph is next modified.
+
         Returns:
             list: A list of topologically sorted nodes in the graph.
 
         Raises:
             ValueError: Raised if the graph is not acyclic.
         """
+        return list(self._cached("topological_sort", DAG._topological_sort))
+
+    def _topological_sort(self):
         graph = self.graph
 
         in_degree = {}
@@ -392,78 +627,322 @@ class UnlimitedSemaphore(object):
     """
 
     def acquire(self, *args):
-        pass
+        return True
 
     def release(self):
         pass
 
 
+class AdjustableSemaphore(object):
+    """A semaphore whose limit can be changed while it's in use.
+
+    Lowering the limit doesn't take back slots that have already been
+    acquired, it just stops new ones from being acquired until enough have
+    been released.
+
+    Args:
+        limit (int): the number of slots that can be acquired at once.
+    """
+
+    def __init__(self, limit):
+        self._condition = threading.Condition()
+        self._limit = limit
+        self.in_use = 0
+
+    @property
+    def limit(self):
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit):
+        with self._condition:
+            self._limit = limit
+            self._condition.notify_all()
+
+    def locked(self):
+        """Returns True if a slot can't be acquired right now."""
+        return self.in_use >= self._limit
+
+    def acquire(self, blocking=True):
+        with self._condition:
+            while self.in_use >= self._limit:
+                if not blocking:
+                    return False
+                self._condition.wait()
+            self.in_use += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+
+
+# Holds the :class:`Slot` of the node being walked by the current thread.
+_local = threading.local()
+
+
+def current_slot():
+    """Returns the :class:`Slot` held by the node that the current thread is
+    walking, or None if the current thread isn't walking a node in a
+    :class:`ThreadedWalker`.
+    """
+    return getattr(_local, "slot", None)
+
+
+# How long (in seconds) a node that's resuming waits before trying to get a
+# slot in its limit groups again.
+RESUME_RETRY_SLEEP = 0.1
+
+
+class Slot(object):
+    """A concurrency slot held by a node while its walk_func is running.
+
+    Nodes start out holding one of the walker's *active* slots. A walk_func
+    that spends most of its time waiting on something external (e.g. a
+    CloudFormation stack update) can trade it for one of the walker's
+    *waiting* slots with :meth:`wait`, allowing the walker to start other
+    nodes in the meantime, and trade back with :meth:`resume` before doing
+    more work.
+
+    An active slot also includes a slot in each of the node's limit groups
+    (see :class:`ThreadedWalker`).
+
+    Args:
+        walker (:class:`ThreadedWalker`): the walker the slot belongs to.
+        wakeup (func): called when an active slot has been given up, so the
+            walker can start another node.
+        groups (list, optional): the semaphores of the node's limit groups.
+    """
+
+    def __init__(self, walker, wakeup, groups=()):
+        self.walker = walker
+        self.wakeup = wakeup
+        self.groups = groups
+        self.waiting = False
+
+    def wait(self):
+        """Trades the active slot for a waiting slot.
+
+        A slot is never held while blocking on another one, so that nodes
+        trading in opposite directions can't deadlock each other. If no
+        waiting slot is free, the active slot is given up first.
+        """
+        if self.waiting:
+            return
+        acquired = self.walker.wait_semaphore.acquire(False)
+        self._release_active()
+        self.wakeup()
+        if not acquired:
+            self.walker.wait_semaphore.acquire()
+        self.waiting = True
+
+    def resume(self):
+        """Trades the waiting slot back for an active slot.
+
+        If no active slot is free, the waiting slot is given up first. The
+        node then blocks on the walker's active slots only, and takes its
+        limit groups' slots without blocking, so that it never holds up
+        other nodes in its groups while it waits.
+        """
+        if not self.waiting:
+            return
+        semaphores = list(self.groups) + [self.walker.semaphore]
+        acquired = _acquire_all(semaphores)
+        self.walker.wait_semaphore.release()
+        while not acquired:
+            self.walker.semaphore.acquire()
+            acquired = _acquire_all(self.groups)
+            if not acquired:
+                self.walker.semaphore.release()
+                self.wakeup()
+                time.sleep(RESUME_RETRY_SLEEP)
+        self.waiting = False
+
+    def release(self):
+        if self.waiting:
+            self.walker.wait_semaphore.release()
+        else:
+            self._release_active()
+
+    def _release_active(self):
+        self.walker.semaphore.release()
+        for semaphore in self.groups:
+            semaphore.release()
+
+
+def _acquire_all(semaphores):
+    """Acquires every semaphore without blocking, or none of them."""
+    acquired = []
+    for semaphore in semaphores:
+        if not semaphore.acquire(False):
+            for acquired_semaphore in acquired:
+                acquired_semaphore.release()
+            return False
+        acquired.append(semaphore)
+    return True
+
+
+def critical_path(dag, weights=None):
+    """ Ranks each node by the longest chain of work that can't start until
+    it has finished: its own weight, plus the weights along the heaviest
+    chain of nodes that (transitively) depend on it.
+
+    Starting the nodes with the longest chains first keeps long dependency
+    chains from being left until last when concurrency is limited.
+
+    Args:
+        dag (:class:`DAG`): The graph being walked.
+        weights (dict, optional): The expected cost (e.g. duration) of each
+            node. Nodes that aren't present have a weight of 1.
+
+    Returns:
+        dict: The length of the critical path starting at each node.
+    """
+    weights = weights or {}
+    reverse = dag.reverse
+    path = {}
+    # Nodes come before their dependencies in the topological order, so every
+    # dependent has been ranked by the time we get to a node.
+    for node in dag.topological_sort():
+        longest = max((path[d] for d in reverse[node]), default=0)
+        path[node] = weights.get(node, 1) + longest
+    return path
+
+
 class ThreadedWalker(object):
     """A DAG walker that walks the graph as quickly as the graph topology
-    allows, using threads.
+    allows, using a pool of worker threads.
+
+    Rather than allocating a thread for every node up front, the walker keeps
+    a count of the unfinished dependencies of each node, and hands a node to
+    the worker pool the moment its last dependency completes. Worker threads
+    are only started when there are more nodes ready to run than idle
+    workers, so the pool never grows beyond the widest part of the graph.
+
+    Concurrency is split in two: a node needs an active slot from
+    ``semaphore`` to start, but while it is only waiting it can move to a
+    slot from ``wait_semaphore`` (see :class:`Slot`).
+
+    When more nodes are ready than there are slots, the nodes with the
+    highest priority start first. By default, that's the nodes on the longest
+    remaining chain of dependents (see :func:`critical_path`).
+
+    Nodes can also belong to limit groups (e.g. the stacks in a region), each
+    with its own limit on how many of its nodes can be active at once. A node
+    that's waiting on a full group doesn't hold up ready nodes in other
+    groups.
 
     Args:
         semaphore (threading.Semaphore): a semaphore object which
             can be used to control how many steps are executed in parallel.
+        max_workers (int, optional): an upper bound on the number of worker
+            threads. If not provided, the pool grows as needed.
+        wait_semaphore (threading.Semaphore, optional): a semaphore object
+            which controls how many steps can be waiting in parallel. Defaults
+            to unlimited.
+        priority (func, optional): a function that takes the DAG being walked
+            and returns a dict mapping each node to a sortable priority, where
+            higher priorities start first. Defaults to :func:`critical_path`.
+        groups (dict, optional): a mapping of nodes to the limit groups they
+            belong to. Every node should list its groups in the same order.
+        group_limits (dict, optional): a mapping of limit groups to the
+            maximum number of their nodes that can be active at once, or to a
+            semaphore (e.g. an :class:`AdjustableSemaphore`) to share. Groups
+            without a limit are unlimited.
     """
 
-    def __init__(self, semaphore):
+    def __init__(self, semaphore, max_workers=None, wait_semaphore=None,
+                 priority=critical_path, groups=None, group_limits=None):
         self.semaphore = semaphore
+        self.max_workers = max_workers
+        self.wait_semaphore = wait_semaphore or UnlimitedSemaphore()
+        self.priority = priority
+        self.groups = groups or {}
+        self.group_limits = group_limits or {}
 
     def walk(self, dag, walk_func):
         """ Walks each node of the graph, in parallel if it can.
         The walk_func is only called when the nodes dependencies have been
         satisfied
         """
+        graph = dag.graph
 
-        # First, we'll topologically sort all of the nodes, with nodes that
-        # have no dependencies first. We do this to ensure that we don't call
-        # .join on a thread that hasn't yet been started.
-        #
-        # TODO(ejholmes): An alternative would be to ensure that Thread.join
-        # blocks if the thread has not yet been started.
+        # Sorting up front guarantees the graph is acyclic, and gives us a
+        # stable order to start the independent nodes in.
         nodes = dag.topological_sort()
         nodes.reverse()
 
-        # This maps a node name to a thread of execution.
-        threads = {}
-
-        # Blocks until all of the given nodes have completed execution (whether
-        # successfully, or errored). Returns True if all nodes returned True.
-        def wait_for(nodes):
-            for node in nodes:
-                thread = threads[node]
-                while thread.is_alive():
-                    threads[node].join(0.5)
-
-        # For each node in the graph, we're going to allocate a thread to
-        # execute. The thread will block executing walk_func, until all of the
-        # nodes dependencies have executed.
-        for node in nodes:
-            def fn(n, deps):
-                if deps:
-                    logger.debug(
-                        "%s waiting for %s to complete",
-                        n,
-                        ", ".join(deps))
-
-                # Wait for all dependencies to complete.
-                wait_for(deps)
+        # Number of dependencies each node is still waiting on.
+        waiting_on = {node: len(graph[node]) for node in nodes}
+
+        # Rank the nodes once, so the ready queue only has to compare ints.
+        # Sorting is stable, so nodes with equal priorities keep the
+        # topological order.
+        priorities = self.priority(dag)
+        ranked = sorted(nodes, key=priorities.__getitem__, reverse=True)
+        rank = {node: i for i, node in enumerate(ranked)}
+
+        ready = [(rank[node], node) for node in nodes if not waiting_on[node]]
+        heapq.heapify(ready)
+
+        group_semaphores = {}
+        for group, limit in self.group_limits.items():
+            if not isinstance(limit, int):
+                group_semaphores[group] = limit
+            elif limit > 0:
+                group_semaphores[group] = threading.Semaphore(limit)
+        node_groups = dict(
+            (node, [group_semaphores[group] for group in groups
+                    if group in group_semaphores])
+            for node, groups in self.groups.items())
+
+        # Receives the name of each node as it completes, or None when a node
+        # has given up its active slot.
+        completed = queue.Queue()
+
+        def fn(node, groups):
+            # Name the worker after the node, so that log output from the
+            # walk_func can be attributed to it.
+            threading.current_thread().name = node
+            logger.debug("%s starting", node)
+            slot = Slot(self, wakeup=lambda: completed.put(None),
+                        groups=groups)
+            _local.slot = slot
+            try:
+                walk_func(node)
+            except Exception:
+                logger.exception("Unhandled exception while walking %s", node)
+            finally:
+                _local.slot = None
+                slot.release()
+                completed.put(node)
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers or max(len(nodes), 1))
 
-                logger.debug("%s starting", n)
-
-                self.semaphore.acquire()
-                try:
-                    return walk_func(n)
-                finally:
-                    self.semaphore.release()
-
-            deps = dag.all_downstreams(node)
-            threads[node] = Thread(target=fn, args=(node, deps), name=node)
-
-        # Start up all of the threads.
-        for node in nodes:
-            threads[node].start()
-
-        # Wait for all threads to complete executing.
-        wait_for(nodes)
+        try:
+            remaining = len(nodes)
+            while remaining:
+                blocked = []
+                while ready and self.semaphore.acquire(False):
+                    item = heapq.heappop(ready)
+                    groups = node_groups.get(item[1], [])
+                    if not _acquire_all(groups):
+                        self.semaphore.release()
+                        blocked.append(item)
+                        continue
+                    executor.submit(fn, item[1], groups)
+                for item in blocked:
+                    heapq.heappush(ready, item)
+
+                node = completed.get()
+                if node is None:
+                    continue
+                remaining -= 1
+                for dependent in dag.reverse[node]:
+                    waiting_on[dependent] -= 1
+                    if not waiting_on[dependent]:
+                        heapq.heappush(ready, (rank[dependent], dependent))
+        finally:
+            executor.shutdown(wait=True)
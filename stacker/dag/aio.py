@@ -0,0 +1,280 @@
+import asyncio
+import contextvars
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from . import RESUME_RETRY_SLEEP, critical_path
+
+logger = logging.getLogger(__name__)
+
+# Holds the :class:`AsyncSlot` of the node being walked by the current task.
+_slot = contextvars.ContextVar("slot", default=None)
+
+
+def current_async_slot():
+    """Returns the :class:`AsyncSlot` held by the node that the current task
+    is walking, or None if the current task isn't walking a node in an
+    :class:`AsyncWalker`.
+    """
+    return _slot.get()
+
+
+class _UnlimitedSemaphore(object):
+    """The asyncio counterpart of :class:`stacker.dag.UnlimitedSemaphore`."""
+
+    def locked(self):
+        return False
+
+    async def acquire(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class _PolledSemaphore(object):
+    """Adapts a threading semaphore with a ``locked`` method (e.g. an
+    :class:`stacker.dag.AdjustableSemaphore`) for use on the event loop."""
+
+    def __init__(self, semaphore):
+        self.semaphore = semaphore
+
+    def locked(self):
+        return self.semaphore.locked()
+
+    async def acquire(self):
+        while not self.semaphore.acquire(False):
+            await asyncio.sleep(0.1)
+        return True
+
+    def release(self):
+        self.semaphore.release()
+
+
+def _semaphore(limit):
+    if limit > 0:
+        return asyncio.Semaphore(limit)
+    return _UnlimitedSemaphore()
+
+
+async def _acquire_all(semaphores):
+    """Acquires every semaphore without waiting, or none of them."""
+    if any(semaphore.locked() for semaphore in semaphores):
+        return False
+    for semaphore in semaphores:
+        await semaphore.acquire()
+    return True
+
+
+class AsyncSlot(object):
+    """The asyncio counterpart of :class:`stacker.dag.Slot`.
+
+    As well as trading between active and waiting slots, the slot gives the
+    node access to the walker's executor for blocking calls, and lets it
+    sleep between polls without holding a thread.
+
+    Args:
+        walker (:class:`AsyncWalker`): the walker the slot belongs to.
+        active (asyncio.Semaphore): limits the nodes actively doing work.
+        waiting (asyncio.Semaphore): limits the nodes waiting.
+        wakeup (func): called when an active slot has been given up, so the
+            walker can start another node.
+        groups (list, optional): the semaphores of the node's limit groups.
+    """
+
+    def __init__(self, walker, active, waiting, wakeup, groups=()):
+        self.walker = walker
+        self.active = active
+        self.waiting_semaphore = waiting
+        self.wakeup = wakeup
+        self.groups = groups
+        self.waiting = False
+
+    async def run(self, fn, *args):
+        """Runs a blocking function in the walker's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.walker.executor, fn, *args)
+
+    async def sleep(self):
+        """Sleeps for the walker's poll_time. Returns True if the walk was
+        cancelled while sleeping."""
+        cancel = self.walker.cancel
+        remaining = self.walker.poll_time
+        # The cancel event is set from a signal handler, which can't wake up
+        # the event loop, so check on it every second.
+        while remaining > 0 and not (cancel and cancel.is_set()):
+            await asyncio.sleep(min(remaining, 1))
+            remaining -= 1
+        return bool(cancel and cancel.is_set())
+
+    async def wait(self):
+        """Trades the active slot for a waiting slot, giving up the active
+        slot first if no waiting slot is free."""
+        if self.waiting:
+            return
+        free = await _acquire_all([self.waiting_semaphore])
+        self._release_active()
+        self.wakeup()
+        if not free:
+            await self.waiting_semaphore.acquire()
+        self.waiting = True
+
+    async def resume(self):
+        """Trades the waiting slot back for an active slot, giving up the
+        waiting slot first if no active slot is free. As with
+        :meth:`stacker.dag.Slot.resume`, the limit groups' slots are never
+        held while waiting for an active slot."""
+        if not self.waiting:
+            return
+        semaphores = list(self.groups) + [self.active]
+        free = await _acquire_all(semaphores)
+        self.waiting_semaphore.release()
+        while not free:
+            await self.active.acquire()
+            free = await _acquire_all(self.groups)
+            if not free:
+                self.active.release()
+                self.wakeup()
+                await asyncio.sleep(RESUME_RETRY_SLEEP)
+        self.waiting = False
+
+    def release(self):
+        if self.waiting:
+            self.waiting_semaphore.release()
+        else:
+            self._release_active()
+
+    def _release_active(self):
+        self.active.release()
+        for semaphore in self.groups:
+            semaphore.release()
+
+
+class AsyncWalker(object):
+    """A DAG walker that runs every node as a task on a single asyncio event
+    loop.
+
+    This works like :class:`stacker.dag.ThreadedWalker`, except that nodes
+    that are only waiting (e.g. on CloudFormation) don't tie up a thread:
+    walk_func is a coroutine function, which runs blocking calls in a shared
+    executor through its :class:`AsyncSlot` (see
+    :func:`current_async_slot`), and sleeps on the event loop in between.
+
+    Args:
+        concurrency (int, optional): the maximum number of nodes actively
+            doing work at once. 0 means unlimited.
+        wait_concurrency (int, optional): the maximum number of nodes waiting
+            at once. 0 means unlimited.
+        priority (func, optional): a function that takes the DAG being walked
+            and returns a dict mapping each node to a sortable priority, where
+            higher priorities start first. Defaults to
+            :func:`stacker.dag.critical_path`.
+        poll_time (int, optional): how many seconds :meth:`AsyncSlot.sleep`
+            sleeps for.
+        cancel (threading.Event, optional): an event that, once set, cuts
+            :meth:`AsyncSlot.sleep` short.
+        max_workers (int, optional): the maximum number of threads used to
+            run blocking calls.
+        groups (dict, optional): a mapping of nodes to the limit groups they
+            belong to (see :class:`stacker.dag.ThreadedWalker`).
+        group_limits (dict, optional): a mapping of limit groups to the
+            maximum number of their nodes that can be active at once, or to a
+            threading semaphore with a ``locked`` method to share.
+    """
+
+    def __init__(self, concurrency=0, wait_concurrency=0,
+                 priority=critical_path, poll_time=0, cancel=None,
+                 max_workers=None, groups=None, group_limits=None):
+        self.concurrency = concurrency
+        self.wait_concurrency = wait_concurrency
+        self.priority = priority
+        self.poll_time = poll_time
+        self.cancel = cancel
+        self.max_workers = max_workers
+        self.groups = groups or {}
+        self.group_limits = group_limits or {}
+        self.executor = None
+
+    async def walk(self, dag, walk_func):
+        """ Walks each node of the graph, running the walk_func coroutine for
+        each node once its dependencies have been satisfied.
+        """
+        graph = dag.graph
+
+        nodes = dag.topological_sort()
+        nodes.reverse()
+
+        waiting_on = {node: len(graph[node]) for node in nodes}
+
+        priorities = self.priority(dag)
+        ranked = sorted(nodes, key=priorities.__getitem__, reverse=True)
+        rank = {node: i for i, node in enumerate(ranked)}
+
+        ready = [(rank[node], node) for node in nodes if not waiting_on[node]]
+        heapq.heapify(ready)
+
+        active = _semaphore(self.concurrency)
+        waiting = _semaphore(self.wait_concurrency)
+
+        group_semaphores = {}
+        for group, limit in self.group_limits.items():
+            if not isinstance(limit, int):
+                group_semaphores[group] = _PolledSemaphore(limit)
+            elif limit > 0:
+                group_semaphores[group] = asyncio.Semaphore(limit)
+        node_groups = dict(
+            (node, [group_semaphores[group] for group in groups
+                    if group in group_semaphores])
+            for node, groups in self.groups.items())
+
+        # Receives the name of each node as it completes, or None when a node
+        # has given up its active slot.
+        completed = asyncio.Queue()
+
+        async def fn(node, groups):
+            logger.debug("%s starting", node)
+            slot = AsyncSlot(self, active, waiting,
+                             wakeup=lambda: completed.put_nowait(None),
+                             groups=groups)
+            token = _slot.set(slot)
+            try:
+                await walk_func(node)
+            except Exception:
+                logger.exception("Unhandled exception while walking %s", node)
+            finally:
+                _slot.reset(token)
+                slot.release()
+                completed.put_nowait(node)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        tasks = []
+        try:
+            remaining = len(nodes)
+            while remaining:
+                blocked = []
+                while ready and not active.locked():
+                    item = heapq.heappop(ready)
+                    groups = node_groups.get(item[1], [])
+                    if not await _acquire_all(groups):
+                        blocked.append(item)
+                        continue
+                    await active.acquire()
+                    tasks.append(asyncio.ensure_future(fn(item[1], groups)))
+                for item in blocked:
+                    heapq.heappush(ready, item)
+
+                node = await completed.get()
+                if node is None:
+                    continue
+                remaining -= 1
+                for dependent in dag.reverse[node]:
+                    waiting_on[dependent] -= 1
+                    if not waiting_on[dependent]:
+                        heapq.heappush(ready, (rank[dependent], dependent))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -1,7 +1,3 @@
-
-import yaml
-
-
 class DictWithSourceType(dict):
     """An environment dict which keeps track of its source.
 
@@ -38,6 +34,8 @@ def parse_environment(raw_environment):
 
 
 def parse_yaml_environment(raw_environment):
+    import yaml
+
     environment = DictWithSourceType('yaml')
     parsed_env = yaml.safe_load(raw_environment)
 
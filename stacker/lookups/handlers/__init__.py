@@ -15,6 +15,36 @@ class LookupHandler(object):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def handle_batch(cls, values, context, provider):
+        """
+        Perform several lookups at once
+
+        Handlers that can fetch several values with fewer calls than it takes
+        to look each of them up (e.g. with a batch API) override this. The
+        lookups of the stacks that are ready to be launched are then resolved
+        together, before the variables of the stacks are (see
+        :func:`stacker.variables.resolve_lookups_in_batches`).
+
+        :param values: Parameter(s) given to each lookup
+        :type values: list
+        :param context:
+        :param provider:
+        :return: The looked-up value of each lookup, in the same order. The
+            value of a lookup that failed is the exception it failed with;
+            it's then performed again with handle() when its stack's
+            variables are resolved, so that the error is reported as usual.
+        :rtype: list
+        """
+        results = []
+        for value in values:
+            try:
+                results.append(
+                    cls.handle(value, context=context, provider=provider))
+            except Exception as e:
+                results.append(e)
+        return results
+
     @classmethod
     def dependencies(cls, lookup_data):
         """
@@ -1,5 +1,7 @@
 from botocore.exceptions import ClientError
+from collections import OrderedDict
 import re
+import time
 from stacker.session_cache import get_session
 
 from . import LookupHandler
@@ -7,6 +9,15 @@ from ...util import read_value_from_path
 
 TYPE_NAME = 'dynamodb'
 
+# The most records a BatchGetItem call can fetch.
+BATCH_GET_ITEM_MAX_KEYS = 100
+
+# How many times the keys that a BatchGetItem call leaves unprocessed (e.g.
+# when the table is being throttled) are requested again, and how long (in
+# seconds) to wait before the first retry. The wait doubles with each retry.
+UNPROCESSED_KEYS_MAX_RETRIES = 5
+UNPROCESSED_KEYS_RETRY_SLEEP = 0.1
+
 
 class DynamodbLookup(LookupHandler):
     @classmethod
@@ -21,32 +32,8 @@ class DynamodbLookup(LookupHandler):
         `AWS_DEFAULT_REGION` if not specified.
         """
         value = read_value_from_path(value)
-        table_info = None
-        table_keys = None
-        region = None
-        table_name = None
-        if '@' in value:
-            table_info, table_keys = value.split('@', 1)
-            if ':' in table_info:
-                region, table_name = table_info.split(':', 1)
-            else:
-                table_name = table_info
-        else:
-            raise ValueError('Please make sure to include a tablename')
-
-        if not table_name:
-            raise ValueError('Please make sure to include a dynamodb table '
-                             'name')
-
-        table_lookup, table_keys = table_keys.split(':', 1)
-
-        table_keys = table_keys.split('.')
-
-        key_dict = _lookup_key_parse(table_keys)
-        new_keys = key_dict['new_keys']
-        clean_table_keys = key_dict['clean_table_keys']
-
-        projection_expression = _build_projection_expression(clean_table_keys)
+        region, table_name, table_lookup, new_keys, projection_expression = \
+            _parse(value)
 
         # lookup the data from dynamodb
         dynamodb = get_session(region).client('dynamodb')
@@ -77,6 +64,146 @@ class DynamodbLookup(LookupHandler):
                 'The dynamodb record could not be found using the following '
                 'key: {}'.format(new_keys[0]))
 
+    @classmethod
+    def handle_batch(cls, values, **kwargs):
+        """Get several values from dynamodb tables, with a BatchGetItem call
+        for every hundred records fetched from each table.
+
+        Keys that DynamoDB leaves unprocessed are requested again, backing
+        off between attempts. Records that still aren't returned are left to
+        :meth:`handle`, so that the errors are reported as usual.
+        """
+        lookups = []
+        requests = OrderedDict()
+        for value in values:
+            try:
+                region, table_name, table_lookup, new_keys, \
+                    projection_expression = _parse(read_value_from_path(value))
+            except Exception as e:
+                lookups.append(e)
+                continue
+            request = (region, table_name, table_lookup)
+            keys = requests.setdefault(request, OrderedDict())
+            key_id = _key_id(new_keys[0])
+            attributes = keys.setdefault(key_id, (new_keys[0], []))[1]
+            for attribute in projection_expression.split(','):
+                if attribute not in attributes:
+                    attributes.append(attribute)
+            lookups.append((request, key_id, new_keys))
+
+        items = {}
+        for request, keys in requests.items():
+            region, table_name, table_lookup = request
+            dynamodb = get_session(region).client('dynamodb')
+            keys = list(keys.items())
+            for i in range(0, len(keys), BATCH_GET_ITEM_MAX_KEYS):
+                batch = keys[i:i + BATCH_GET_ITEM_MAX_KEYS]
+                # Every attribute that the lookups of the batch need, and the
+                # partition key, to tell which record each item is.
+                projection = []
+                for _, (_, attributes) in batch:
+                    projection.extend(a for a in attributes
+                                      if a not in projection)
+                if table_lookup not in projection:
+                    projection.append(table_lookup)
+                try:
+                    found = _batch_get_item(dynamodb, table_name, {
+                        'Keys': [{table_lookup: key}
+                                 for _, (key, _) in batch],
+                        'ProjectionExpression': ','.join(projection)
+                    })
+                except Exception as e:
+                    for key_id, _ in batch:
+                        items[(request, key_id)] = e
+                    continue
+                for item in found:
+                    if table_lookup in item:
+                        items[(request, _key_id(item[table_lookup]))] = item
+
+        results = []
+        for lookup in lookups:
+            if isinstance(lookup, Exception):
+                results.append(lookup)
+                continue
+            request, key_id, new_keys = lookup
+            item = items.get((request, key_id))
+            if item is None:
+                results.append(ValueError(
+                    'The dynamodb record could not be found using the '
+                    'following key: {}'.format(new_keys[0])))
+            elif isinstance(item, Exception):
+                results.append(item)
+            else:
+                try:
+                    results.append(_get_val_from_ddb_data(item, new_keys[1:]))
+                except Exception as e:
+                    results.append(e)
+        return results
+
+
+def _batch_get_item(dynamodb, table_name, request):
+    """Makes a BatchGetItem call for records of a single table, requesting
+    any unprocessed keys again until they've all been processed or the
+    retries run out.
+
+    Returns:
+        list: the items that were returned.
+    """
+    items = []
+    sleep = UNPROCESSED_KEYS_RETRY_SLEEP
+    for attempt in range(UNPROCESSED_KEYS_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(sleep)
+            sleep *= 2
+        response = dynamodb.batch_get_item(
+            RequestItems={table_name: request})
+        items.extend(response.get('Responses', {}).get(table_name, []))
+        request = response.get('UnprocessedKeys', {}).get(table_name)
+        if not request or not request.get('Keys'):
+            break
+    return items
+
+
+def _parse(value):
+    """Parses the value of a lookup.
+
+    Returns:
+        tuple: the region, table name, partition key, keys (including their
+            data types) and projection expression of the lookup.
+    """
+    table_info = None
+    table_keys = None
+    region = None
+    table_name = None
+    if '@' in value:
+        table_info, table_keys = value.split('@', 1)
+        if ':' in table_info:
+            region, table_name = table_info.split(':', 1)
+        else:
+            table_name = table_info
+    else:
+        raise ValueError('Please make sure to include a tablename')
+
+    if not table_name:
+        raise ValueError('Please make sure to include a dynamodb table '
+                         'name')
+
+    table_lookup, table_keys = table_keys.split(':', 1)
+
+    table_keys = table_keys.split('.')
+
+    key_dict = _lookup_key_parse(table_keys)
+    new_keys = key_dict['new_keys']
+    clean_table_keys = key_dict['clean_table_keys']
+
+    projection_expression = _build_projection_expression(clean_table_keys)
+    return region, table_name, table_lookup, new_keys, projection_expression
+
+
+def _key_id(key):
+    """Returns a hashable form of a dynamodb key value."""
+    return tuple(sorted(key.items()))
+
 
 def _lookup_key_parse(table_keys):
     """Return the order in which the stacks should be executed.
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 
 from stacker.session_cache import get_session
 
@@ -6,6 +7,9 @@ from ...util import read_value_from_path
 
 TYPE_NAME = "ssmstore"
 
+# The most parameters a GetParameters call can fetch.
+GET_PARAMETERS_MAX_NAMES = 10
+
 
 class SsmstoreLookup(LookupHandler):
     @classmethod
@@ -38,11 +42,7 @@ class SsmstoreLookup(LookupHandler):
             conf_key: PASSWORD
 
         """
-        value = read_value_from_path(value)
-
-        region = "us-east-1"
-        if "@" in value:
-            region, value = value.split("@", 1)
+        region, value = _parse(value)
 
         client = get_session(region).client("ssm")
         response = client.get_parameters(
@@ -56,3 +56,64 @@ class SsmstoreLookup(LookupHandler):
 
         raise ValueError('SSMKey "{}" does not exist in region {}'.format(
             value, region))
+
+    @classmethod
+    def handle_batch(cls, values, **kwargs):
+        """Retrieve (and decrypt if applicable) several parameters from AWS
+        SSM Parameter Store, with a GetParameters call for every ten
+        parameters in each region.
+
+        Parameters that aren't found are left to :meth:`handle`, so that the
+        errors are reported as usual.
+        """
+        keys = []
+        names = OrderedDict()
+        for value in values:
+            try:
+                key = _parse(value)
+            except Exception as e:
+                key = e
+            else:
+                region_names = names.setdefault(key[0], [])
+                if key[1] not in region_names:
+                    region_names.append(key[1])
+            keys.append(key)
+
+        found = {}
+        for region, region_names in names.items():
+            client = get_session(region).client("ssm")
+            for i in range(0, len(region_names), GET_PARAMETERS_MAX_NAMES):
+                try:
+                    response = client.get_parameters(
+                        Names=region_names[i:i + GET_PARAMETERS_MAX_NAMES],
+                        WithDecryption=True
+                    )
+                except Exception as e:
+                    for name in region_names[i:i + GET_PARAMETERS_MAX_NAMES]:
+                        found[(region, name)] = e
+                    continue
+                for parameter in response.get('Parameters', []):
+                    found[(region, parameter['Name'])] = str(
+                        parameter['Value'])
+
+        results = []
+        for key in keys:
+            if isinstance(key, Exception):
+                results.append(key)
+            elif key in found:
+                results.append(found[key])
+            else:
+                results.append(ValueError(
+                    'SSMKey "{}" does not exist in region {}'.format(
+                        key[1], key[0])))
+        return results
+
+
+def _parse(value):
+    """Returns the region and name of the parameter that a lookup is for."""
+    value = read_value_from_path(value)
+
+    region = "us-east-1"
+    if "@" in value:
+        region, value = value.split("@", 1)
+    return region, value
@@ -7,20 +7,60 @@ from past.builtins import basestring
 from ..exceptions import UnknownLookupType, FailedVariableLookup
 from ..util import load_object_from_string
 
-from .handlers import output
-from .handlers import kms
-from .handlers import xref
-from .handlers import ssmstore
-from .handlers import dynamodb
-from .handlers import envvar
-from .handlers import rxref
-from .handlers import ami
-from .handlers import file as file_handler
-from .handlers import split
-from .handlers import default
-from .handlers import hook_data
-
-LOOKUP_HANDLERS = {}
+# The lookup handlers that come with stacker, by type name. They're only
+# imported the first time they're looked up, since some of them pull in
+# boto3 or troposphere.
+DEFAULT_LOOKUP_HANDLERS = {
+    "output": "stacker.lookups.handlers.output.OutputLookup",
+    "kms": "stacker.lookups.handlers.kms.KmsLookup",
+    "ssmstore": "stacker.lookups.handlers.ssmstore.SsmstoreLookup",
+    "envvar": "stacker.lookups.handlers.envvar.EnvvarLookup",
+    "xref": "stacker.lookups.handlers.xref.XrefLookup",
+    "rxref": "stacker.lookups.handlers.rxref.RxrefLookup",
+    "ami": "stacker.lookups.handlers.ami.AmiLookup",
+    "file": "stacker.lookups.handlers.file.FileLookup",
+    "split": "stacker.lookups.handlers.split.SplitLookup",
+    "default": "stacker.lookups.handlers.default.DefaultLookup",
+    "hook_data": "stacker.lookups.handlers.hook_data.HookDataLookup",
+    "dynamodb": "stacker.lookups.handlers.dynamodb.DynamodbLookup",
+}
+
+
+class LookupHandlers(dict):
+    """A mapping of lookup type names to their handlers, which imports the
+    handlers given by path (see :data:`DEFAULT_LOOKUP_HANDLERS`) when
+    they're first looked up.
+
+    Args:
+        paths (dict): a mapping of lookup type names to the paths of their
+            handlers.
+    """
+
+    def __init__(self, paths):
+        super(LookupHandlers, self).__init__()
+        self.paths = dict(paths)
+
+    def __missing__(self, lookup_type):
+        handler = load_object_from_string(self.paths[lookup_type])
+        self[lookup_type] = handler
+        return handler
+
+    def __contains__(self, lookup_type):
+        return (super(LookupHandlers, self).__contains__(lookup_type) or
+                lookup_type in self.paths)
+
+    def get(self, lookup_type, default=None):
+        try:
+            return self[lookup_type]
+        except KeyError:
+            return default
+
+    def pop(self, lookup_type, *args):
+        self.paths.pop(lookup_type, None)
+        return super(LookupHandlers, self).pop(lookup_type, *args)
+
+
+LOOKUP_HANDLERS = LookupHandlers(DEFAULT_LOOKUP_HANDLERS)
 
 
 def register_lookup_handler(lookup_type, handler_or_path):
@@ -92,17 +132,3 @@ def resolve_lookups(variable, context, provider):
         except Exception as e:
             raise FailedVariableLookup(variable.name, lookup, e)
     return resolved_lookups
-
-
-register_lookup_handler(output.TYPE_NAME, output.OutputLookup)
-register_lookup_handler(kms.TYPE_NAME, kms.KmsLookup)
-register_lookup_handler(ssmstore.TYPE_NAME, ssmstore.SsmstoreLookup)
-register_lookup_handler(envvar.TYPE_NAME, envvar.EnvvarLookup)
-register_lookup_handler(xref.TYPE_NAME, xref.XrefLookup)
-register_lookup_handler(rxref.TYPE_NAME, rxref.RxrefLookup)
-register_lookup_handler(ami.TYPE_NAME, ami.AmiLookup)
-register_lookup_handler(file_handler.TYPE_NAME, file_handler.FileLookup)
-register_lookup_handler(split.TYPE_NAME, split.SplitLookup)
-register_lookup_handler(default.TYPE_NAME, default.DefaultLookup)
-register_lookup_handler(hook_data.TYPE_NAME, hook_data.HookDataLookup)
-register_lookup_handler(dynamodb.TYPE_NAME, dynamodb.DynamodbLookup)
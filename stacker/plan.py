@@ -1,8 +1,10 @@
+import asyncio
+import inspect
 import os
 import logging
+import threading
 import time
 import uuid
-import threading
 
 from .util import stack_template_key_name
 from .exceptions import (
@@ -10,7 +12,8 @@ from .exceptions import (
     PlanFailed,
 )
 from .ui import ui
-from .dag import DAG, DAGValidationError, walk
+from .dag import DAG, DAGValidationError, walk, current_slot
+from .dag.aio import current_async_slot
 from .status import (
     FailedStatus,
     PENDING,
@@ -29,6 +32,35 @@ COLOR_CODES = {
 }
 
 
+def _watch(watch_func, stack):
+    """Starts watching a stack with watch_func, and returns a function that
+    stops watching it.
+
+    watch_funcs used to be called with the stack and a
+    :class:`threading.Event`, and block until the event was set. Those are
+    still supported, and are run in their own thread.
+    """
+    try:
+        params = inspect.signature(watch_func).parameters.values()
+    except (TypeError, ValueError):
+        params = []
+    positional = [p for p in params
+                  if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+                  and p.default is p.empty]
+    if len(positional) < 2:
+        return watch_func(stack)
+
+    cancel = threading.Event()
+    watcher = threading.Thread(target=watch_func, args=(stack, cancel))
+    watcher.daemon = True
+    watcher.start()
+
+    def unwatch():
+        cancel.set()
+        watcher.join()
+    return unwatch
+
+
 def log_step(step):
     msg = "%s: %s" % (step, step.status.name)
     if step.status.reason:
@@ -44,8 +76,11 @@ class Step(object):
             with this step
         fn (func): the function to run to execute the step. This function will
             be ran multiple times until the step is "done".
-        watch_func (func): an optional function that will be called to "tail"
-            the step action.
+        watch_func (func): an optional function that will be called with the
+            stack to start "tailing" the step action. It returns a function
+            that stops tailing, which is called once the step is done. A
+            watch_func that takes the stack and a :class:`threading.Event`,
+            and tails until the event is set, is run in its own thread.
     """
 
     def __init__(self, stack, fn, watch_func=None):
@@ -66,22 +101,52 @@ class Step(object):
         skipped.
         """
 
-        stop_watcher = threading.Event()
-        watcher = None
+        unwatch = None
         if self.watch_func:
-            watcher = threading.Thread(
-                target=self.watch_func,
-                args=(self.stack, stop_watcher)
-            )
-            watcher.start()
+            unwatch = _watch(self.watch_func, self.stack)
 
+        # While the step is submitted, it's only waiting on the provider, so
+        # give up our active concurrency slot to let other steps start.
+        slot = current_slot()
         try:
             while not self.done:
                 self._run_once()
+                if slot:
+                    if self.status == SUBMITTED:
+                        slot.wait()
+                    elif not self.done:
+                        slot.resume()
         finally:
-            if watcher:
-                stop_watcher.set()
-                watcher.join()
+            if unwatch:
+                unwatch()
+        return self.ok
+
+    async def run_async(self):
+        """The asyncio counterpart of :meth:`run`, for steps walked by a
+        :class:`stacker.dag.aio.AsyncWalker`.
+
+        Calls to fn run in the walker's executor, and the step sleeps between
+        calls on the event loop, so a step that's waiting doesn't hold a
+        thread. The step's fn shouldn't also wait between polls.
+        """
+
+        unwatch = None
+        if self.watch_func:
+            unwatch = _watch(self.watch_func, self.stack)
+
+        slot = current_async_slot()
+        try:
+            while not self.done:
+                if self.status is not PENDING:
+                    await slot.sleep()
+                await slot.run(self._run_once)
+                if self.status == SUBMITTED:
+                    await slot.wait()
+                elif not self.done:
+                    await slot.resume()
+        finally:
+            if unwatch:
+                unwatch()
         return self.ok
 
     def _run_once(self):
@@ -185,11 +250,7 @@ def build_plan(description, graph,
 
     # If we only want to build a specific target, filter the graph.
     if targets:
-        nodes = []
-        for target in targets:
-            for k, step in graph.steps.items():
-                if step.name == target:
-                    nodes.append(step.name)
+        nodes = [target for target in targets if target in graph.steps]
         graph = graph.filtered(nodes)
 
     return Plan(description=description, graph=graph)
@@ -206,12 +267,15 @@ def build_graph(steps):
     for step in steps:
         graph.add_step(step)
 
+    edges = []
     for step in steps:
         for dep in step.requires:
-            graph.connect(step.name, dep)
+            edges.append((step.name, dep))
 
         for parent in step.required_by:
-            graph.connect(parent, step.name)
+            edges.append((parent, step.name))
+
+    graph.connect_all(edges)
 
     return graph
 
@@ -255,6 +319,26 @@ class Graph(object):
         except DAGValidationError as e:
             raise GraphError(e, step, dep)
 
+    def connect_all(self, edges):
+        """Connects many (step, dep) pairs at once, only validating the graph
+        after all of them have been added.
+
+        Raises:
+            GraphError: naming the offending edge if a node doesn't exist,
+                or the edge that closes the cycle if there is one.
+        """
+        edges = list(edges)
+        try:
+            self.dag.add_edges(edges)
+        except KeyError as e:
+            graph = self.dag.graph
+            step, dep = next(
+                (step, dep) for step, dep in edges
+                if step not in graph or dep not in graph)
+            raise GraphError(e, step, dep)
+        except DAGValidationError as e:
+            raise GraphError(e, *e.edge)
+
     def transitive_reduction(self):
         self.dag.transitive_reduction()
 
@@ -369,18 +453,33 @@ class Plan(object):
 
         Args:
             walker (func): a walker function to be passed to
-                :class:`stacker.dag.DAG` to walk the graph.
+                :class:`stacker.dag.DAG` to walk the graph. If it's a
+                coroutine function (e.g. :meth:`AsyncWalker.walk
+                <stacker.dag.aio.AsyncWalker.walk>`), the steps are run on an
+                asyncio event loop.
         """
 
-        def walk_func(step):
+        def dependencies_ok(step):
             # Before we execute the step, we need to ensure that it's
             # transitive dependencies are all in an "ok" state. If not, we
             # won't execute this step.
             for dep in self.graph.downstream(step.name):
                 if not dep.ok:
                     step.set_status(FailedStatus("dependency has failed"))
+                    return False
+            return True
+
+        if asyncio.iscoroutinefunction(walker):
+            async def async_walk_func(step):
+                if not dependencies_ok(step):
                     return step.ok
+                return await step.run_async()
+
+            return asyncio.run(self.graph.walk(walker, async_walk_func))
 
+        def walk_func(step):
+            if not dependencies_ok(step):
+                return step.ok
             return step.run()
 
         return self.graph.walk(walker, walk_func)
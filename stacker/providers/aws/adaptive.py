@@ -0,0 +1,236 @@
+"""Adaptive concurrency for CloudFormation, driven by throttling feedback.
+
+Each region gets an :class:`AIMDLimit`, which watches the CloudFormation
+clients of the providers for that region. Calls that succeed quickly let the
+number of stacks being worked on at once grow additively, while throttling
+errors cut it (and the rate of API calls) multiplicatively.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from ...dag import AdjustableSemaphore
+
+logger = logging.getLogger(__name__)
+
+# Error codes returned by AWS APIs when requests are being throttled.
+THROTTLING_ERRORS = frozenset([
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "TooManyRequestsException",
+])
+
+# The limit regions start at, when no maximum is configured.
+DEFAULT_LIMIT = 10
+
+# How much the limit and rate are multiplied by when throttled.
+DECREASE_FACTOR = 0.5
+
+# After a decrease, further throttling is ignored for this many seconds, since
+# calls that were already in flight will often be throttled too.
+DECREASE_COOLDOWN = 5
+
+# The limit only grows while calls are taking less than this many times as
+# long as the fastest calls seen so far.
+LATENCY_FACTOR = 3
+
+# The window (in seconds) over which the recent rate of calls is measured.
+RATE_WINDOW = 10
+
+# The lowest rate (calls per second) that throttling reduces the rate to.
+MIN_RATE = 1.0
+
+
+class AIMDLimit(object):
+    """An additive increase, multiplicative decrease (AIMD) controller for
+    the CloudFormation calls made in a single region.
+
+    The controller adjusts two things:
+
+    * ``semaphore``: limits how many stacks are actively being worked on at
+      once. It's shared with the plan's walker as a limit group.
+    * ``rate``: the number of API calls per second allowed. There's no limit
+      until the region is first throttled.
+
+    Every ``limit`` calls in a row that succeed without being throttled, and
+    without taking much longer than usual, grow the limit by one (and the
+    rate by one call per second). A throttled call halves both.
+
+    Args:
+        name (str): the name of the region, used in the report.
+        initial (int): the limit to start at.
+        minimum (int, optional): the lowest the limit can go.
+        maximum (int, optional): the highest the limit can go.
+    """
+
+    def __init__(self, name, initial, minimum=1, maximum=None):
+        self.name = name
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.semaphore = AdjustableSemaphore(initial)
+        self.rate = None
+        self.lock = threading.Lock()
+        self.successes = 0
+        self.throttles = 0
+        self.fastest = None
+        self.last_decrease = None
+        self.sent = deque()
+        self.next_send = 0
+        # A list of (timestamp, old limit, new limit, reason) tuples.
+        self.changes = []
+
+    @property
+    def limit(self):
+        return self.semaphore.limit
+
+    def watch(self, client):
+        """Registers with the events of a botocore client, to pace its calls
+        and to feed their outcomes to the controller."""
+        events = client.meta.events
+        # Clients are shared (see stacker.session_cache), so the handlers are
+        # registered once per controller.
+        unique_id = "stacker-aimd-%d-%%s" % (id(self),)
+        # Handlers of before-call can answer the call themselves (e.g. a
+        # botocore Stubber), so time it from before they run.
+        events.register_first("before-call.*.*", self._before_call,
+                              unique_id=unique_id % "before-call")
+        events.register("after-call", self._after_call,
+                        unique_id=unique_id % "after-call")
+        events.register("before-send", self._before_send,
+                        unique_id=unique_id % "before-send")
+        events.register("needs-retry", self._needs_retry,
+                        unique_id=unique_id % "needs-retry")
+
+    def _before_call(self, context, **kwargs):
+        context["stacker_started"] = time.time()
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs):
+        started = context.get("stacker_started")
+        if started is None or http_response.status_code >= 400:
+            return
+        self.succeeded(time.time() - started)
+
+    def _before_send(self, **kwargs):
+        self.pace()
+
+    def _needs_retry(self, response, operation, **kwargs):
+        if response is None:
+            return
+        code = response[1].get("Error", {}).get("Code")
+        if code in THROTTLING_ERRORS:
+            self.throttled("%s on %s" % (code, operation.name))
+
+    def pace(self):
+        """Blocks until the next API call is allowed by the rate limit."""
+        with self.lock:
+            now = time.time()
+            self.sent.append(now)
+            while self.sent and self.sent[0] < now - RATE_WINDOW:
+                self.sent.popleft()
+            if self.rate is None:
+                return
+            send_at = max(now, self.next_send)
+            self.next_send = send_at + 1.0 / self.rate
+        if send_at > now:
+            time.sleep(send_at - now)
+
+    def succeeded(self, latency):
+        """Records a call that succeeded after ``latency`` seconds."""
+        with self.lock:
+            if self.fastest is None or latency < self.fastest:
+                self.fastest = latency
+            if latency > self.fastest * LATENCY_FACTOR:
+                # Slow calls are an early sign of congestion, so don't grow.
+                self.successes = 0
+                return
+            self.successes += 1
+            if self.successes < self.limit:
+                return
+            self.successes = 0
+            if self.rate is not None:
+                self.rate += 1
+            if self.maximum is None or self.limit < self.maximum:
+                self._change(self.limit + 1, "%d calls succeeded" % (
+                    self.limit,))
+
+    def throttled(self, reason):
+        """Records a call that was throttled."""
+        with self.lock:
+            self.throttles += 1
+            self.successes = 0
+            now = time.time()
+            if (self.last_decrease is not None and
+                    now - self.last_decrease < DECREASE_COOLDOWN):
+                return
+            self.last_decrease = now
+            recent_rate = len(self.sent) / float(RATE_WINDOW)
+            self.rate = max(MIN_RATE, (self.rate or recent_rate) *
+                            DECREASE_FACTOR)
+            limit = max(self.minimum, int(self.limit * DECREASE_FACTOR))
+            self._change(limit, "throttled (%s)" % (reason,))
+
+    def _change(self, limit, reason):
+        if limit == self.limit:
+            return
+        self.changes.append((time.time(), self.limit, limit, reason))
+        logger.debug("Concurrency limit for %s changed from %d to %d: %s",
+                     self.name, self.limit, limit, reason)
+        self.semaphore.limit = limit
+
+    def report(self, max_changes=10):
+        """Returns a list of lines describing the limit, and why it
+        changed."""
+        rate = "unlimited" if self.rate is None else "%.1f/s" % (self.rate,)
+        lines = ["%s: concurrency limit %d (started at %d), API call rate %s,"
+                 " %d throttled calls" % (self.name, self.limit, self.initial,
+                                          rate, self.throttles)]
+        changes = self.changes[-max_changes:]
+        if len(self.changes) > len(changes):
+            lines.append("  ... %d earlier changes" % (
+                len(self.changes) - len(changes),))
+        for timestamp, old, new, reason in changes:
+            lines.append("  %s %d -> %d: %s" % (
+                time.strftime("%H:%M:%S", time.localtime(timestamp)),
+                old, new, reason))
+        return lines
+
+
+class AdaptiveConcurrency(object):
+    """Keeps an :class:`AIMDLimit` for each region.
+
+    Args:
+        initial (int, optional): the limit each region starts at. Defaults to
+            the maximum, or :data:`DEFAULT_LIMIT` if there isn't one.
+        maximum (int, optional): the highest any region's limit can go.
+    """
+
+    def __init__(self, initial=None, maximum=None):
+        self.initial = initial or maximum or DEFAULT_LIMIT
+        self.maximum = maximum
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    def limit(self, region):
+        """Returns the :class:`AIMDLimit` for the given region."""
+        with self.lock:
+            if region not in self.limits:
+                self.limits[region] = AIMDLimit(
+                    region or "default region", self.initial,
+                    maximum=self.maximum)
+            return self.limits[region]
+
+    def watch(self, client, region):
+        """Feeds a botocore client's calls to the region's controller."""
+        self.limit(region).watch(client)
+
+    def report(self):
+        """Logs the limit of each region, and why it changed."""
+        for region in sorted(self.limits, key=str):
+            for line in self.limits[region].report():
+                logger.info(line)
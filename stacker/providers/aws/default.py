@@ -6,12 +6,12 @@ import urllib.parse
 import sys
 
 # thread safe, memoized, provider builder.
-from threading import Lock
+from threading import Event, Lock, Thread
 
 import botocore.exceptions
-from botocore.config import Config
 
 from ..base import BaseProvider
+from .adaptive import THROTTLING_ERRORS
 from ... import exceptions
 from ...ui import ui
 from ...util import parse_cloudformation_template
@@ -43,18 +43,39 @@ logger = logging.getLogger(__name__)
 MAX_ATTEMPTS = 10
 
 # Updated this to 15 retries with a 1 second sleep between retries. This is
-# only used when a call to `get_events` fails due to the stack not being
+# only used when reading the events of a stack fails due to the stack not being
 # found. This is often the case because Cloudformation is taking too long
 # to create the stack. 15 seconds should, hopefully, be plenty of time for
 # the stack to start showing up in the API.
 MAX_TAIL_RETRIES = 15
 TAIL_RETRY_SLEEP = 1
-GET_EVENTS_SLEEP = 1
+
+# How long (in seconds) the results of a DescribeStacks sweep made by the
+# StackStatusPoller are shared between steps waiting on stacks, before another
+# sweep is made.
+STACK_STATUS_MAX_AGE = 10
+
+# How long (in seconds) stack descriptions are cached for by the StackCache.
+STACK_CACHE_TTL = 5
+
+# How long (in seconds) the results of the sweep made before a plan is
+# executed, to find out which of its stacks exist, are cached for. Only the
+# plan's own stacks are cached for this long, since stacker invalidates them
+# whenever it changes them.
+STACK_PREFETCH_TTL = 300
+
+# How long (in seconds) the StackEventTailer waits between reading the new
+# events of every stack being tailed, and the most calls it makes to do so per
+# second, across all of those stacks.
+TAIL_SLEEP_TIME = 5
+TAIL_MAX_RATE = 10
 DEFAULT_CAPABILITIES = ["CAPABILITY_NAMED_IAM",
                         "CAPABILITY_AUTO_EXPAND"]
 
 
 def get_cloudformation_client(session):
+    from botocore.config import Config
+
     config = Config(
         retries=dict(
             max_attempts=MAX_ATTEMPTS
@@ -525,6 +546,7 @@ class ProviderBuilder(object):
         self.kwargs = kwargs
         self.providers = {}
         self.lock = Lock()
+        self.adaptive = None
 
     def build(self, region=None, profile=None):
         """Get or create the provider for the given region and profile."""
@@ -542,18 +564,385 @@ class ProviderBuilder(object):
                     region = self.region
                 # memoize the result for later.
                 self.providers[key] = Provider(
-                    get_session(region=region, profile=profile),
+                    None,
                     region=region,
+                    profile=profile,
                     **self.kwargs
                 )
                 provider = self.providers[key]
+                if self.adaptive:
+                    self.adaptive.watch(provider.cloudformation, region)
 
         return provider
 
+    def watch(self, adaptive):
+        """Feeds the CloudFormation calls of every provider, built now or
+        later, to an adaptive concurrency controller.
+
+        Args:
+            adaptive (:class:`AdaptiveConcurrency`): the controller (see
+                :mod:`stacker.providers.aws.adaptive`).
+        """
+        with self.lock:
+            self.adaptive = adaptive
+            for provider in self.providers.values():
+                adaptive.watch(provider.cloudformation, provider.region)
+
+
+class StackStatusPoller(object):
+    """Shares DescribeStacks calls between steps waiting on stacks.
+
+    Steps that have submitted a stack poll it until it's done. Rather than
+    each of them calling DescribeStacks for its own stack, the poller keeps
+    track of the stacks being waited on and, when that's cheaper, makes a
+    single paginated DescribeStacks sweep over all the stacks in the
+    region, sharing the result with every waiting step for ``max_age``
+    seconds.
+
+    Args:
+        provider (:class:`Provider`): the provider to poll stacks with.
+        max_age (int, optional): how long, in seconds, the results of a sweep
+            are used for.
+    """
+
+    def __init__(self, provider, max_age=STACK_STATUS_MAX_AGE):
+        self.provider = provider
+        self.max_age = max_age
+        self.lock = Lock()
+        self.watched = set()
+        self.stacks = {}
+        self.swept_at = None
+        # The number of pages the last sweep took. A sweep is only made when
+        # more stacks are being waited on than this, since otherwise calling
+        # DescribeStacks for each of them is cheaper.
+        self.sweep_pages = 1
+
+    def _fresh(self):
+        return (self.swept_at is not None and
+                time.time() - self.swept_at < self.max_age)
+
+    def _sweep(self):
+        logger.debug("Sweeping stack statuses for %d stacks.",
+                     len(self.watched))
+        paginator = self.provider.cloudformation.get_paginator(
+            "describe_stacks")
+        stacks = {}
+        pages = 0
+        try:
+            for page in paginator.paginate():
+                pages += 1
+                for stack in page["Stacks"]:
+                    stacks[stack["StackName"]] = stack
+        except botocore.exceptions.ClientError as e:
+            # e.g. credentials that can only describe specific stacks, or
+            # throttling. Leaving the sweep empty makes every waiting step
+            # describe its own stack until the next sweep is due.
+            logger.debug("Unable to sweep stack statuses, describing "
+                         "stacks individually: %s", e)
+            stacks = {}
+            pages = self.sweep_pages
+        self.stacks = stacks
+        self.sweep_pages = pages
+        self.swept_at = time.time()
+
+    def invalidate(self, stack_name):
+        """Forgets what the last sweep said about a stack, after it's been
+        changed.
+
+        Sweeps are made while holding the lock, so one that started before
+        the change either finishes before the stack is forgotten, or can't
+        have seen the change's results.
+        """
+        with self.lock:
+            self.stacks.pop(stack_name, None)
+
+    def get_stack(self, stack_name):
+        """Returns the current description of a stack that is being waited
+        on.
+
+        Args:
+            stack_name (str): the name of the stack.
+
+        Returns:
+            dict: the stack, as returned by DescribeStacks.
+
+        Raises:
+            :class:`stacker.exceptions.StackDoesNotExist`: raised if the stack
+                does not exist.
+        """
+        with self.lock:
+            self.watched.add(stack_name)
+            if not self._fresh() and len(self.watched) > self.sweep_pages:
+                self._sweep()
+            stack = self.stacks.get(stack_name) if self._fresh() else None
+
+        done = True
+        try:
+            # Stacks missing from a sweep are either gone, or too new to show
+            # up in it yet, so always confirm with DescribeStacks.
+            if stack is None:
+                stack = self.provider.get_stack(stack_name, refresh=True)
+            done = not (self.provider.is_stack_in_progress(stack) or
+                        self.provider.is_stack_rolling_back(stack))
+            return stack
+        finally:
+            if done:
+                with self.lock:
+                    self.watched.discard(stack_name)
+
+
+class _PendingDescribe(object):
+    """A DescribeStacks call in flight, shared by every thread waiting on
+    it."""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class StackCache(object):
+    """A thread-safe cache of stack descriptions.
+
+    Descriptions are kept for ``ttl`` seconds. Concurrent requests for a
+    stack that isn't cached share a single call to ``describe``, rather than
+    each making their own. The provider invalidates a stack whenever stacker
+    creates, updates or deletes it.
+
+    The cache can also be seeded with descriptions from elsewhere (see
+    :meth:`put`), including the knowledge that a stack doesn't exist.
+
+    Args:
+        describe (func): returns the description of the stack with the given
+            name.
+        ttl (int, optional): how long, in seconds, descriptions are kept for.
+    """
+
+    def __init__(self, describe, ttl=STACK_CACHE_TTL):
+        self.describe = describe
+        self.ttl = ttl
+        self.lock = Lock()
+        # Maps stack names to (expiry time, description) tuples, where the
+        # description is None for stacks known not to exist.
+        self.stacks = {}
+        self.pending = {}
+
+    def get(self, stack_name):
+        """Returns the description of a stack.
+
+        Raises:
+            :class:`stacker.exceptions.StackDoesNotExist`: raised if the stack
+                does not exist. This isn't cached.
+        """
+        with self.lock:
+            cached = self.stacks.get(stack_name)
+            if cached and time.time() < cached[0]:
+                if cached[1] is None:
+                    raise exceptions.StackDoesNotExist(stack_name)
+                return cached[1]
+            request = self.pending.get(stack_name)
+            if request is not None:
+                leader = False
+            else:
+                leader = True
+                request = self.pending[stack_name] = _PendingDescribe()
+
+        if not leader:
+            return request.wait()
+
+        try:
+            request.result = self.describe(stack_name)
+            return request.result
+        except BaseException as e:
+            # Including e.g. KeyboardInterrupt, so that it isn't mistaken for
+            # the stack not existing, and waiting threads don't get None.
+            request.error = e
+            raise
+        finally:
+            with self.lock:
+                # The request is no longer pending if the stack was
+                # invalidated while it was in flight, in which case the
+                # result may be from before the change, so isn't kept.
+                if self.pending.get(stack_name) is request:
+                    del self.pending[stack_name]
+                    if request.error is None:
+                        self.stacks[stack_name] = (time.time() + self.ttl,
+                                                   request.result)
+            request.done.set()
+
+    def put(self, stack_name, stack, ttl=None):
+        """Seeds the cache with the description of a stack.
+
+        Args:
+            stack_name (str): the name of the stack.
+            stack (dict): the description of the stack, or None if it's
+                known not to exist.
+            ttl (int, optional): how long, in seconds, to keep it for.
+                Defaults to the cache's ttl.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        with self.lock:
+            self.stacks[stack_name] = (time.time() + ttl, stack)
+
+    def invalidate(self, stack_name):
+        """Forgets the description of a stack."""
+        with self.lock:
+            self.stacks.pop(stack_name, None)
+            self.pending.pop(stack_name, None)
+
+
+class _TailCursor(object):
+    """The state of a stack being tailed by a :class:`StackEventTailer`."""
+
+    def __init__(self, log_func):
+        self.log_func = log_func
+        # The EventId of the last event seen, once the stack has been read.
+        self.last_seen = None
+        self.started = False
+        # The number of reads in a row that failed because the stack didn't
+        # exist.
+        self.missing = 0
+
+
+class StackEventTailer(object):
+    """Tails the events of every stack being worked on, from a single thread.
+
+    Rather than each step tailing its own stack in its own thread, steps
+    register their stacks with the tailer, which keeps a cursor (the last
+    event seen) for each of them. Every ``sleep_time`` seconds, it reads back
+    through each stack's events as far as its cursor (see
+    :meth:`Provider.iter_events`), and logs the new ones in order. The reads
+    of all the stacks are spaced out to at most ``max_rate`` per second.
+
+    The thread is started when a stack is first watched, and stops once
+    there are no stacks left to tail.
+
+    Args:
+        provider (:class:`Provider`): the provider to read events with.
+        sleep_time (int, optional): how long, in seconds, to wait between
+            reads of each stack.
+        max_rate (int, optional): the most reads to make per second.
+    """
+
+    def __init__(self, provider, sleep_time=TAIL_SLEEP_TIME,
+                 max_rate=TAIL_MAX_RATE):
+        self.provider = provider
+        self.sleep_time = sleep_time
+        self.max_rate = max_rate
+        self.lock = Lock()
+        self.cursors = {}
+        self.thread = None
+        self.last_read = 0
+
+    def watch(self, stack_name, log_func):
+        """Starts tailing the events of a stack.
+
+        Only events that happen from now on are logged, unless the stack
+        doesn't exist yet, in which case every event is logged once it does.
+
+        Args:
+            stack_name (str): the name of the stack to tail.
+            log_func (func): called with each new event.
+        """
+        with self.lock:
+            self.cursors[stack_name] = _TailCursor(log_func)
+            if self.thread is None:
+                self.thread = Thread(target=self._run,
+                                     name="stacker-tail-%s" % (
+                                         self.provider.region,))
+                self.thread.daemon = True
+                self.thread.start()
+
+    def unwatch(self, stack_name):
+        """Stops tailing the events of a stack."""
+        with self.lock:
+            self.cursors.pop(stack_name, None)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if not self.cursors:
+                    self.thread = None
+                    return
+                stack_names = list(self.cursors)
+            for stack_name in stack_names:
+                with self.lock:
+                    cursor = self.cursors.get(stack_name)
+                if cursor is None:
+                    continue
+                self._pace()
+                try:
+                    self._read(stack_name, cursor)
+                except Exception as e:
+                    self._failed(stack_name, cursor, e)
+            time.sleep(self.sleep_time)
+
+    def _pace(self):
+        wait = self.last_read + 1.0 / self.max_rate - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_read = time.time()
+
+    def _read(self, stack_name, cursor):
+        if not cursor.started:
+            latest = next(self.provider.iter_events(stack_name), None)
+            cursor.started = True
+            if latest:
+                cursor.last_seen = latest['EventId']
+            return
+
+        events = list(self.provider.iter_events(stack_name,
+                                                until=cursor.last_seen))
+        cursor.missing = 0
+        for event in reversed(events):
+            cursor.log_func(event)
+        if events:
+            cursor.last_seen = events[0]['EventId']
+
+    def _failed(self, stack_name, cursor, e):
+        if isinstance(e, botocore.exceptions.ClientError) and \
+                e.response.get("Error", {}).get("Code") in THROTTLING_ERRORS:
+            # The cursor is unchanged, so the next pass picks up where this
+            # one left off.
+            logger.debug("Throttled while tailing stack %s, retrying on the "
+                         "next pass.", stack_name)
+            return
+        if "does not exist" not in str(e):
+            logger.exception("Error tailing stack %s", stack_name)
+            self.unwatch(stack_name)
+            return
+        # The stack might be in the process of launching, so keep trying for
+        # a while. It's new, so every event it has is worth logging.
+        cursor.started = True
+        cursor.missing += 1
+        if cursor.missing >= MAX_TAIL_RETRIES:
+            logger.debug("Stopped tailing stack %s, it does not exist.",
+                         stack_name)
+            self.unwatch(stack_name)
+
 
 class Provider(BaseProvider):
 
-    """AWS CloudFormation Provider"""
+    """AWS CloudFormation Provider
+
+    The CloudFormation client (and, when no session is given, the boto3
+    session) is only created the first time it's used, so that actions that
+    never talk to AWS don't need credentials.
+
+    Args:
+        session (:class:`boto3.session.Session`): the session to create the
+            CloudFormation client with. If None, the session for region and
+            profile is used (see :func:`stacker.session_cache.get_session`).
+        region (str, optional): the region the provider works in.
+        profile (str, optional): the profile used when no session is given.
+    """
 
     DELETED_STATUS = "DELETE_COMPLETE"
 
@@ -603,17 +992,96 @@ class Provider(BaseProvider):
 
     def __init__(self, session, region=None, interactive=False,
                  replacements_only=False, recreate_failed=False,
-                 service_role=None, **kwargs):
+                 service_role=None, profile=None, **kwargs):
         self._outputs = {}
+        self._outputs_lock = Lock()
         self.region = region
-        self.cloudformation = get_cloudformation_client(session)
+        self.profile = profile
+        self._session = session
+        self._cloudformation = None
         self.interactive = interactive
         # replacements only is only used in interactive mode
         self.replacements_only = interactive and replacements_only
         self.recreate_failed = interactive or recreate_failed
         self.service_role = service_role
+        self.poller = StackStatusPoller(self)
+        self.tailer = StackEventTailer(self)
+        self.stack_cache = StackCache(self._describe_stack)
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = get_session(region=self.region,
+                                        profile=self.profile)
+        return self._session
+
+    @property
+    def cloudformation(self):
+        if self._cloudformation is None:
+            self._cloudformation = get_cloudformation_client(self.session)
+        return self._cloudformation
+
+    def prefetch_stacks(self, stack_names, ttl=STACK_PREFETCH_TTL):
+        """Seeds the stack cache with a paginated DescribeStacks sweep of the
+        region, so that the first lookup of each stack in a plan doesn't need
+        its own call.
+
+        Only the stacks in stack_names are cached, and the ones that aren't
+        found are cached as not existing. The sweep is given up if it takes
+        more pages than there are stacks in stack_names, since describing
+        them one by one is cheaper; the stacks found up until then are still
+        cached. If the sweep fails (e.g. the credentials can only describe
+        specific stacks), the stacks are described one by one instead.
 
-    def get_stack(self, stack_name, **kwargs):
+        Args:
+            stack_names (list): the names of the stacks that are about to be
+                looked up.
+            ttl (int, optional): how long, in seconds, to cache the results.
+        """
+        stack_names = set(stack_names)
+        if not stack_names:
+            return
+        paginator = self.cloudformation.get_paginator("describe_stacks")
+        found = set()
+        pages = 0
+        try:
+            for page in paginator.paginate():
+                pages += 1
+                for stack in page["Stacks"]:
+                    if stack["StackName"] in stack_names:
+                        self.stack_cache.put(stack["StackName"], stack, ttl)
+                        found.add(stack["StackName"])
+                if pages >= len(stack_names) and "NextToken" in page:
+                    logger.debug("Stopped prefetching stacks in %s after %d "
+                                 "pages.", self.region, pages)
+                    return
+        except botocore.exceptions.ClientError as e:
+            logger.debug("Unable to prefetch stacks in %s, they'll be "
+                         "described one by one: %s", self.region, e)
+            return
+        for stack_name in stack_names - found:
+            self.stack_cache.put(stack_name, None, ttl)
+
+    def get_stack(self, stack_name, refresh=False, **kwargs):
+        """Returns the description of a stack, which may have been cached
+        for a few seconds (see :class:`StackCache`), unless refresh is
+        True."""
+        if refresh:
+            self._forget_stack(stack_name)
+        return self.stack_cache.get(stack_name)
+
+    def invalidate_stack(self, stack_name):
+        """Forgets the cached description and outputs of a stack, and what
+        the last status sweep said about it, after it's been changed."""
+        self._forget_stack(stack_name)
+        self.poller.invalidate(stack_name)
+
+    def _forget_stack(self, stack_name):
+        self.stack_cache.invalidate(stack_name)
+        with self._outputs_lock:
+            self._outputs.pop(stack_name, None)
+
+    def _describe_stack(self, stack_name):
         try:
             return self.cloudformation.describe_stacks(
                 StackName=stack_name)['Stacks'][0]
@@ -622,6 +1090,12 @@ class Provider(BaseProvider):
                 raise
             raise exceptions.StackDoesNotExist(stack_name)
 
+    def poll_stack(self, stack_name, **kwargs):
+        """Gets a stack that we're waiting on, sharing DescribeStacks calls
+        with everything else that's waiting on a stack in the same region.
+        See :class:`StackStatusPoller`."""
+        return self.poller.get_stack(stack_name)
+
     def get_stack_status(self, stack, **kwargs):
         return stack['StackStatus']
 
@@ -646,7 +1120,8 @@ class Provider(BaseProvider):
     def is_stack_in_review(self, stack, **kwargs):
         return self.get_stack_status(stack) == self.REVIEW_STATUS
 
-    def tail_stack(self, stack, cancel, log_func=None, **kwargs):
+    @staticmethod
+    def _stack_event_logger(stack):
         def _log_func(e):
             event_args = [e['ResourceStatus'], e['ResourceType'],
                           e.get('ResourceStatusReason', None)]
@@ -654,8 +1129,27 @@ class Provider(BaseProvider):
             event_args = [arg for arg in event_args if arg]
             template = " ".join(["[%s]"] + ["%s" for _ in event_args])
             logger.info(template, *([stack.fqn] + event_args))
+        return _log_func
+
+    def watch_stack(self, stack, log_func=None):
+        """Starts tailing the events of a stack, alongside every other stack
+        being tailed with this provider (see :class:`StackEventTailer`).
+
+        Args:
+            stack (:class:`stacker.stack.Stack`): the stack to tail.
+            log_func (func, optional): called with each new event. Defaults
+                to logging it.
+
+        Returns:
+            func: stops tailing the stack when called.
+        """
+        log_func = log_func or self._stack_event_logger(stack)
+        logger.info("Tailing stack: %s", stack.fqn)
+        self.tailer.watch(stack.fqn, log_func)
+        return lambda: self.tailer.unwatch(stack.fqn)
 
-        log_func = log_func or _log_func
+    def tail_stack(self, stack, cancel, log_func=None, **kwargs):
+        log_func = log_func or self._stack_event_logger(stack)
 
         logger.info("Tailing stack: %s", stack.fqn)
 
@@ -682,63 +1176,70 @@ class Provider(BaseProvider):
                             e['ResourceType'],
                             e['EventId']))
 
-    def get_events(self, stack_name, chronological=True):
-        """Get the events in batches and return in chronological order"""
-        next_token = None
-        event_list = []
+    def iter_events(self, stack_name, until=None):
+        """Yields the events of a stack, newest first.
+
+        Pages of events are only fetched as they're needed, so stopping early
+        saves walking the rest of the stack's history.
+
+        Args:
+            stack_name (str): the name or id of the stack.
+            until (str, optional): the EventId of an event already seen. Only
+                the events newer than it are yielded.
+        """
+        args = {"StackName": stack_name}
         while True:
-            if next_token is not None:
-                events = self.cloudformation.describe_stack_events(
-                    StackName=stack_name, NextToken=next_token
-                )
-            else:
-                events = self.cloudformation.describe_stack_events(
-                    StackName=stack_name
-                )
-            event_list.append(events['StackEvents'])
-            next_token = events.get('NextToken', None)
+            response = self.cloudformation.describe_stack_events(**args)
+            for event in response['StackEvents']:
+                if event['EventId'] == until:
+                    return
+                yield event
+            next_token = response.get('NextToken')
             if next_token is None:
-                break
-            time.sleep(GET_EVENTS_SLEEP)
+                return
+            args["NextToken"] = next_token
+
+    def get_events(self, stack_name, chronological=True):
+        """Get every event of a stack, in chronological order, or newest first
+        if chronological is False."""
+        events = list(self.iter_events(stack_name))
         if chronological:
-            return reversed(sum(event_list, []))
-        else:
-            return sum(event_list, [])
+            events.reverse()
+        return events
 
     def get_rollback_status_reason(self, stack_name):
-        """Process events and returns latest roll back reason"""
-        event = next((item for item in self.get_events(stack_name,
-                      False) if item["ResourceStatus"] ==
-                      "UPDATE_ROLLBACK_IN_PROGRESS"), None)
-        if event:
-            reason = event["ResourceStatusReason"]
-            return reason
-        else:
-            event = next((item for item in self.get_events(stack_name)
-                          if item["ResourceStatus"] ==
-                          "ROLLBACK_IN_PROGRESS"), None)
-            reason = event["ResourceStatusReason"]
-            return reason
+        """Returns the reason for the latest roll back of a stack."""
+        for event in self.iter_events(stack_name):
+            if event["ResourceStatus"] in ("UPDATE_ROLLBACK_IN_PROGRESS",
+                                           "ROLLBACK_IN_PROGRESS"):
+                return event["ResourceStatusReason"]
 
     def tail(self, stack_name, cancel, log_func=_tail_print, sleep_time=5,
              include_initial=True):
         """Show and then tail the event log"""
-        # First dump the full list of events in chronological order and keep
-        # track of the events we've seen already
-        seen = set()
-        initial_events = self.get_events(stack_name)
-        for e in initial_events:
-            if include_initial:
+        # First dump the full list of events in chronological order, unless
+        # we're only interested in new events, in which case only the latest
+        # event is needed to know where to start from.
+        last_seen = None
+        if include_initial:
+            events = self.get_events(stack_name)
+            for e in events:
                 log_func(e)
-            seen.add(e['EventId'])
+            if events:
+                last_seen = events[-1]['EventId']
+        else:
+            latest = next(self.iter_events(stack_name), None)
+            if latest:
+                last_seen = latest['EventId']
 
-        # Now keep looping through and dump the new events
+        # Now keep looping through and dump the new events, only reading back
+        # as far as the last one we've seen.
         while True:
-            events = self.get_events(stack_name)
-            for e in events:
-                if e['EventId'] not in seen:
-                    log_func(e)
-                    seen.add(e['EventId'])
+            events = list(self.iter_events(stack_name, until=last_seen))
+            for e in reversed(events):
+                log_func(e)
+            if events:
+                last_seen = events[0]['EventId']
             if cancel.wait(sleep_time):
                 return
 
@@ -748,7 +1249,10 @@ class Provider(BaseProvider):
         if self.service_role:
             args["RoleARN"] = self.service_role
 
-        self.cloudformation.delete_stack(**args)
+        try:
+            self.cloudformation.delete_stack(**args)
+        finally:
+            self.invalidate_stack(args["StackName"])
         return True
 
     def create_stack(
@@ -783,37 +1287,39 @@ class Provider(BaseProvider):
         else:
             logger.debug("    no template url, uploading template "
                          "directly.")
-        if force_change_set:
-            logger.debug("force_change_set set to True, creating stack with "
-                         "changeset.")
-            _changes, change_set_id = create_change_set(
-                self.cloudformation, fqn, template, parameters, tags,
-                'CREATE', service_role=self.service_role, **kwargs
-            )
+        try:
+            if force_change_set:
+                logger.debug("force_change_set set to True, creating stack "
+                             "with changeset.")
+                _changes, change_set_id = create_change_set(
+                    self.cloudformation, fqn, template, parameters, tags,
+                    'CREATE', service_role=self.service_role, **kwargs
+                )
 
-            self.cloudformation.execute_change_set(
-                ChangeSetName=change_set_id,
-            )
-        else:
-            args = generate_cloudformation_args(
-                fqn, parameters, tags, template,
-                service_role=self.service_role,
-                stack_policy=stack_policy,
-                notification_arns=notification_arns
-            )
+                self.cloudformation.execute_change_set(
+                    ChangeSetName=change_set_id,
+                )
+            else:
+                args = generate_cloudformation_args(
+                    fqn, parameters, tags, template,
+                    service_role=self.service_role,
+                    stack_policy=stack_policy,
+                    notification_arns=notification_arns
+                )
 
-            try:
-                self.cloudformation.create_stack(**args)
-            except botocore.exceptions.ClientError as e:
-                if e.response['Error']['Message'] == ('TemplateURL must '
-                                                      'reference a valid S3 '
-                                                      'object to which you '
-                                                      'have access.'):
-                    s3_fallback(fqn, template, parameters, tags,
-                                self.cloudformation.create_stack,
-                                self.service_role)
-                else:
-                    raise
+                try:
+                    self.cloudformation.create_stack(**args)
+                except botocore.exceptions.ClientError as e:
+                    if e.response['Error']['Message'] == (
+                            'TemplateURL must reference a valid S3 object to '
+                            'which you have access.'):
+                        s3_fallback(fqn, template, parameters, tags,
+                                    self.cloudformation.create_stack,
+                                    self.service_role)
+                    else:
+                        raise
+        finally:
+            self.invalidate_stack(fqn)
 
     def select_update_method(self, force_interactive, force_change_set):
         """Select the correct update method when updating a stack.
@@ -934,8 +1440,12 @@ class Provider(BaseProvider):
         update_method = self.select_update_method(force_interactive,
                                                   force_change_set)
 
-        return update_method(fqn, template, old_parameters, parameters,
-                             stack_policy=stack_policy, tags=tags, **kwargs)
+        try:
+            return update_method(fqn, template, old_parameters, parameters,
+                                 stack_policy=stack_policy, tags=tags,
+                                 **kwargs)
+        finally:
+            self.invalidate_stack(fqn)
 
     def deal_with_changeset_stack_policy(self, fqn, stack_policy):
         """ Set a stack policy when using changesets.
@@ -1101,10 +1611,13 @@ class Provider(BaseProvider):
         return stack['Tags']
 
     def get_outputs(self, stack_name, *args, **kwargs):
-        if stack_name not in self._outputs:
-            stack = self.get_stack(stack_name)
-            self._outputs[stack_name] = get_output_dict(stack)
-        return self._outputs[stack_name]
+        with self._outputs_lock:
+            outputs = self._outputs.get(stack_name)
+        if outputs is None:
+            outputs = get_output_dict(self.get_stack(stack_name))
+            with self._outputs_lock:
+                outputs = self._outputs.setdefault(stack_name, outputs)
+        return outputs
 
     def get_output_dict(self, stack):
         return get_output_dict(stack)
@@ -1168,6 +1681,8 @@ class Provider(BaseProvider):
             self.cloudformation, stack.fqn, template, parameters, tags,
             change_type, service_role=self.service_role, **kwargs
         )
+        # a change set of type CREATE creates a temporary stack
+        self.stack_cache.invalidate(stack.fqn)
         new_parameters_as_dict = self.params_as_dict(
             [x
              if 'ParameterValue' in x
@@ -1198,8 +1713,8 @@ class Provider(BaseProvider):
             ChangeSetName=change_set_id
         )
 
-        # ensure current stack outputs are loaded
-        self.get_outputs(stack.fqn)
+        # start from the current stack outputs
+        outputs = dict(self.get_outputs(stack.fqn))
 
         # infer which outputs may have changed
         refs_to_invalidate = []
@@ -1217,15 +1732,15 @@ class Provider(BaseProvider):
         # invalidate cached outputs with inferred changes
         for output, props in old_template.get('Outputs', {}).items():
             if any(r in str(props['Value']) for r in refs_to_invalidate):
-                self._outputs[stack.fqn].pop(output)
+                outputs.pop(output)
                 logger.debug('Removed %s from the outputs of %s',
                              output, stack.fqn)
 
         # push values for new + invalidated outputs to outputs
         for output_name, output_params in \
                 stack.blueprint.get_output_definitions().items():
-            if output_name not in self._outputs[stack.fqn]:
-                self._outputs[stack.fqn][output_name] = (
+            if output_name not in outputs:
+                outputs[output_name] = (
                     '<inferred-change: {}.{}={}>'.format(
                         stack.fqn, output_name,
                         str(output_params['Value'])
@@ -1246,7 +1761,11 @@ class Provider(BaseProvider):
                 # not an issue if the stack was already cleaned up
                 logger.debug('Stack does not exist: %s', stack.fqn)
 
-        return self.get_outputs(stack.fqn)
+        # the inferred outputs stand in for the real ones, for stacks that
+        # depend on this one
+        with self._outputs_lock:
+            self._outputs[stack.fqn] = outputs
+        return outputs
 
     @staticmethod
     def params_as_dict(parameters_list):
@@ -15,6 +15,16 @@ class BaseProvider(object):
         # pylint: disable=unused-argument
         not_implemented("get_stack")
 
+    def poll_stack(self, stack_name, *args, **kwargs):
+        """Gets a stack that is being waited on. Providers can override this
+        to share polling between stacks."""
+        return self.get_stack(stack_name, *args, **kwargs)
+
+    def prefetch_stacks(self, stack_names):
+        """Called with the names of the stacks in a plan before it's
+        executed. Providers can override this to look them all up at once."""
+        pass
+
     def create_stack(self, *args, **kwargs):
         # pylint: disable=unused-argument
         not_implemented("create_stack")
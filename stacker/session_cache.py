@@ -1,5 +1,18 @@
-import boto3
+import datetime
 import logging
+import os
+from contextlib import contextmanager
+from threading import Lock
+
+from botocore.utils import JSONFileCache
+from dateutil.parser import parse as parse_date
+from dateutil.tz import tzutc
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover (Windows)
+    fcntl = None
+
 from .ui import ui
 
 
@@ -13,9 +26,194 @@ credential_cache = {}
 
 default_profile = None
 
+# Cached credentials that expire within this many seconds are treated as
+# expired, so that they aren't handed out just before they stop working.
+CREDENTIAL_EXPIRY_WINDOW = 5 * 60
+
+
+class FileCredentialCache(JSONFileCache):
+    """A credential cache for the assume role provider, kept as JSON files in
+    a directory, so that it's shared between stacker processes.
+
+    This is botocore's :class:`botocore.utils.JSONFileCache`, with the
+    directory only accessible by its owner, and reads and writes done under
+    a lock file (on platforms with ``fcntl``), so concurrent processes never
+    see partly written credentials. Credentials that have expired, or are
+    about to, are treated as missing.
+
+    Args:
+        path (str): the directory to keep the credentials in.
+        expiry_window (int, optional): how many seconds before they expire
+            credentials are treated as expired.
+    """
+
+    def __init__(self, path, expiry_window=CREDENTIAL_EXPIRY_WINDOW):
+        super(FileCredentialCache, self).__init__(path)
+        self.path = path
+        self.expiry_window = expiry_window
+
+    @contextmanager
+    def _lock(self, shared=False):
+        # Other stacker processes may be creating the directory too.
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(os.path.join(self.path, ".lock"),
+                     os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _expired(self, value):
+        try:
+            expiration = value["Credentials"]["Expiration"]
+        except (KeyError, TypeError):
+            return False
+        expires_at = parse_date(expiration)
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=tzutc())
+        remaining = expires_at - datetime.datetime.now(tzutc())
+        return remaining.total_seconds() < self.expiry_window
+
+    def _serialize_if_needed(self, value, iso=False):
+        # Keep the timezone of expiration times, which botocore's default
+        # format doesn't for every timezone.
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        return super(FileCredentialCache, self)._serialize_if_needed(
+            value, iso)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key):
+        try:
+            with self._lock(shared=True):
+                value = super(FileCredentialCache, self).__getitem__(key)
+        except OSError:
+            raise KeyError(key)
+        if self._expired(value):
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock():
+            super(FileCredentialCache, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        with self._lock():
+            try:
+                os.remove(self._convert_cache_key(key))
+            except OSError:
+                raise KeyError(key)
+
+
+def use_file_credential_cache(stacker_cache_dir=None):
+    """Shares assume role credentials between stacker processes, by caching
+    them on disk under the stacker cache directory (``~/.stacker`` by
+    default).
+
+    Args:
+        stacker_cache_dir (str, optional): the stacker cache directory.
+    """
+    global credential_cache
+    stacker_cache_dir = os.path.expanduser(stacker_cache_dir or "~/.stacker")
+    credential_cache = FileCredentialCache(
+        os.path.join(stacker_cache_dir, "credentials"))
+    # Sessions that have already been made use the old cache.
+    clear_sessions()
+
+
+# Sessions are memoized by region and profile, since creating one re-reads
+# the AWS config files and rebuilds botocore's loaders.
+sessions = {}
+sessions_lock = Lock()
+
+# botocore's default size of each client's connection pool.
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+max_pool_connections = DEFAULT_MAX_POOL_CONNECTIONS
+
+
+def clear_sessions():
+    """Forgets every memoized session, and with them their clients, so that
+    the next call to :func:`get_session` builds a new one (e.g. between
+    tests that stub clients)."""
+    with sessions_lock:
+        sessions.clear()
+
+
+def set_max_pool_connections(size):
+    """Sets the size of the connection pools of clients created from now on,
+    so that many threads sharing a client don't have to wait on (or throw
+    away) connections. It's never set lower than botocore's default.
+
+    Args:
+        size (int): the number of threads expected to use each client at
+            once.
+    """
+    global max_pool_connections
+    max_pool_connections = max(size, DEFAULT_MAX_POOL_CONNECTIONS)
+
+
+class PooledSession(object):
+    """A boto3 session that reuses its clients.
+
+    Clients are thread-safe, but sessions aren't, so clients are created
+    under a lock, and each is shared by every caller asking for the same
+    service and configuration. Everything else is passed through to the
+    underlying :class:`boto3.session.Session`.
+
+    boto3 takes a while to import, so it's only imported when the first
+    session is made, rather than by every stacker command.
+    """
+
+    def __init__(self, *args, **kwargs):
+        import boto3
+        self._boto3_session = boto3.Session(*args, **kwargs)
+        self._clients = {}
+        self._clients_lock = Lock()
+
+    def __getattr__(self, name):
+        return getattr(self._boto3_session, name)
+
+    def client(self, service_name, config=None, **kwargs):
+        from botocore.config import Config
+
+        pool_size = max_pool_connections
+        # kwargs can hold unhashable values, so they're keyed on their repr.
+        key = (service_name, _config_key(config),
+               repr(sorted(kwargs.items())), pool_size)
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                pool_config = Config(max_pool_connections=pool_size)
+                if config is not None:
+                    pool_config = config.merge(pool_config)
+                client = self._boto3_session.client(
+                    service_name, config=pool_config, **kwargs)
+                self._clients[key] = client
+            return client
+
+
+def _config_key(config):
+    if config is None:
+        return None
+    return repr(sorted(config._user_provided_options.items()))
+
 
 def get_session(region, profile=None):
-    """Creates a boto3 session with a cache
+    """Gets a boto3 session with a cache
+
+    Sessions are shared by every caller asking for the same region and
+    profile, as are the clients they create (see :class:`PooledSession`).
 
     Args:
         region (str): The region for the session
@@ -30,12 +228,16 @@ def get_session(region, profile=None):
                      "Falling back to default.")
         profile = default_profile
 
-    logger.debug("Building session using profile \"%s\" in region \"%s\""
-                 % (profile, region))
+    with sessions_lock:
+        session = sessions.get((region, profile))
+        if session is None:
+            logger.debug("Building session using profile \"%s\" in region "
+                         "\"%s\"" % (profile, region))
 
-    session = boto3.Session(region_name=region, profile_name=profile)
-    c = session._session.get_component('credential_provider')
-    provider = c.get_provider('assume-role')
-    provider.cache = credential_cache
-    provider._prompter = ui.getpass
+            session = PooledSession(region_name=region, profile_name=profile)
+            c = session._session.get_component('credential_provider')
+            provider = c.get_provider('assume-role')
+            provider.cache = credential_cache
+            provider._prompter = ui.getpass
+            sessions[(region, profile)] = session
     return session
@@ -6,8 +6,6 @@ from .variables import (
     resolve_variables,
 )
 
-from .blueprints.raw import RawTemplateBlueprint
-
 
 def _gather_variables(stack_def):
     """Merges context provided & stack defined variables.
@@ -38,6 +36,38 @@ def _gather_variables(stack_def):
     return [Variable(k, v) for k, v in variable_values.items()]
 
 
+def stack_requires(definition, variables=None):
+    """Returns the names of the stacks that a stack requires, either
+    explicitly or through the output lookups in its variables.
+
+    Args:
+        definition (:class:`stacker.config.Stack`): A stack definition.
+        variables (list, optional): The stack's parsed variables. If not
+            given, they're parsed from the definition.
+
+    Returns:
+        set: the names of the required stacks.
+
+    Raises:
+        ValueError: Raised when a variable refers to an output of the stack
+            itself.
+    """
+    if variables is None:
+        variables = _gather_variables(definition)
+    requires = set(definition.requires or [])
+
+    # Add any dependencies based on output lookups
+    for variable in variables:
+        deps = variable.dependencies()
+        if definition.name in deps:
+            message = (
+                "Variable %s in stack %s has a circular reference"
+            ) % (variable.name, definition.name)
+            raise ValueError(message)
+        requires.update(deps)
+    return requires
+
+
 class Stack(object):
 
     """Represents gathered information about a stack to be built/updated.
@@ -54,6 +84,9 @@ class Stack(object):
         protected (boot, optional): Whether this stack is protected.
         notification_arns (list, optional): An optional list of SNS topic ARNs
             to send CloudFormation Events to.
+        requires (list, optional): The names of the stacks this stack
+            requires, when they're already known (see
+            :class:`stacker.config.cache.CompiledConfigCache`).
 
     """
 
@@ -66,6 +99,7 @@ class Stack(object):
         enabled=True,
         protected=False,
         notification_arns=None,
+        requires=None,
     ):
         self.logging = True
         self.name = definition.name
@@ -82,7 +116,9 @@ class Stack(object):
         self.context = context
         self.outputs = None
         self.in_progress_behavior = definition.in_progress_behavior
+        self.priority = definition.priority
         self.notification_arns = notification_arns
+        self._requires = requires
 
     def __repr__(self):
         return self.fqn
@@ -93,18 +129,11 @@ class Stack(object):
 
     @property
     def requires(self):
-        requires = set(self.definition.requires or [])
-
-        # Add any dependencies based on output lookups
-        for variable in self.variables:
-            deps = variable.dependencies()
-            if self.name in deps:
-                message = (
-                    "Variable %s in stack %s has a circular reference"
-                ) % (variable.name, self.name)
-                raise ValueError(message)
-            requires.update(deps)
-        return requires
+        # Parsing the dependencies out of the variables means walking every
+        # lookup in them, so it's only done once.
+        if self._requires is None:
+            self._requires = stack_requires(self.definition, self.variables)
+        return set(self._requires)
 
     @property
     def stack_policy(self):
@@ -129,6 +158,7 @@ class Stack(object):
                                          "\"rendered\" "
                                          "attribute." % (class_path,))
             elif self.definition.template_path:
+                from .blueprints.raw import RawTemplateBlueprint
                 blueprint_class = RawTemplateBlueprint
                 kwargs["raw_template_path"] = self.definition.template_path
             else:
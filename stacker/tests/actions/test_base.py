@@ -1,4 +1,6 @@
 
+import asyncio
+import threading
 import unittest
 
 import mock
@@ -7,14 +9,29 @@ import botocore.exceptions
 from botocore.stub import Stubber, ANY
 
 from stacker.actions.base import (
-    BaseAction
+    STACK_POLL_TIME,
+    BaseAction,
+    LookupBatches,
+    build_walker,
+    plan,
+    stack_groups,
+    stack_priorities,
 )
 from stacker.blueprints.base import Blueprint
+from stacker.dag import DAG
+from stacker.lookups import register_lookup_handler
+from stacker.lookups.registry import unregister_lookup_handler
 from stacker.providers.aws.default import Provider
 from stacker.session_cache import get_session
+from stacker.config import Target as TargetDefinition
+from stacker.stack import Stack
+from stacker.status import COMPLETE
+from stacker.target import Target
 
 from stacker.tests.factories import (
+    BatchLookup,
     MockProviderBuilder,
+    generate_definition,
     mock_context,
 )
 
@@ -144,3 +161,223 @@ class TestBaseAction(unittest.TestCase):
                     MOCK_VERSION
                 )
             )
+
+    def test_build_walker_priorities(self):
+        context = mock_context("mynamespace")
+        stacks = [
+            Stack(definition=generate_definition("vpc", 1), context=context),
+            Stack(definition=generate_definition("vpc", 2, priority=5),
+                  context=context),
+            Stack(definition=generate_definition(
+                "bastion", 1, requires=["vpc.1"]), context=context),
+            Target(TargetDefinition({"name": "all"})),
+        ]
+        priorities = stack_priorities(stacks)
+        self.assertEqual(priorities, {"vpc.2": 5})
+
+        dag = DAG()
+        dag.from_dict({"vpc.1": [], "vpc.2": [], "bastion.1": ["vpc.1"]})
+        walker = build_walker(2, priorities=priorities)
+        priority = walker.__self__.priority(dag)
+        # Configured priorities take precedence over the critical path.
+        self.assertGreater(priority["vpc.2"], priority["vpc.1"])
+        self.assertGreater(priority["vpc.1"], priority["bastion.1"])
+
+    def test_build_walker_asyncio(self):
+        context = mock_context("mynamespace")
+        action = BaseAction(
+            context=context,
+            provider_builder=MockProviderBuilder(mock.MagicMock()))
+        plan = mock.MagicMock(steps=[])
+
+        walker = action._build_walker(plan, 2, engine="threads")
+        self.assertFalse(asyncio.iscoroutinefunction(walker))
+        self.assertEqual(action.poll_time, STACK_POLL_TIME)
+
+        walker = action._build_walker(plan, 2, engine="asyncio")
+        self.assertTrue(asyncio.iscoroutinefunction(walker))
+        # The walker waits between polls instead of the stack actions.
+        self.assertEqual(walker.__self__.poll_time, STACK_POLL_TIME)
+        self.assertEqual(action.poll_time, 0)
+
+    def test_prefetch_stacks(self):
+        context = mock_context("mynamespace")
+        stacks = [
+            Stack(definition=generate_definition("vpc", 1), context=context),
+            Stack(definition=generate_definition("vpc", 2), context=context),
+            Stack(definition=generate_definition(
+                "vpc", 3, region="us-west-2"), context=context),
+            Target(TargetDefinition({"name": "all"})),
+        ]
+        provider_builder = mock.MagicMock(region="us-east-1")
+        action = BaseAction(context=context,
+                            provider_builder=provider_builder)
+        plan = mock.MagicMock(
+            steps=[mock.MagicMock(stack=stack) for stack in stacks])
+
+        action._prefetch_stacks(plan)
+        self.assertEqual(provider_builder.build.call_args_list, [
+            mock.call(region=None, profile=None),
+            mock.call(region="us-west-2", profile=None),
+        ])
+        prefetch_stacks = provider_builder.build.return_value.prefetch_stacks
+        self.assertEqual(prefetch_stacks.call_args_list, [
+            mock.call(["mynamespace-vpc.1", "mynamespace-vpc.2"]),
+            mock.call(["mynamespace-vpc.3"]),
+        ])
+
+    def test_size_connection_pools(self):
+        action = BaseAction(context=mock_context("mynamespace"),
+                            provider_builder=mock.MagicMock())
+        plan = mock.MagicMock(steps=[mock.MagicMock()] * 20)
+
+        with mock.patch("stacker.actions.base.set_max_pool_connections") \
+                as set_max_pool_connections:
+            action._size_connection_pools(plan)
+            action._size_connection_pools(plan, 5, 3)
+        self.assertEqual(set_max_pool_connections.call_args_list, [
+            mock.call(20), mock.call(8)])
+
+    def test_lookup_batches(self):
+        register_lookup_handler("batch", BatchLookup)
+        self.addCleanup(unregister_lookup_handler, "batch")
+        BatchLookup.batches = []
+
+        context = mock_context("mynamespace", extra_config_args={"stacks": [
+            {"name": "vpc", "class_path": "blueprints.VPC",
+             "variables": {"Param1": "${batch vpc}"}},
+            {"name": "app", "class_path": "blueprints.App",
+             "requires": ["vpc"],
+             "variables": {"Param1": "${batch app}"}},
+            {"name": "db", "class_path": "blueprints.DB",
+             "variables": {"Param1": "${batch db}"}},
+            {"name": "bastion", "class_path": "blueprints.Bastion"},
+        ]})
+        batches = LookupBatches(
+            plan(description="Test", stack_action=None, context=context),
+            context, lambda stack: None)
+        self.assertEqual(set(batches.pending), {"vpc", "app", "db"})
+
+        # The lookups of app wait for vpc to be done.
+        batches.resolve(context.get_stack("db"))
+        self.assertEqual(BatchLookup.batches, [["db", "vpc"]])
+        self.assertTrue(context.get_stack("vpc").variables[0].resolved)
+        self.assertFalse(context.get_stack("app").variables[0].resolved)
+        batches.resolve(context.get_stack("vpc"))
+        self.assertEqual(len(BatchLookup.batches), 1)
+
+        step = batches.pending["app"]
+        batches.graph.steps["vpc"].set_status(COMPLETE)
+        batches.resolve(step.stack)
+        self.assertEqual(BatchLookup.batches, [["db", "vpc"], ["app"]])
+        self.assertEqual(step.stack.variables[0].value, "batch:app")
+
+    def test_lookup_batches_locked_stacks(self):
+        register_lookup_handler("batch", BatchLookup)
+        self.addCleanup(unregister_lookup_handler, "batch")
+        BatchLookup.batches = []
+
+        context = mock_context("mynamespace", extra_config_args={"stacks": [
+            {"name": "vpc", "class_path": "blueprints.VPC",
+             "variables": {"Param1": "${batch vpc}"}},
+            {"name": "db", "class_path": "blueprints.DB", "locked": True,
+             "variables": {"Param1": "${batch db}"}},
+            {"name": "bastion", "class_path": "blueprints.Bastion",
+             "enabled": False,
+             "variables": {"Param1": "${batch bastion}"}},
+        ]})
+        batches = LookupBatches(
+            plan(description="Test", stack_action=None, context=context),
+            context, lambda stack: None)
+        self.assertEqual(set(batches.pending), {"vpc"})
+
+        batches.resolve(context.get_stack("vpc"))
+        self.assertEqual(BatchLookup.batches, [["vpc"]])
+        self.assertFalse(context.get_stack("db").variables[0].resolved)
+        self.assertFalse(context.get_stack("bastion").variables[0].resolved)
+
+    def test_lookup_batches_in_flight(self):
+        register_lookup_handler("batch", BatchLookup)
+        self.addCleanup(unregister_lookup_handler, "batch")
+
+        context = mock_context("mynamespace", extra_config_args={"stacks": [
+            {"name": "vpc", "class_path": "blueprints.VPC",
+             "variables": {"Param1": "${batch vpc}"}},
+            {"name": "db", "class_path": "blueprints.DB",
+             "variables": {"Param1": "${batch db}"}},
+            {"name": "bastion", "class_path": "blueprints.Bastion"},
+        ]})
+        batches = LookupBatches(
+            plan(description="Test", stack_action=None, context=context),
+            context, lambda stack: None)
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def resolve_lookups_in_batches(variables, context, provider):
+            started.set()
+            release.wait(5)
+            return len(variables)
+
+        finished = []
+
+        def resolve(name):
+            batches.resolve(context.get_stack(name))
+            finished.append(name)
+
+        with mock.patch("stacker.actions.base.resolve_lookups_in_batches",
+                        side_effect=resolve_lookups_in_batches):
+            leader = threading.Thread(target=resolve, args=("db",))
+            leader.start()
+            self.assertTrue(started.wait(5))
+
+            # Stacks without batched lookups aren't held up by the batch.
+            resolve("bastion")
+            self.assertEqual(finished, ["bastion"])
+
+            # Stacks in the batch wait for it to be done.
+            follower = threading.Thread(target=resolve, args=("vpc",))
+            follower.start()
+            follower.join(0.1)
+            self.assertTrue(follower.is_alive())
+
+            release.set()
+            leader.join(5)
+            follower.join(5)
+        self.assertEqual(sorted(finished), ["bastion", "db", "vpc"])
+        self.assertEqual(batches.in_flight, {})
+
+    def test_stack_groups(self):
+        context = mock_context("mynamespace")
+        stacks = [
+            Stack(definition=generate_definition("vpc", 1), context=context),
+            Stack(definition=generate_definition(
+                "vpc", 2, region="us-west-2", profile="prod"),
+                context=context),
+            Target(TargetDefinition({"name": "all"})),
+        ]
+
+        self.assertEqual(stack_groups(stacks), (
+            {"vpc.1": [], "vpc.2": []}, {}))
+
+        groups, group_limits = stack_groups(
+            stacks, max_per_region=2, max_per_profile=3,
+            default_region="us-east-1")
+        self.assertEqual(groups, {
+            "vpc.1": [("region", "us-east-1"), ("profile", None)],
+            "vpc.2": [("region", "us-west-2"), ("profile", "prod")],
+        })
+        self.assertEqual(group_limits, {
+            ("region", "us-east-1"): 2,
+            ("region", "us-west-2"): 2,
+            ("profile", None): 3,
+            ("profile", "prod"): 3,
+        })
+
+        groups, group_limits = stack_groups(
+            stacks, max_per_region=lambda region: "limit of %s" % region,
+            default_region="us-east-1")
+        self.assertEqual(group_limits, {
+            ("region", "us-east-1"): "limit of us-east-1",
+            ("region", "us-west-2"): "limit of us-west-2",
+        })
@@ -15,13 +15,14 @@ from stacker.blueprints.variables.types import CFNString
 from stacker.context import Context, Config
 from stacker.exceptions import StackDidNotChange, StackDoesNotExist
 from stacker.providers.base import BaseProvider
-from stacker.providers.aws.default import Provider
+from stacker.providers.aws.default import Provider, ProviderBuilder
 from stacker.status import (
     NotSubmittedStatus,
     COMPLETE,
     PENDING,
     SKIPPED,
     SUBMITTED,
+    WAITING,
     FAILED
 )
 
@@ -152,6 +153,16 @@ class TestBuildAction(unittest.TestCase):
             build_action.run(outline=False)
             self.assertEqual(mock_generate_plan().execute.call_count, 1)
 
+    @mock.patch("stacker.session_cache.sessions", {})
+    @mock.patch("stacker.session_cache.PooledSession")
+    def test_outline_does_not_create_sessions(self, mock_session):
+        context = self._get_context()
+        build_action = build.Action(
+            context, provider_builder=ProviderBuilder(region="us-east-1"),
+            cancel=MockThreadingEvent())
+        build_action.execute(outline=True)
+        self.assertEqual(mock_session.call_count, 0)
+
     def test_should_update(self):
         test_scenario = namedtuple("test_scenario",
                                    ["locked", "force", "result"])
@@ -240,15 +251,15 @@ class TestLaunchStack(TestBuildAction):
                     'Outputs': [],
                     'Tags': []}
 
-        def get_events(name, *args, **kwargs):
-            return [{'ResourceStatus': 'ROLLBACK_IN_PROGRESS',
-                    'ResourceStatusReason': 'CFN fail'}]
+        def iter_events(name, *args, **kwargs):
+            return iter([{'ResourceStatus': 'ROLLBACK_IN_PROGRESS',
+                          'ResourceStatusReason': 'CFN fail'}])
 
         patch_object(self.provider, 'get_stack', side_effect=get_stack)
         patch_object(self.provider, 'update_stack')
         patch_object(self.provider, 'create_stack')
         patch_object(self.provider, 'destroy_stack')
-        patch_object(self.provider, 'get_events', side_effect=get_events)
+        patch_object(self.provider, 'iter_events', side_effect=iter_events)
 
         patch_object(self.build_action, "s3_stack_push")
 
@@ -371,6 +382,38 @@ class TestLaunchStack(TestBuildAction):
         self._advance("UPDATE_COMPLETE", COMPLETE,
                       "updating existing stack")
 
+    def test_launch_stack_wait_prefetched(self):
+        self.stack.in_progress_behavior = "wait"
+
+        def describe(name):
+            return {'StackName': name,
+                    'StackStatus': 'UPDATE_COMPLETE',
+                    'Outputs': [],
+                    'Tags': []}
+
+        get_stack = Provider.get_stack.__get__(self.provider)
+        with mock.patch.object(self.provider, "get_stack", get_stack), \
+                mock.patch.object(self.provider.stack_cache, "describe",
+                                  side_effect=describe):
+            self.provider.stack_cache.put(
+                'vpc',
+                {'StackName': 'vpc',
+                 'StackStatus': 'UPDATE_IN_PROGRESS',
+                 'Outputs': [],
+                 'Tags': []},
+                ttl=300)
+
+            # the prefetched stack is still being updated
+            status = self.step._run_once()
+            self.assertEqual(status, WAITING)
+            self.assertEqual(status.reason, "waiting")
+
+            # once it's done, the stack should be described again rather
+            # than read from the prefetched description
+            status = self.step._run_once()
+            self.assertEqual(status, SUBMITTED)
+            self.assertEqual(status.reason, "updating existing stack")
+
 
 class TestFunctions(unittest.TestCase):
     """ test module level functions """
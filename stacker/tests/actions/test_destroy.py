@@ -76,6 +76,7 @@ class TestDestroyAction(unittest.TestCase):
         # it being successfully deleted)
         provider = mock.MagicMock()
         provider.get_stack.side_effect = StackDoesNotExist("mock")
+        provider.poll_stack.side_effect = StackDoesNotExist("mock")
         self.action.provider_builder = MockProviderBuilder(provider)
         status = self.action._destroy_stack(MockStack("vpc"), status=PENDING)
         # if we haven't processed the step (ie. has never been SUBMITTED,
@@ -108,6 +109,7 @@ class TestDestroyAction(unittest.TestCase):
 
         # simulate stack getting successfully deleted
         mock_provider.get_stack.side_effect = get_stack
+        mock_provider.poll_stack.side_effect = get_stack
         mock_provider.is_stack_destroyed.return_value = False
         mock_provider.is_stack_in_progress.return_value = False
 
@@ -5,6 +5,12 @@ import os
 import pytest
 import py.path
 
+from stacker.session_cache import (
+    DEFAULT_MAX_POOL_CONNECTIONS,
+    clear_sessions,
+    set_max_pool_connections,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +42,15 @@ def aws_credentials():
     saved_env.clear()
 
 
+@pytest.fixture(autouse=True)
+def fresh_sessions():
+    # Sessions and their clients are shared for the life of the process, so
+    # a client stubbed in one test would otherwise leak into the next.
+    yield
+    clear_sessions()
+    set_max_pool_connections(DEFAULT_MAX_POOL_CONNECTIONS)
+
+
 @pytest.fixture(scope="package")
 def stacker_fixture_dir():
     path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
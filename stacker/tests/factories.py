@@ -3,6 +3,7 @@ from mock import MagicMock
 from stacker.context import Context
 from stacker.config import Config, Stack
 from stacker.lookups import Lookup
+from stacker.lookups.handlers import LookupHandler
 
 
 class MockThreadingEvent(object):
@@ -55,6 +56,23 @@ def mock_lookup(lookup_input, lookup_type, raw=None):
     return Lookup(type=lookup_type, input=lookup_input, raw=raw)
 
 
+class BatchLookup(LookupHandler):
+    """A lookup handler that can be resolved in batches, which records each
+    batch it's given. The value "missing" fails in a batch."""
+
+    batches = []
+
+    @classmethod
+    def handle(cls, value, **kwargs):
+        return "one:" + value
+
+    @classmethod
+    def handle_batch(cls, values, **kwargs):
+        cls.batches.append(list(values))
+        return [ValueError(value) if value == "missing" else "batch:" + value
+                for value in values]
+
+
 class SessionStub(object):
 
     """Stubber class for boto3 sessions made with session_cache.get_session()
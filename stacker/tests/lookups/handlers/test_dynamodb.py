@@ -190,3 +190,83 @@ class TestDynamoDBHandler(unittest.TestCase):
                     'The dynamodb record could not be found using '
                     'the following key: {\'S\': \'FakeVal\'}',
                     str(e))
+
+    @mock.patch('stacker.lookups.handlers.dynamodb.get_session',
+                return_value=SessionStub(client))
+    def test_dynamodb_handle_batch(self, mock_client):
+        item = self.get_parameters_response['Item']
+        expected_params = {
+            'RequestItems': {
+                'TestTable': {
+                    'Keys': [
+                        {'TestKey': {'S': 'TestVal'}},
+                        {'TestKey': {'S': 'OtherVal'}},
+                    ],
+                    'ProjectionExpression':
+                        'TestVal,TestMap,String1,OtherVal,TestKey'
+                }
+            }
+        }
+        response = {
+            'Responses': {
+                'TestTable': [dict(item, TestKey={'S': 'TestVal'})]
+            }
+        }
+        self.stubber.add_response('batch_get_item', response,
+                                  expected_params)
+        with self.stubber:
+            results = DynamodbLookup.handle_batch([
+                'TestTable@TestKey:TestVal.TestMap[M].String1',
+                'TestTable@TestKey:OtherVal.TestMap[M].String1',
+                'TestTable@TestKey:TestVal.TestMap[M].String1',
+                'TestKey:TestVal.TestMap[M].String1',
+            ])
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(results[0], 'StringVal1')
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], 'StringVal1')
+        self.assertIsInstance(results[3], ValueError)
+
+    @mock.patch('stacker.lookups.handlers.dynamodb.time.sleep')
+    @mock.patch('stacker.lookups.handlers.dynamodb.get_session',
+                return_value=SessionStub(client))
+    def test_dynamodb_handle_batch_unprocessed_keys(self, mock_client,
+                                                    mock_sleep):
+        item = self.get_parameters_response['Item']
+        request = {
+            'Keys': [
+                {'TestKey': {'S': 'TestVal'}},
+                {'TestKey': {'S': 'OtherVal'}},
+            ],
+            'ProjectionExpression': 'TestVal,TestMap,String1,OtherVal,TestKey'
+        }
+        unprocessed = {
+            'Keys': [{'TestKey': {'S': 'OtherVal'}}],
+            'ProjectionExpression': 'TestVal,TestMap,String1,OtherVal,TestKey'
+        }
+        self.stubber.add_response(
+            'batch_get_item',
+            {'Responses': {
+                'TestTable': [dict(item, TestKey={'S': 'TestVal'})]},
+             'UnprocessedKeys': {'TestTable': unprocessed}},
+            {'RequestItems': {'TestTable': request}})
+        self.stubber.add_response(
+            'batch_get_item',
+            {'Responses': {'TestTable': []},
+             'UnprocessedKeys': {'TestTable': unprocessed}},
+            {'RequestItems': {'TestTable': unprocessed}})
+        self.stubber.add_response(
+            'batch_get_item',
+            {'Responses': {
+                'TestTable': [dict(item, TestKey={'S': 'OtherVal'})]}},
+            {'RequestItems': {'TestTable': unprocessed}})
+        with self.stubber:
+            results = DynamodbLookup.handle_batch([
+                'TestTable@TestKey:TestVal.TestMap[M].String1',
+                'TestTable@TestKey:OtherVal.TestMap[M].String1',
+            ])
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(results, ['StringVal1', 'StringVal1'])
+        # The unprocessed keys are retried with backoff.
+        self.assertEqual(mock_sleep.call_args_list,
+                         [mock.call(0.1), mock.call(0.2)])
@@ -69,3 +69,29 @@ class TestSSMStoreHandler(unittest.TestCase):
         with self.stubber:
             value = SsmstoreLookup.handle(temp_value)
             self.assertEqual(value, self.ssmvalue)
+
+    @mock.patch('stacker.lookups.handlers.ssmstore.get_session',
+                return_value=SessionStub(client))
+    def test_ssmstore_handle_batch(self, mock_client):
+        names = ['ssmkey%d' % i for i in range(12)]
+        self.stubber.add_response(
+            'get_parameters',
+            {'Parameters': [
+                {'Name': name, 'Type': 'String', 'Value': 'value-' + name}
+                for name in names[:10]]},
+            {'Names': names[:10], 'WithDecryption': True})
+        self.stubber.add_response(
+            'get_parameters',
+            {'Parameters': [
+                {'Name': 'ssmkey10', 'Type': 'String', 'Value': 'value10'}],
+             'InvalidParameters': ['ssmkey11']},
+            {'Names': names[10:], 'WithDecryption': True})
+        values = names + ['us-east-1@ssmkey0']
+        with self.stubber:
+            results = SsmstoreLookup.handle_batch(values)
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(results[:10],
+                         ['value-' + name for name in names[:10]])
+        self.assertEqual(results[10], 'value10')
+        self.assertIsInstance(results[11], ValueError)
+        self.assertEqual(results[12], 'value-ssmkey0')
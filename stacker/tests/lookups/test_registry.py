@@ -7,7 +7,8 @@ from stacker.exceptions import (
     FailedVariableLookup,
 )
 
-from stacker.lookups.registry import LOOKUP_HANDLERS
+from stacker.lookups.handlers.envvar import EnvvarLookup
+from stacker.lookups.registry import LOOKUP_HANDLERS, LookupHandlers
 
 from stacker.variables import Variable, VariableValueLookup
 
@@ -36,6 +37,20 @@ class TestRegistry(unittest.TestCase):
                     "Lookup handler: '{}' was not registered".format(handler),
                 )
 
+    def test_lookup_handlers_loaded_on_use(self):
+        handlers = LookupHandlers(
+            {"envvar": "stacker.lookups.handlers.envvar.EnvvarLookup"})
+        self.assertIn("envvar", handlers)
+        self.assertEqual(len(handlers), 0)
+        self.assertIs(handlers["envvar"], EnvvarLookup)
+        self.assertIs(handlers.get("envvar"), EnvvarLookup)
+        self.assertIsNone(handlers.get("bad_lookup"))
+
+        handlers.pop("envvar")
+        self.assertNotIn("envvar", handlers)
+        with self.assertRaises(KeyError):
+            handlers["envvar"]
+
     def test_resolve_lookups_string_unknown_lookup(self):
         with self.assertRaises(UnknownLookupType):
             Variable("MyVar", "${bad_lookup foo}")
@@ -0,0 +1,110 @@
+import unittest
+
+import boto3
+from botocore.stub import Stubber
+from mock import MagicMock, call, patch
+
+from stacker.providers.aws import adaptive
+from stacker.providers.aws.adaptive import AdaptiveConcurrency, AIMDLimit
+from stacker.providers.aws.default import ProviderBuilder
+
+
+class TestAIMDLimit(unittest.TestCase):
+
+    def test_increase(self):
+        limit = AIMDLimit("us-east-1", 2, maximum=3)
+        limit.succeeded(1)
+        self.assertEqual(limit.limit, 2)
+        limit.succeeded(1)
+        self.assertEqual(limit.limit, 3)
+        for _ in range(10):
+            limit.succeeded(1)
+        self.assertEqual(limit.limit, 3)
+        self.assertEqual(len(limit.changes), 1)
+
+    def test_slow_calls_dont_increase(self):
+        limit = AIMDLimit("us-east-1", 2)
+        limit.succeeded(1)
+        for _ in range(10):
+            limit.succeeded(10)
+        self.assertEqual(limit.limit, 2)
+
+    def test_decrease(self):
+        limit = AIMDLimit("us-east-1", 10)
+        for _ in range(20):
+            limit.pace()
+        limit.throttled("Throttling on DescribeStacks")
+        self.assertEqual(limit.limit, 5)
+        self.assertEqual(limit.rate, 1.0)
+        self.assertEqual(limit.changes[-1][1:], (
+            10, 5, "throttled (Throttling on DescribeStacks)"))
+
+        # Throttling right after a decrease is ignored.
+        limit.throttled("Throttling on DescribeStacks")
+        self.assertEqual(limit.limit, 5)
+        self.assertEqual(limit.throttles, 2)
+
+        with patch.object(adaptive, "DECREASE_COOLDOWN", 0):
+            limit.throttled("Throttling on DescribeStacks")
+            limit.throttled("Throttling on DescribeStacks")
+            limit.throttled("Throttling on DescribeStacks")
+        self.assertEqual(limit.limit, 1)
+        self.assertEqual(limit.rate, adaptive.MIN_RATE)
+
+    def test_decrease_blocks_acquire(self):
+        limit = AIMDLimit("us-east-1", 2)
+        self.assertTrue(limit.semaphore.acquire(False))
+        self.assertTrue(limit.semaphore.acquire(False))
+        limit.throttled("Throttling")
+        self.assertTrue(limit.semaphore.locked())
+        limit.semaphore.release()
+        self.assertTrue(limit.semaphore.locked())
+        limit.semaphore.release()
+        self.assertTrue(limit.semaphore.acquire(False))
+
+    def test_watch(self):
+        client = boto3.client("cloudformation", region_name="us-east-1")
+        limit = AIMDLimit("us-east-1", 4)
+        limit.watch(client)
+        limit.watch(client)
+
+        with Stubber(client) as stubber:
+            stubber.add_response("describe_stacks", {"Stacks": []})
+            client.describe_stacks()
+
+        self.assertEqual(limit.successes, 1)
+
+    def test_report(self):
+        limit = AIMDLimit("us-east-1", 4)
+        limit.throttled("Throttling")
+        lines = limit.report()
+        self.assertEqual(
+            lines[0],
+            "us-east-1: concurrency limit 2 (started at 4), API call rate "
+            "1.0/s, 1 throttled calls")
+        self.assertTrue(lines[1].endswith("4 -> 2: throttled (Throttling)"))
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+
+    def test_limit(self):
+        controller = AdaptiveConcurrency(maximum=5)
+        limit = controller.limit("us-east-1")
+        self.assertIs(controller.limit("us-east-1"), limit)
+        self.assertIsNot(controller.limit("us-west-2"), limit)
+        self.assertEqual(limit.limit, 5)
+        self.assertEqual(limit.maximum, 5)
+
+        self.assertEqual(
+            AdaptiveConcurrency().limit(None).limit, adaptive.DEFAULT_LIMIT)
+
+    def test_provider_builder_watch(self):
+        builder = ProviderBuilder(region="us-east-1")
+        east = builder.build()
+        controller = MagicMock()
+        builder.watch(controller)
+        west = builder.build(region="us-west-2")
+        self.assertEqual(controller.watch.call_args_list, [
+            call(east.cloudformation, "us-east-1"),
+            call(west.cloudformation, "us-west-2"),
+        ])
@@ -22,6 +22,9 @@ from stacker.providers.aws.default import (
     DEFAULT_CAPABILITIES,
     MAX_TAIL_RETRIES,
     Provider,
+    ProviderBuilder,
+    StackCache,
+    StackEventTailer,
     requires_replacement,
     ask_for_approval,
     wait_till_change_set_complete,
@@ -468,6 +471,94 @@ class TestMethods(unittest.TestCase):
         self.assertEqual(result, std_return)
 
 
+class TestStackCache(unittest.TestCase):
+
+    def test_ttl(self):
+        calls = []
+
+        def describe(stack_name):
+            calls.append(stack_name)
+            return {"StackName": stack_name, "Call": len(calls)}
+
+        cache = StackCache(describe, ttl=60)
+        self.assertEqual(cache.get("Stack1")["Call"], 1)
+        self.assertEqual(cache.get("Stack1")["Call"], 1)
+        self.assertEqual(cache.get("Stack2")["Call"], 2)
+        cache.invalidate("Stack1")
+        self.assertEqual(cache.get("Stack1")["Call"], 3)
+
+        cache.ttl = 0
+        self.assertEqual(cache.get("Stack3")["Call"], 4)
+        self.assertEqual(cache.get("Stack3")["Call"], 5)
+
+    def test_put(self):
+        cache = StackCache(MagicMock(side_effect=AssertionError))
+        cache.put("Stack1", {"StackName": "Stack1"})
+        cache.put("Stack2", None)
+        self.assertEqual(cache.get("Stack1"), {"StackName": "Stack1"})
+        with self.assertRaises(exceptions.StackDoesNotExist):
+            cache.get("Stack2")
+
+    def test_errors_not_cached(self):
+        describe = MagicMock(side_effect=[
+            exceptions.StackDoesNotExist("Stack1"), {"StackName": "Stack1"}])
+        cache = StackCache(describe)
+        with self.assertRaises(exceptions.StackDoesNotExist):
+            cache.get("Stack1")
+        self.assertEqual(cache.get("Stack1"), {"StackName": "Stack1"})
+
+    def test_interrupted_not_cached(self):
+        describe = MagicMock(side_effect=[
+            KeyboardInterrupt(), {"StackName": "Stack1"}])
+        cache = StackCache(describe)
+        with self.assertRaises(KeyboardInterrupt):
+            cache.get("Stack1")
+        self.assertEqual(cache.stacks, {})
+        self.assertEqual(cache.get("Stack1"), {"StackName": "Stack1"})
+
+    def test_coalesces_requests(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def describe(stack_name):
+            calls.append(stack_name)
+            started.set()
+            release.wait(5)
+            return {"StackName": stack_name}
+
+        cache = StackCache(describe)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                cache.get("Stack1")))
+            for _ in range(5)]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        # give the other threads a chance to join the pending request
+        threading.Event().wait(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(calls, ["Stack1"])
+        self.assertEqual(results, [{"StackName": "Stack1"}] * 5)
+
+    def test_invalidate_while_pending(self):
+        cache = StackCache(None)
+
+        def describe(stack_name):
+            cache.invalidate(stack_name)
+            return {"StackName": stack_name}
+
+        cache.describe = describe
+        cache.get("Stack1")
+        self.assertEqual(cache.stacks, {})
+        self.assertEqual(cache.pending, {})
+
+
 class TestProviderDefaultMode(unittest.TestCase):
     def setUp(self):
         region = "us-east-1"
@@ -476,6 +567,18 @@ class TestProviderDefaultMode(unittest.TestCase):
             self.session, region=region, recreate_failed=False)
         self.stubber = Stubber(self.provider.cloudformation)
 
+    @patch("stacker.session_cache.sessions", {})
+    @patch("stacker.session_cache.PooledSession")
+    def test_lazy_client(self, mock_session):
+        provider = ProviderBuilder(region="us-west-2").build(profile="prod")
+        self.assertEqual(mock_session.call_count, 0)
+
+        client = provider.cloudformation
+        mock_session.assert_called_once_with(
+            region_name="us-west-2", profile_name="prod")
+        self.assertIs(client, mock_session.return_value.client.return_value)
+        self.assertIs(provider.cloudformation, client)
+
     def test_get_stack_stack_does_not_exist(self):
         stack_name = "MockStack"
         self.stubber.add_client_error(
@@ -505,6 +608,205 @@ class TestProviderDefaultMode(unittest.TestCase):
 
         self.assertEqual(response["StackName"], stack_name)
 
+    def test_get_stack_cached(self):
+        stack_name = "MockStack"
+
+        def add_describe_response(status):
+            self.stubber.add_response(
+                "describe_stacks",
+                {"Stacks": [generate_describe_stacks_stack(
+                    stack_name, stack_status=status)]},
+                expected_params={"StackName": stack_name}
+            )
+
+        add_describe_response("CREATE_COMPLETE")
+        self.stubber.add_response("delete_stack", {})
+        add_describe_response("DELETE_IN_PROGRESS")
+
+        with self.stubber:
+            stack = self.provider.get_stack(stack_name)
+            self.assertEqual(self.provider.get_outputs(stack_name), {})
+            self.assertIs(self.provider.get_stack(stack_name), stack)
+            self.provider.destroy_stack(stack)
+            stack = self.provider.get_stack(stack_name)
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(stack["StackStatus"], "DELETE_IN_PROGRESS")
+        self.assertEqual(self.provider._outputs, {})
+
+    def test_prefetch_stacks(self):
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack("Stack1"),
+                        generate_describe_stacks_stack("Other")],
+             "NextToken": "page2"},
+            expected_params={}
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack("Stack2")]},
+            expected_params={"NextToken": "page2"}
+        )
+
+        with self.stubber:
+            self.provider.prefetch_stacks(["Stack1", "Stack2", "NewStack"])
+            self.assertEqual(
+                self.provider.get_stack("Stack2")["StackName"], "Stack2")
+            with self.assertRaises(exceptions.StackDoesNotExist):
+                self.provider.get_stack("NewStack")
+        # Stacks outside of the plan aren't cached for as long as the plan's
+        # own stacks, so they aren't cached at all.
+        self.assertNotIn("Other", self.provider.stack_cache.stacks)
+
+    def test_prefetch_stacks_denied(self):
+        self.stubber.add_client_error(
+            "describe_stacks",
+            service_error_code="AccessDenied",
+            service_message="Not authorized to perform DescribeStacks",
+            expected_params={}
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack("Stack1")]},
+            expected_params={"StackName": "Stack1"}
+        )
+
+        with self.stubber:
+            self.provider.prefetch_stacks(["Stack1"])
+            self.assertEqual(
+                self.provider.get_stack("Stack1")["StackName"], "Stack1")
+        self.stubber.assert_no_pending_responses()
+
+    def test_prefetch_stacks_gives_up(self):
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack("Other")],
+             "NextToken": "page2"},
+            expected_params={}
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack("Stack1")]},
+            expected_params={"StackName": "Stack1"}
+        )
+
+        with self.stubber:
+            self.provider.prefetch_stacks(["Stack1"])
+            # the sweep took as many pages as there are stacks, so the
+            # stacks that weren't found aren't assumed not to exist
+            self.assertEqual(
+                self.provider.get_stack("Stack1")["StackName"], "Stack1")
+        self.stubber.assert_no_pending_responses()
+
+    def test_poll_stack_single_stack(self):
+        stack_name = "MockStack"
+        # With only one stack being waited on, a DescribeStacks call for it
+        # is cheaper than a sweep.
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack(
+                stack_name, stack_status="UPDATE_IN_PROGRESS")]},
+            expected_params={"StackName": stack_name}
+        )
+
+        with self.stubber:
+            response = self.provider.poll_stack(stack_name)
+
+        self.assertEqual(response["StackStatus"], "UPDATE_IN_PROGRESS")
+        self.assertEqual(self.provider.poller.watched, set([stack_name]))
+
+    def test_poll_stack_shares_sweep(self):
+        self.provider.poller.watched.update(["Stack1", "Stack2"])
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [
+                generate_describe_stacks_stack(
+                    "Stack1", stack_status="UPDATE_IN_PROGRESS"),
+                generate_describe_stacks_stack(
+                    "Stack2", stack_status="UPDATE_COMPLETE"),
+            ]},
+            expected_params={}
+        )
+
+        with self.stubber:
+            stack1 = self.provider.poll_stack("Stack1")
+            stack2 = self.provider.poll_stack("Stack2")
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(stack1["StackStatus"], "UPDATE_IN_PROGRESS")
+        self.assertEqual(stack2["StackStatus"], "UPDATE_COMPLETE")
+        # Stacks that are done are no longer waited on.
+        self.assertEqual(self.provider.poller.watched, set(["Stack1"]))
+
+    def test_poll_stack_missing_from_sweep(self):
+        self.provider.poller.watched.update(["Stack1", "Stack2"])
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack("Stack1")]},
+            expected_params={}
+        )
+        self.stubber.add_client_error(
+            "describe_stacks",
+            service_error_code="ValidationError",
+            service_message="Stack with id Stack2 does not exist",
+            expected_params={"StackName": "Stack2"}
+        )
+
+        with self.assertRaises(exceptions.StackDoesNotExist):
+            with self.stubber:
+                self.provider.poll_stack("Stack2")
+
+        self.assertEqual(self.provider.poller.watched, set(["Stack1"]))
+
+    def test_poll_stack_sweep_denied(self):
+        self.provider.poller.watched.update(["Stack1", "Stack2"])
+        self.stubber.add_client_error(
+            "describe_stacks",
+            service_error_code="AccessDenied",
+            service_message="Not authorized to perform DescribeStacks",
+            expected_params={}
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack(
+                "Stack2", stack_status="UPDATE_IN_PROGRESS")]},
+            expected_params={"StackName": "Stack2"}
+        )
+
+        with self.stubber:
+            stack = self.provider.poll_stack("Stack2")
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(stack["StackStatus"], "UPDATE_IN_PROGRESS")
+
+    def test_poll_stack_after_invalidate(self):
+        self.provider.poller.watched.update(["Stack1", "Stack2"])
+        # A sweep made before Stack1 was updated.
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [
+                generate_describe_stacks_stack(
+                    "Stack1", stack_status="UPDATE_COMPLETE"),
+                generate_describe_stacks_stack(
+                    "Stack2", stack_status="UPDATE_IN_PROGRESS"),
+            ]},
+            expected_params={}
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {"Stacks": [generate_describe_stacks_stack(
+                "Stack1", stack_status="UPDATE_IN_PROGRESS")]},
+            expected_params={"StackName": "Stack1"}
+        )
+
+        with self.stubber:
+            self.provider.poll_stack("Stack2")
+            self.provider.invalidate_stack("Stack1")
+            stack = self.provider.poll_stack("Stack1")
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(stack["StackStatus"], "UPDATE_IN_PROGRESS")
+
     def test_select_update_method(self):
         for i in [[{'force_interactive': True,
                     'force_change_set': False},
@@ -735,12 +1037,8 @@ class TestProviderDefaultMode(unittest.TestCase):
             )
         )
         self.stubber.add_response("delete_change_set", {})
-        self.stubber.add_response(
-            'describe_stacks',
-            {'Stacks': [generate_describe_stacks_stack(
-                stack_name, stack_status='REVIEW_IN_PROGRESS'
-            )]}
-        )
+        # the temporary stack is described once after the change set is
+        # created, and then cached
         self.stubber.add_response(
             'describe_stacks',
             {'Stacks': [generate_describe_stacks_stack(
@@ -756,11 +1054,161 @@ class TestProviderDefaultMode(unittest.TestCase):
                     url="http://fake.template.url.com/"
                 ), parameters=[], tags=[])
 
+        self.stubber.assert_no_pending_responses()
         mock_output_full_cs.assert_called_with(full_changeset=changes,
                                                params_diff=[],
                                                fqn=stack_name,
                                                answer='y')
 
+    def _add_events_page(self, event_ids, next_token=None, **params):
+        response = {"StackEvents": [
+            {
+                "StackId": "stack-id",
+                "EventId": event_id,
+                "StackName": "MockStack",
+                "Timestamp": datetime.now(),
+                "ResourceStatus": status,
+                "ResourceStatusReason": event_id,
+            } for event_id, status in event_ids
+        ]}
+        if next_token:
+            response["NextToken"] = next_token
+        params["StackName"] = "MockStack"
+        self.stubber.add_response("describe_stack_events", response, params)
+
+    def test_iter_events(self):
+        self._add_events_page(
+            [("e4", "UPDATE_COMPLETE"), ("e3", "UPDATE_IN_PROGRESS")],
+            next_token="page2")
+        self._add_events_page(
+            [("e2", "CREATE_COMPLETE"), ("e1", "CREATE_IN_PROGRESS")],
+            NextToken="page2")
+        self._add_events_page(
+            [("e4", "UPDATE_COMPLETE"), ("e3", "UPDATE_IN_PROGRESS")],
+            next_token="page2")
+
+        with self.stubber:
+            events = self.provider.get_events("MockStack")
+            self.assertEqual([e["EventId"] for e in events],
+                             ["e1", "e2", "e3", "e4"])
+            # Stops before fetching the second page.
+            events = self.provider.iter_events("MockStack", until="e3")
+            self.assertEqual([e["EventId"] for e in events], ["e4"])
+        self.stubber.assert_no_pending_responses()
+
+    def test_get_rollback_status_reason(self):
+        self._add_events_page(
+            [("e4", "UPDATE_ROLLBACK_COMPLETE"),
+             ("e3", "UPDATE_ROLLBACK_IN_PROGRESS")],
+            next_token="page2")
+        self._add_events_page(
+            [("e2", "ROLLBACK_IN_PROGRESS")], next_token="page2")
+        self._add_events_page(
+            [("e2", "ROLLBACK_IN_PROGRESS")])
+
+        with self.stubber:
+            self.assertEqual(
+                self.provider.get_rollback_status_reason("MockStack"), "e3")
+            self.assertEqual(
+                self.provider.get_rollback_status_reason("MockStack"), "e2")
+
+    def test_tail(self):
+        self._add_events_page(
+            [("e2", "CREATE_COMPLETE")], next_token="page2")
+        self._add_events_page(
+            [("e4", "UPDATE_COMPLETE"), ("e3", "UPDATE_IN_PROGRESS")],
+            next_token="page2")
+        self._add_events_page(
+            [("e2", "CREATE_COMPLETE"), ("e1", "CREATE_IN_PROGRESS")],
+            NextToken="page2")
+
+        cancel = threading.Event()
+        received = []
+
+        def log_func(e):
+            received.append(e["EventId"])
+            if e["EventId"] == "e4":
+                cancel.set()
+
+        with self.stubber:
+            self.provider.tail("MockStack", cancel, log_func=log_func,
+                               sleep_time=0, include_initial=False)
+        self.assertEqual(received, ["e3", "e4"])
+
+    def test_stack_event_tailer(self):
+        tailer = StackEventTailer(self.provider, sleep_time=0, max_rate=1000)
+        received = []
+        done = threading.Event()
+
+        def log_func(e):
+            received.append(e["EventId"])
+            if e["EventId"] == "e3":
+                done.set()
+
+        self.stubber.add_client_error(
+            "describe_stack_events",
+            service_error_code="ValidationError",
+            service_message="Stack [MockStack] does not exist",
+            http_status_code=400,
+        )
+        self._add_events_page([("e1", "CREATE_IN_PROGRESS")])
+        self._add_events_page(
+            [("e3", "CREATE_COMPLETE"), ("e2", "CREATE_IN_PROGRESS"),
+             ("e1", "CREATE_IN_PROGRESS")])
+
+        with self.stubber:
+            tailer.watch("MockStack", log_func)
+            thread = tailer.thread
+            self.assertTrue(done.wait(5))
+            tailer.unwatch("MockStack")
+            thread.join(5)
+
+        # The stack didn't exist when it was first read, so all of its events
+        # are new.
+        self.assertEqual(received, ["e1", "e2", "e3"])
+        self.assertIsNone(tailer.thread)
+
+    def test_stack_event_tailer_throttled(self):
+        tailer = StackEventTailer(self.provider, sleep_time=0, max_rate=1000)
+        received = []
+        done = threading.Event()
+
+        def log_func(e):
+            received.append(e["EventId"])
+            done.set()
+
+        self._add_events_page([("e1", "CREATE_IN_PROGRESS")])
+        self.stubber.add_client_error(
+            "describe_stack_events",
+            service_error_code="Throttling",
+            service_message="Rate exceeded",
+            http_status_code=400,
+        )
+        self._add_events_page(
+            [("e2", "CREATE_COMPLETE"), ("e1", "CREATE_IN_PROGRESS")])
+
+        with self.stubber:
+            tailer.watch("MockStack", log_func)
+            thread = tailer.thread
+            self.assertTrue(done.wait(5))
+            tailer.unwatch("MockStack")
+            thread.join(5)
+
+        # Being throttled doesn't stop the stack being tailed.
+        self.assertEqual(received, ["e2"])
+
+    def test_watch_stack(self):
+        stack = MagicMock(spec=Stack)
+        stack.fqn = "MockStack"
+        self.provider.tailer = MagicMock()
+        log_func = MagicMock()
+
+        unwatch = self.provider.watch_stack(stack, log_func=log_func)
+        self.provider.tailer.watch.assert_called_once_with(
+            "MockStack", log_func)
+        unwatch()
+        self.provider.tailer.unwatch.assert_called_once_with("MockStack")
+
     def test_tail_stack_retry_on_missing_stack(self):
         stack_name = "SlowToCreateStack"
         stack = MagicMock(spec=Stack)
@@ -793,7 +1241,6 @@ class TestProviderDefaultMode(unittest.TestCase):
         stack.fqn = "my-namespace-{}".format(stack_name)
 
         default.TAIL_RETRY_SLEEP = .01
-        default.GET_EVENTS_SLEEP = .01
 
         rcvd_events = []
 
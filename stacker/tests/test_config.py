@@ -1,15 +1,23 @@
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 import yaml
 
+import mock
+
 from stacker.config import (
     render_parse_load,
     load,
     render,
     parse,
     dump,
-    process_remote_sources
+    process_remote_sources,
+    render_tree,
 )
+from stacker.config.cache import CompiledConfigCache, RenderCache
+from stacker.context import Context
 from stacker.config import Config, Stack
 from stacker.environment import (
     parse_environment,
@@ -564,6 +572,34 @@ stacks:
         config.validate()
         self.assertEquals(config.namespace, "prod")
 
+    def test_render_parse_load_yaml_environment(self):
+        conf = """
+        namespace: ${namespace}
+        stacks:
+          vpc:
+            class_path: blueprints.VPC
+            variables:
+              Subnets: ${subnets}
+          bastion:
+            class_path: blueprints.Bastion
+            variables:
+              Name: ${namespace}-bastion
+        """
+        env = parse_yaml_environment("""
+        namespace: prod
+        subnets:
+          - 10.0.0.0/24
+          - 10.0.1.0/24
+        """)
+        config = render_parse_load(conf, environment=env)
+        self.assertEqual(config.namespace, "prod")
+        # The order of the stacks in the config is kept.
+        self.assertEqual([stack.name for stack in config.stacks],
+                         ["vpc", "bastion"])
+        self.assertEqual(config.stacks[0].variables["Subnets"],
+                         ["10.0.0.0/24", "10.0.1.0/24"])
+        self.assertEqual(config.stacks[1].variables["Name"], "prod-bastion")
+
     def test_allow_most_keys_to_be_duplicates_for_overrides(self):
         yaml_config = """
         namespace: prod
@@ -636,5 +672,203 @@ stacks:
             parse(yaml_config)
 
 
+class TestRenderTree(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        sys_path = list(sys.path)
+        self.addCleanup(setattr, sys, "path", sys_path)
+        self.package = os.path.join(self.tmpdir, "package")
+        os.mkdir(self.package)
+        self.write_remote_config("""
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+            variables:
+              Name: $namespace-vpc
+        """)
+        self.raw_config = """
+        namespace: $namespace
+        stacker_cache_dir: %s
+        package_sources:
+          local:
+            - source: %s
+              configs:
+                - remote.yaml
+        stacks:
+          - name: bastion
+            class_path: blueprints.Bastion
+        """ % (os.path.join(self.tmpdir, "cache"), self.package)
+        self.environment = parse_environment("namespace: prod")
+        self.cache = RenderCache(os.path.join(self.tmpdir, "configs"))
+
+    def write_remote_config(self, content):
+        with open(os.path.join(self.package, "remote.yaml"), "w") as f:
+            f.write(content)
+
+    def test_merge_remote_configs(self):
+        config = render_tree(self.raw_config, self.environment)
+        self.assertEqual(config["namespace"], "prod")
+        self.assertEqual([stack["name"] for stack in config["stacks"]],
+                         ["vpc", "bastion"])
+        self.assertEqual(config["stacks"][0]["variables"]["Name"],
+                         "prod-vpc")
+        self.assertIn(self.package, sys.path)
+
+    def test_merge_remote_configs_keys(self):
+        self.write_remote_config("""
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+            variables:
+              ${namespace}Name: vpc
+        """)
+        config = render_tree(self.raw_config, self.environment)
+        self.assertEqual(config["stacks"][0]["variables"],
+                         {"prodName": "vpc"})
+
+    def test_merge_remote_configs_missing_environment(self):
+        self.write_remote_config("""
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+            variables:
+              Name: $environment-vpc
+        """)
+        with self.assertRaises(exceptions.MissingEnvironment):
+            render_tree(self.raw_config, self.environment)
+
+        # As with a raw config, missing variables that come after a lookup
+        # are left in place.
+        self.write_remote_config("""
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+            variables:
+              Other: ${output other::Name}
+              Name: $environment-vpc
+        """)
+        config = render_tree(self.raw_config, self.environment)
+        self.assertEqual(config["stacks"][0]["variables"]["Name"],
+                         "$environment-vpc")
+
+    def test_render_cache(self):
+        config = render_tree(self.raw_config, self.environment, self.cache)
+
+        with mock.patch("stacker.config._render_parse") as render_parse:
+            self.assertEqual(
+                render_tree(self.raw_config, self.environment, self.cache),
+                config)
+            self.assertEqual(render_parse.call_count, 0)
+
+        # A different environment is rendered again.
+        other = render_tree(self.raw_config,
+                            parse_environment("namespace: test"),
+                            self.cache)
+        self.assertEqual(other["namespace"], "test")
+
+    def test_render_cache_unwritable(self):
+        # A file where the cache's directory should be can't be written to.
+        path = os.path.join(self.tmpdir, "configs")
+        with open(path, "w"):
+            pass
+        config = render_tree(self.raw_config, self.environment,
+                             RenderCache(path))
+        self.assertEqual(config["namespace"], "prod")
+
+    def test_render_cache_remote_config_changed(self):
+        render_tree(self.raw_config, self.environment, self.cache)
+        self.write_remote_config("""
+        stacks:
+          - name: db
+            class_path: blueprints.DB
+        """)
+        config = render_tree(self.raw_config, self.environment, self.cache)
+        self.assertEqual([stack["name"] for stack in config["stacks"]],
+                         ["db", "bastion"])
+
+
+class TestCompiledConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.cache = CompiledConfigCache(self.tmpdir)
+        self.raw_config = """
+        namespace: prod
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+          - name: bastion
+            class_path: blueprints.Bastion
+            variables:
+              VpcId: ${output vpc::VpcId}
+        """
+
+    def test_cached_config(self):
+        config = render_parse_load(self.raw_config, config_cache=self.cache)
+        self.assertIsNone(config.stack_requires)
+
+        with mock.patch.object(Config, "validate") as validate:
+            cached = render_parse_load(self.raw_config,
+                                       config_cache=self.cache)
+            self.assertEqual(validate.call_count, 0)
+        self.assertEqual(cached.to_primitive(), config.to_primitive())
+        self.assertEqual(cached.stack_requires,
+                         {"vpc": [], "bastion": ["vpc"]})
+
+        context = Context(config=cached)
+        with mock.patch("stacker.stack.stack_requires") as stack_requires:
+            self.assertEqual(context.get_stack("bastion").requires,
+                             set(["vpc"]))
+            self.assertEqual(stack_requires.call_count, 0)
+
+    def test_invalid_config_not_cached(self):
+        with self.assertRaises(exceptions.InvalidConfig):
+            render_parse_load("stacks: []", environment={},
+                              config_cache=self.cache)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_circular_reference_not_cached(self):
+        raw_config = """
+        namespace: prod
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+            variables:
+              VpcId: ${output vpc::VpcId}
+        """
+        render_parse_load(raw_config, config_cache=self.cache)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_cached_config_custom_lookups(self):
+        raw_config = """
+        namespace: prod
+        lookups:
+          cached: stacker.lookups.handlers.default.DefaultLookup
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+            variables:
+              Name: ${cached x::y}
+        """
+        self.addCleanup(LOOKUP_HANDLERS.pop, "cached", None)
+        render_parse_load(raw_config, config_cache=self.cache)
+
+        cached = render_parse_load(raw_config, config_cache=self.cache)
+        self.assertEqual(cached.stack_requires, {"vpc": []})
+
+    def test_unknown_lookup_not_cached(self):
+        raw_config = """
+        namespace: prod
+        stacks:
+          - name: vpc
+            class_path: blueprints.VPC
+            variables:
+              Name: ${unknown x::y}
+        """
+        render_parse_load(raw_config, config_cache=self.cache)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+
 if __name__ == '__main__':
     unittest.main()
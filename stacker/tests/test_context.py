@@ -32,6 +32,14 @@ class TestContext(unittest.TestCase):
         self.assertEqual(stack_names[0], "namespace-stack1")
         self.assertEqual(stack_names[1], "namespace-stack2")
 
+    def test_context_get_stack(self):
+        context = Context(config=self.config)
+        stack = context.get_stack("stack2")
+        self.assertEqual(stack.name, "stack2")
+        self.assertIs(context.get_stack_by_fqn("namespace-stack2"), stack)
+        self.assertIsNone(context.get_stack("namespace-stack2"))
+        self.assertIsNone(context.get_stack_by_fqn("stack2"))
+
     def test_context_get_fqn(self):
         context = Context(config=self.config)
         fqn = context.get_fqn()
@@ -1,14 +1,20 @@
 """ Tests on the DAG implementation """
+import asyncio
 import threading
 
 import pytest
 
 from stacker.dag import (
+    AdjustableSemaphore,
     DAG,
     DAGValidationError,
+    Slot,
     ThreadedWalker,
-    UnlimitedSemaphore
+    UnlimitedSemaphore,
+    critical_path,
+    current_slot,
 )
+from stacker.dag.aio import AsyncWalker, current_async_slot
 
 
 @pytest.fixture
@@ -43,6 +49,44 @@ def test_transpose(basic_dag):
                                 'a': set([])}
 
 
+def test_transpose_view(basic_dag):
+    dag = basic_dag
+
+    transposed = dag.transpose()
+    transposed.add_node('e')
+    transposed.add_edge('a', 'e')
+    assert dag.graph['e'] == set(['a'])
+    assert dag.predecessors('a') == ['e']
+
+
+def test_reverse_index(basic_dag):
+    dag = basic_dag
+
+    assert dag.reverse == {'a': set(),
+                           'b': set(['a']),
+                           'c': set(['a']),
+                           'd': set(['b', 'c'])}
+    dag.delete_edge('a', 'c')
+    assert dag.reverse['c'] == set()
+    dag.delete_node('b')
+    assert dag.reverse == {'a': set(), 'c': set(), 'd': set(['c'])}
+    assert sorted(dag.ind_nodes()) == ['a', 'c']
+
+
+def test_rename_edges(basic_dag):
+    dag = basic_dag
+
+    dag.rename_edges('b', 'e')
+    assert dag.graph == {'a': set(['e', 'c']),
+                         'c': set('d'),
+                         'd': set(),
+                         'e': set('d')}
+    assert dag.reverse == {'a': set(),
+                           'c': set('a'),
+                           'd': set(['e', 'c']),
+                           'e': set('a')}
+
+
 def test_add_edge(empty_dag):
     dag = empty_dag
 
@@ -52,6 +96,61 @@ def test_add_edge(empty_dag):
     assert dag.graph == {'a': set('b'), 'b': set()}
 
 
+def test_add_edge_cycle(basic_dag):
+    dag = basic_dag
+
+    with pytest.raises(DAGValidationError) as expected:
+        dag.add_edge('d', 'a')
+    assert expected.value.cycle[0] == 'd'
+    assert expected.value.cycle[-1] == 'd'
+    assert expected.value.edge == ('d', 'a')
+    assert 'd' not in dag.graph['d']
+    assert dag.graph['d'] == set()
+
+    with pytest.raises(DAGValidationError):
+        dag.add_edge('d', 'd')
+
+
+def test_add_edges(empty_dag):
+    dag = empty_dag
+
+    for node in 'abc':
+        dag.add_node(node)
+    dag.add_edges([('a', 'b'), ('b', 'c'), ('a', 'b')])
+    assert dag.graph == {'a': set('b'), 'b': set('c'), 'c': set()}
+
+    with pytest.raises(KeyError):
+        dag.add_edges([('c', 'a'), ('c', 'd')])
+    assert dag.graph['c'] == set()
+
+
+def test_add_edges_cycle(empty_dag):
+    dag = empty_dag
+
+    for node in 'abcd':
+        dag.add_node(node)
+    with pytest.raises(DAGValidationError) as expected:
+        dag.add_edges([('a', 'b'), ('c', 'a'), ('b', 'c'), ('c', 'd')])
+    # b -> c is the last edge of the cycle to be added, so it's the one that
+    # closed it.
+    assert expected.value.cycle == ['b', 'c', 'a', 'b']
+    assert expected.value.edge == ('b', 'c')
+    assert str(expected.value) == 'graph is not acyclic: b -> c -> a -> b'
+    # None of the edges are added.
+    assert dag.graph == {'a': set(), 'b': set(), 'c': set(), 'd': set()}
+
+
+def test_find_cycle(basic_dag):
+    dag = basic_dag
+
+    assert dag.find_cycle() is None
+    dag.graph['d'].add('b')
+    cycle = dag.find_cycle()
+    assert cycle in (['b', 'd', 'b'], ['d', 'b', 'd'])
+    assert dag.validate() == (
+        False, 'graph is not acyclic: %s' % ' -> '.join(cycle))
+
+
 def test_from_dict(empty_dag):
     dag = empty_dag
 
@@ -106,6 +205,31 @@ def test_topological_sort(empty_dag):
     assert dag.topological_sort() == ['c', 'b', 'a']
 
 
+def test_topological_sort_cached(basic_dag):
+    dag = basic_dag
+
+    version = dag.version
+    order = dag.topological_sort()
+    order.reverse()
+    assert dag.topological_sort() == ['a', 'b', 'c', 'd']
+    assert dag.version == version
+
+    dag.add_node('e')
+    dag.add_edge('e', 'a')
+    assert dag.version > version
+    assert dag.topological_sort() == ['e', 'a', 'b', 'c', 'd']
+    assert dag.transpose().topological_sort() == ['d', 'b', 'c', 'a', 'e']
+
+
+def test_version_after_reset(basic_dag):
+    dag = basic_dag
+
+    version = dag.version
+    dag.reset_graph()
+    assert dag.version > version
+    assert DAG().version > dag.version
+
+
 def test_successful_validation(basic_dag):
     dag = basic_dag
     assert dag.validate()[0] == True  # noqa: E712
@@ -159,6 +283,12 @@ def test_filter(basic_dag):
     assert dag2.graph == {'b': set('d'),
                           'c': set('d'),
                           'd': set()}
+    assert dag2.reverse == {'b': set(),
+                            'c': set(),
+                            'd': set(['b', 'c'])}
+
+    with pytest.raises(KeyError):
+        dag.filter(['e'])
 
 
 def test_all_leaves(basic_dag):
@@ -222,6 +352,42 @@ def test_transitive_deep_reduction(empty_dag):
                          'd': set()}
 
 
+def test_transitive_reduction_keeps_reachability(empty_dag):
+    dag = empty_dag
+    # Every node depends on every node after it.
+    nodes = 'abcdefgh'
+    dag.from_dict({n: list(nodes[i + 1:]) for i, n in enumerate(nodes)})
+    dag.transitive_reduction()
+    assert dag.graph == {n: set(nodes[i + 1:i + 2])
+                         for i, n in enumerate(nodes)}
+    assert dag.all_downstreams('a') == list('bcdefgh')
+
+
+def test_transitive_closure(basic_dag):
+    dag = basic_dag
+
+    closure = dag.transitive_closure()
+    assert closure.reachable('a') == ['b', 'c', 'd']
+    assert closure.reachable('d') == []
+    assert closure.is_reachable('a', 'd')
+    assert not closure.is_reachable('b', 'c')
+    assert dag.transitive_closure() is closure
+
+    dag.add_node('e')
+    dag.add_edge('d', 'e')
+    closure = dag.transitive_closure()
+    assert closure.reachable('b') == ['d', 'e']
+
+    # The transposed view shares the graph, so changes to either invalidate
+    # both closures.
+    transposed = dag.transpose()
+    assert transposed.transitive_closure().reachable('e') == [
+        'd', 'b', 'c', 'a']
+    transposed.delete_edge('e', 'd')
+    assert dag.transitive_closure().reachable('b') == ['d']
+    assert transposed.transitive_closure().reachable('e') == []
+
+
 def test_threaded_walker(empty_dag):
     dag = empty_dag
 
@@ -244,3 +410,375 @@ def test_threaded_walker(empty_dag):
 
     walker.walk(dag, walk_func)
     assert nodes == ['d', 'c', 'b', 'a'] or nodes == ['d', 'b', 'c', 'a']
+
+
+def test_threaded_walker_reuses_threads(empty_dag):
+    dag = empty_dag
+
+    walker = ThreadedWalker(UnlimitedSemaphore())
+
+    # A chain never has more than one node ready at a time, so it should be
+    # walked by a single worker thread.
+    dag.from_dict({'a': ['b'],
+                   'b': ['c'],
+                   'c': ['d'],
+                   'd': []})
+
+    lock = threading.Lock()
+    nodes = []
+    threads = set()
+
+    def walk_func(n):
+        with lock:
+            nodes.append(n)
+            threads.add(threading.current_thread().ident)
+        return True
+
+    walker.walk(dag, walk_func)
+    assert nodes == ['d', 'c', 'b', 'a']
+    assert len(threads) == 1
+
+
+def test_threaded_walker_semaphore(empty_dag):
+    dag = empty_dag
+
+    walker = ThreadedWalker(threading.Semaphore(2))
+
+    dag.from_dict({'a': [], 'b': [], 'c': [], 'd': [], 'e': []})
+
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def walk_func(n):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+        return True
+
+    walker.walk(dag, walk_func)
+    assert max_running[0] <= 2
+
+
+def test_critical_path(empty_dag):
+    dag = empty_dag
+    dag.from_dict({'vpc': [],
+                   'cluster': ['vpc'],
+                   'service': ['cluster'],
+                   'bucket': [],
+                   'dns': []})
+
+    assert critical_path(dag) == {'vpc': 3, 'cluster': 2, 'service': 1,
+                                  'bucket': 1, 'dns': 1}
+    assert critical_path(dag, weights={'service': 10, 'dns': 20}) == {
+        'vpc': 12, 'cluster': 11, 'service': 10, 'bucket': 1, 'dns': 20}
+
+
+def test_threaded_walker_priority(empty_dag):
+    dag = empty_dag
+    dag.from_dict({'bucket': [],
+                   'dns': [],
+                   'service': ['cluster'],
+                   'cluster': ['vpc'],
+                   'vpc': []})
+
+    def walk(walker):
+        nodes = []
+
+        def walk_func(n):
+            nodes.append(n)
+            # Hold the slot long enough for the walker to see which nodes
+            # are ready when it's released.
+            threading.Event().wait(0.01)
+            return True
+
+        walker.walk(dag, walk_func)
+        return nodes
+
+    # The longest chain starts first.
+    nodes = walk(ThreadedWalker(threading.Semaphore(1)))
+    assert nodes[:3] == ['vpc', 'cluster', 'service']
+
+    nodes = walk(ThreadedWalker(
+        threading.Semaphore(1),
+        priority=lambda dag: {n: n == 'dns' for n in dag.graph}))
+    assert nodes[0] == 'dns'
+
+
+def test_threaded_walker_groups(empty_dag):
+    dag = empty_dag
+    dag.from_dict({'a1': [], 'a2': [], 'a3': [], 'b1': [], 'b2': []})
+
+    groups = {n: [n[0]] for n in dag.graph}
+    walker = ThreadedWalker(UnlimitedSemaphore(), groups=groups,
+                            group_limits={'a': 1})
+
+    lock = threading.Lock()
+    running = {'a': 0, 'b': 0}
+    max_running = {'a': 0, 'b': 0}
+
+    def walk_func(n):
+        with lock:
+            running[n[0]] += 1
+            max_running[n[0]] = max(max_running[n[0]], running[n[0]])
+        threading.Event().wait(0.02)
+        with lock:
+            running[n[0]] -= 1
+        return True
+
+    walker.walk(dag, walk_func)
+    assert max_running == {'a': 1, 'b': 2}
+
+    max_running.update(a=0, b=0)
+    walker = ThreadedWalker(UnlimitedSemaphore(), groups=groups,
+                            group_limits={'b': AdjustableSemaphore(1)})
+    walker.walk(dag, walk_func)
+    assert max_running == {'a': 3, 'b': 1}
+
+
+def test_adjustable_semaphore():
+    semaphore = AdjustableSemaphore(2)
+    assert semaphore.acquire(False)
+    assert semaphore.acquire(False)
+    assert semaphore.locked()
+
+    semaphore.limit = 1
+    semaphore.release()
+    assert semaphore.locked()
+    assert not semaphore.acquire(False)
+
+    semaphore.limit = 3
+    assert semaphore.acquire(False)
+    assert semaphore.acquire(False)
+    assert semaphore.in_use == 3
+    assert not semaphore.acquire(False)
+
+    acquired = threading.Event()
+
+    def acquire():
+        semaphore.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.01)
+    semaphore.limit = 4
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_threaded_walker_exception(empty_dag):
+    dag = empty_dag
+
+    walker = ThreadedWalker(UnlimitedSemaphore())
+
+    dag.from_dict({'a': ['b'], 'b': []})
+
+    nodes = []
+
+    def walk_func(n):
+        nodes.append(n)
+        if n == 'b':
+            raise ValueError("boom")
+        return True
+
+    # An exception in one node should not stop the walk from completing.
+    walker.walk(dag, walk_func)
+    assert nodes == ['b', 'a']
+
+
+def test_threaded_walker_wait_slot(empty_dag):
+    dag = empty_dag
+
+    walker = ThreadedWalker(threading.Semaphore(1))
+
+    dag.from_dict({'a': [], 'b': []})
+
+    started = {'a': threading.Event(), 'b': threading.Event()}
+    overlapped = []
+
+    def walk_func(n):
+        started[n].set()
+        other = 'b' if n == 'a' else 'a'
+        # Give up the only active slot, which should let the other node
+        # start while this one is still waiting.
+        current_slot().wait()
+        overlapped.append(started[other].wait(5))
+        current_slot().resume()
+        return True
+
+    walker.walk(dag, walk_func)
+    assert overlapped == [True, True]
+    assert current_slot() is None
+
+
+def test_threaded_walker_wait_slot_no_deadlock(empty_dag):
+    dag = empty_dag
+
+    walker = ThreadedWalker(threading.Semaphore(1),
+                            wait_semaphore=threading.Semaphore(1))
+
+    dag.from_dict({'a': [], 'b': []})
+
+    started = {'a': threading.Event(), 'b': threading.Event()}
+    finished = []
+
+    def walk_func(n):
+        started[n].set()
+        other = 'b' if n == 'a' else 'a'
+        # The node that starts first holds the only waiting slot until the
+        # other has started, so that one of them is resuming (and needs the
+        # active slot) while the other is trading the active slot for the
+        # waiting slot.
+        current_slot().wait()
+        started[other].wait(5)
+        current_slot().resume()
+        finished.append(n)
+        return True
+
+    thread = threading.Thread(target=walker.walk, args=(dag, walk_func))
+    thread.daemon = True
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert sorted(finished) == ['a', 'b']
+
+
+def test_slot_resume_releases_groups():
+    walker = ThreadedWalker(threading.Semaphore(1))
+    group = threading.Semaphore(1)
+    # The walker takes an active slot for a node before it starts.
+    walker.semaphore.acquire()
+    group.acquire()
+    slot = Slot(walker, wakeup=lambda: None, groups=[group])
+    slot.wait()
+
+    # Another node holds the only active slot.
+    walker.semaphore.acquire()
+    resumer = threading.Thread(target=slot.resume)
+    resumer.daemon = True
+    resumer.start()
+    resumer.join(0.3)
+    assert resumer.is_alive()
+
+    # While it's blocked, the resuming node doesn't hold up the other nodes
+    # of its group.
+    assert group.acquire(False)
+    group.release()
+
+    walker.semaphore.release()
+    resumer.join(5)
+    assert not resumer.is_alive()
+    assert not slot.waiting
+    assert not group.acquire(False)
+
+
+def test_async_walker(empty_dag):
+    dag = empty_dag
+
+    dag.from_dict({'a': ['b', 'c'],
+                   'b': ['d'],
+                   'c': ['d'],
+                   'd': []})
+
+    nodes = []
+
+    async def walk_func(n):
+        nodes.append(n)
+        return True
+
+    asyncio.run(AsyncWalker().walk(dag, walk_func))
+    assert nodes == ['d', 'c', 'b', 'a'] or nodes == ['d', 'b', 'c', 'a']
+
+
+def test_async_walker_wait_slot(empty_dag):
+    dag = empty_dag
+    dag.from_dict({'a': [], 'b': [], 'c': []})
+
+    running = [0]
+    max_running = [0]
+    waiting = []
+
+    async def walk_func(n):
+        slot = current_async_slot()
+        running[0] += 1
+        max_running[0] = max(max_running[0], running[0])
+        # Blocking calls run in the walker's executor.
+        await slot.run(threading.Event().wait, 0.01)
+        running[0] -= 1
+        await slot.wait()
+        waiting.append(n)
+        # All of the nodes get to wait at once, even though only one can be
+        # active at a time.
+        while len(waiting) < 3:
+            await asyncio.sleep(0.01)
+        await slot.resume()
+
+    asyncio.run(AsyncWalker(concurrency=1).walk(dag, walk_func))
+    assert max_running[0] == 1
+    assert sorted(waiting) == ['a', 'b', 'c']
+
+
+def test_async_walker_wait_slot_no_deadlock(empty_dag):
+    dag = empty_dag
+    dag.from_dict({'a': [], 'b': []})
+
+    started = {'a': asyncio.Event(), 'b': asyncio.Event()}
+    finished = []
+
+    async def walk_func(n):
+        started[n].set()
+        other = 'b' if n == 'a' else 'a'
+        slot = current_async_slot()
+        await slot.wait()
+        await started[other].wait()
+        await slot.resume()
+        finished.append(n)
+
+    walker = AsyncWalker(concurrency=1, wait_concurrency=1)
+    asyncio.run(asyncio.wait_for(walker.walk(dag, walk_func), 5))
+    assert sorted(finished) == ['a', 'b']
+
+
+def test_async_walker_sleep_cancelled(empty_dag):
+    dag = empty_dag
+    dag.add_node('a')
+
+    cancel = threading.Event()
+    cancel.set()
+    slept = []
+
+    async def walk_func(n):
+        slept.append(await current_async_slot().sleep())
+
+    walker = AsyncWalker(poll_time=30, cancel=cancel)
+    asyncio.run(asyncio.wait_for(walker.walk(dag, walk_func), 5))
+    assert slept == [True]
+
+
+def test_async_walker_groups(empty_dag):
+    dag = empty_dag
+    dag.from_dict({'a1': [], 'a2': [], 'a3': [], 'b1': [], 'b2': []})
+
+    groups = {n: [n[0]] for n in dag.graph}
+    running = {'a': 0, 'b': 0}
+    max_running = {'a': 0, 'b': 0}
+
+    async def walk_func(n):
+        running[n[0]] += 1
+        max_running[n[0]] = max(max_running[n[0]], running[n[0]])
+        await asyncio.sleep(0.01)
+        running[n[0]] -= 1
+
+    walker = AsyncWalker(groups=groups, group_limits={'a': 1})
+    asyncio.run(walker.walk(dag, walk_func))
+    assert max_running == {'a': 1, 'b': 2}
+
+    max_running.update(a=0, b=0)
+    walker = AsyncWalker(groups=groups,
+                         group_limits={'b': AdjustableSemaphore(1)})
+    asyncio.run(walker.walk(dag, walk_func))
+    assert max_running == {'a': 3, 'b': 1}
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# The most that importing stacker.commands (which is all that
+# `stacker --help` needs) may take, in microseconds. Wall-clock timings vary
+# too much between machines to check by default, so this is only checked
+# when set.
+COMMANDS_IMPORT_BUDGET = os.environ.get("STACKER_IMPORT_TIME_BUDGET")
+
+# Third party packages that are slow to import, and are only imported once
+# they're needed.
+HEAVY_PACKAGES = frozenset([
+    "boto3",
+    "formic",
+    "git",
+    "jinja2",
+    "s3transfer",
+    "troposphere",
+])
+
+
+def imported_packages(*modules):
+    """Imports the given modules in a new interpreter.
+
+    Returns:
+        set: the top level packages in sys.modules once they're imported.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-c",
+         "import sys, " + ", ".join(modules) + "; "
+         "print('\\n'.join(sys.modules))"],
+        universal_newlines=True)
+    return set(name.split(".")[0] for name in output.split())
+
+
+def import_times(*modules):
+    """Imports the given modules in a new interpreter with -X importtime.
+
+    Returns:
+        list: a (name, cumulative microseconds, nested) tuple for each module
+            imported.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c",
+         "import " + ", ".join(modules)],
+        stderr=subprocess.STDOUT, universal_newlines=True)
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        times.append((name.strip(), int(cumulative),
+                      name.startswith("  ")))
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+
+    def assert_no_heavy_imports(self, imported):
+        self.assertEqual(imported & HEAVY_PACKAGES, set())
+
+    def test_commands(self):
+        imported = imported_packages("stacker.commands")
+        self.assert_no_heavy_imports(imported)
+        self.assertNotIn("botocore", imported)
+        self.assertNotIn("schematics", imported)
+        self.assertNotIn("yaml", imported)
+
+    @unittest.skipUnless(COMMANDS_IMPORT_BUDGET,
+                         "STACKER_IMPORT_TIME_BUDGET isn't set")
+    def test_commands_budget(self):
+        times = import_times("stacker.commands")
+        total = sum(cumulative for name, cumulative, nested in times
+                    if not nested and name.startswith("stacker"))
+        self.assertLess(total, int(COMMANDS_IMPORT_BUDGET))
+
+    def test_graph(self):
+        # What `stacker graph` and `stacker build --outline` import.
+        imported = imported_packages(
+            "stacker.config", "stacker.context",
+            "stacker.providers.aws.default", "stacker.actions.graph",
+            "stacker.actions.build")
+        self.assert_no_heavy_imports(imported)
@@ -1,12 +1,14 @@
 import os
 import shutil
 import tempfile
+import threading
 
 import unittest
 import mock
 
 from stacker.context import Context, Config
-from stacker.dag import walk
+from stacker.dag import walk, ThreadedWalker
+from stacker.dag.aio import AsyncWalker
 from stacker.util import stack_template_key_name
 from stacker.lookups.registry import (
     register_lookup_handler,
@@ -111,6 +113,50 @@ class TestPlan(unittest.TestCase):
 
         self.assertEquals(calls, ['namespace-vpc.1', 'namespace-bastion.1'])
 
+    def test_execute_plan_watch_func(self):
+        vpc = Stack(
+            definition=generate_definition('vpc', 1),
+            context=self.context)
+
+        calls = []
+
+        def fn(stack, status=None):
+            calls.append("run %s" % stack.fqn)
+            return COMPLETE
+
+        def watch_func(stack):
+            calls.append("watch %s" % stack.fqn)
+            return lambda: calls.append("unwatch %s" % stack.fqn)
+
+        graph = build_graph([Step(vpc, fn, watch_func=watch_func)])
+        plan = build_plan(description="Test", graph=graph)
+        plan.execute(walk)
+
+        self.assertEqual(calls, ['watch namespace-vpc.1',
+                                 'run namespace-vpc.1',
+                                 'unwatch namespace-vpc.1'])
+
+    def test_execute_plan_legacy_watch_func(self):
+        vpc = Stack(
+            definition=generate_definition('vpc', 1),
+            context=self.context)
+
+        cancelled = []
+
+        def fn(stack, status=None):
+            return COMPLETE
+
+        def watch_func(stack, cancel):
+            cancelled.append(cancel.wait(5))
+
+        graph = build_graph([Step(vpc, fn, watch_func=watch_func)])
+        plan = build_plan(description="Test", graph=graph)
+        plan.execute(walk)
+
+        # Watchers that block until they're cancelled still get cancelled
+        # once the step is done.
+        self.assertEqual(cancelled, [True])
+
     def test_execute_plan_locked(self):
         # Locked stacks still need to have their requires evaluated when
         # they're being created.
@@ -191,6 +237,70 @@ class TestPlan(unittest.TestCase):
         self.assertEquals(calls, ['namespace-vpc.1'])
         self.assertEquals(vpc_step.status, FAILED)
 
+    def test_execute_plan_submitted_steps_release_slot(self):
+        vpc = Stack(
+            definition=generate_definition('vpc', 1),
+            context=self.context)
+        other = Stack(
+            definition=generate_definition('vpc', 2),
+            context=self.context)
+
+        submitted = {vpc.fqn: threading.Event(), other.fqn: threading.Event()}
+        overlapped = []
+
+        def fn(stack, status=None):
+            if status == SUBMITTED:
+                # Both stacks should be able to get submitted even though
+                # only one can be active at a time.
+                others = [e for k, e in submitted.items() if k != stack.fqn]
+                overlapped.append(others[0].wait(5))
+                return COMPLETE
+            submitted[stack.fqn].set()
+            return SUBMITTED
+
+        graph = build_graph([Step(vpc, fn), Step(other, fn)])
+        plan = build_plan(description="Test", graph=graph)
+        plan.execute(ThreadedWalker(threading.Semaphore(1)).walk)
+
+        self.assertEqual(overlapped, [True, True])
+
+    def test_execute_plan_async(self):
+        vpc = Stack(
+            definition=generate_definition('vpc', 1),
+            context=self.context)
+        bastion = Stack(
+            definition=generate_definition('bastion', 1, requires=[vpc.name]),
+            context=self.context)
+        other = Stack(
+            definition=generate_definition('vpc', 2),
+            context=self.context)
+
+        calls = []
+        submitted = {vpc.fqn: threading.Event(), other.fqn: threading.Event()}
+        overlapped = []
+
+        def fn(stack, status=None):
+            calls.append(stack.fqn)
+            if stack.fqn not in submitted:
+                return COMPLETE
+            if status == SUBMITTED:
+                # Both stacks get submitted even though only one can be
+                # active at a time, and waiting doesn't need a thread.
+                others = [e for k, e in submitted.items() if k != stack.fqn]
+                overlapped.append(others[0].wait(5))
+                return COMPLETE
+            submitted[stack.fqn].set()
+            return SUBMITTED
+
+        graph = build_graph([Step(vpc, fn), Step(bastion, fn),
+                             Step(other, fn)])
+        plan = build_plan(description="Test", graph=graph)
+        plan.execute(AsyncWalker(concurrency=1).walk)
+
+        self.assertEqual(overlapped, [True, True])
+        self.assertEqual(calls[-1], 'namespace-bastion.1')
+        self.assertTrue(all(step.completed for step in plan.steps))
+
     def test_execute_plan_skipped(self):
         vpc = Stack(
             definition=generate_definition('vpc', 1),
@@ -308,7 +418,7 @@ class TestPlan(unittest.TestCase):
             build_graph([Step(vpc, None), Step(db, None), Step(app, None)])
         message = ("Error detected when adding 'db.1' "
                    "as a dependency of 'app.1': graph is "
-                   "not acyclic")
+                   "not acyclic: app.1 -> db.1 -> app.1")
         self.assertEqual(str(expected.exception), message)
 
     def test_dump(self, *args):
@@ -0,0 +1,141 @@
+import datetime
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from botocore.config import Config
+from dateutil.tz import tzutc
+from mock import patch
+
+from stacker import session_cache
+from stacker.session_cache import (
+    FileCredentialCache,
+    get_session,
+    set_max_pool_connections,
+    use_file_credential_cache,
+)
+
+
+def credentials(expires_in):
+    expiration = datetime.datetime.now(tzutc()) + datetime.timedelta(
+        seconds=expires_in)
+    return {"Credentials": {"AccessKeyId": "foo",
+                            "SecretAccessKey": "bar",
+                            "SessionToken": "baz",
+                            "Expiration": expiration}}
+
+
+class TestSessionCache(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(session_cache, "sessions", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(session_cache, "max_pool_connections",
+                               session_cache.DEFAULT_MAX_POOL_CONNECTIONS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_session(self):
+        session = get_session("us-east-1")
+        self.assertIs(get_session("us-east-1"), session)
+        self.assertIsNot(get_session("us-west-2"), session)
+        self.assertEqual(session.region_name, "us-east-1")
+
+    def test_client_pool(self):
+        session = get_session("us-east-1")
+        client = session.client("s3")
+        self.assertIs(session.client("s3"), client)
+        self.assertIsNot(session.client("ec2"), client)
+
+        config = Config(retries={"max_attempts": 10})
+        cfn = session.client("cloudformation", config=config)
+        self.assertIs(session.client("cloudformation",
+                                     config=Config(
+                                         retries={"max_attempts": 10})),
+                      cfn)
+        self.assertIsNot(session.client("cloudformation"), cfn)
+        self.assertEqual(cfn.meta.config.retries["total_max_attempts"], 11)
+        self.assertEqual(cfn.meta.config.max_pool_connections,
+                         session_cache.DEFAULT_MAX_POOL_CONNECTIONS)
+
+    def test_set_max_pool_connections(self):
+        session = get_session("us-east-1")
+        client = session.client("s3")
+
+        set_max_pool_connections(2)
+        self.assertIs(session.client("s3"), client)
+
+        set_max_pool_connections(50)
+        client = session.client("s3")
+        self.assertEqual(client.meta.config.max_pool_connections, 50)
+
+
+class TestFileCredentialCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, "credentials")
+        self.cache = FileCredentialCache(self.path)
+
+    def test_round_trip(self):
+        self.assertNotIn("key", self.cache)
+        with self.assertRaises(KeyError):
+            self.cache["key"]
+
+        value = credentials(3600)
+        self.cache["key"] = value
+        self.assertIn("key", self.cache)
+        cached = self.cache["key"]
+        self.assertEqual(cached["Credentials"]["AccessKeyId"], "foo")
+        self.assertEqual(cached["Credentials"]["Expiration"],
+                         value["Credentials"]["Expiration"].isoformat())
+
+        # Another process sees the same credentials.
+        self.assertIn("key", FileCredentialCache(self.path))
+
+        del self.cache["key"]
+        self.assertNotIn("key", self.cache)
+        with self.assertRaises(KeyError):
+            del self.cache["key"]
+
+    def test_permissions(self):
+        self.cache["key"] = credentials(3600)
+        mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        self.assertEqual(mode, 0o700)
+        mode = stat.S_IMODE(os.stat(
+            os.path.join(self.path, "key.json")).st_mode)
+        self.assertEqual(mode, 0o600)
+
+    def test_directory_exists(self):
+        # e.g. created by another stacker process that started at the same
+        # time.
+        os.makedirs(self.path, mode=0o700)
+        self.cache["key"] = credentials(3600)
+        self.assertIn("key", self.cache)
+
+    def test_expired(self):
+        self.cache["expired"] = credentials(-60)
+        self.cache["expiring"] = credentials(60)
+        self.assertNotIn("expired", self.cache)
+        self.assertNotIn("expiring", self.cache)
+
+    def test_corrupt(self):
+        self.cache["key"] = credentials(3600)
+        with open(os.path.join(self.path, "key.json"), "w") as f:
+            f.write("{")
+        self.assertNotIn("key", self.cache)
+
+    @patch.object(session_cache, "sessions", {})
+    @patch.object(session_cache, "credential_cache", {})
+    def test_use_file_credential_cache(self):
+        use_file_credential_cache(self.tmpdir)
+        self.assertEqual(session_cache.credential_cache.path, self.path)
+
+        session = get_session("us-east-1")
+        provider = session._session.get_component(
+            "credential_provider").get_provider("assume-role")
+        self.assertIs(provider.cache, session_cache.credential_cache)
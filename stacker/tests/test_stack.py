@@ -46,6 +46,19 @@ class TestStack(unittest.TestCase):
             stack.requires,
         )
 
+    def test_stack_requires_parsed_once(self):
+        definition = generate_definition(
+            base_name="vpc",
+            stack_id=1,
+            variables={"Var1": "${output fakeStack::FakeOutput}"},
+        )
+        stack = Stack(definition=definition, context=self.context)
+        self.assertEqual(stack.requires, {"fakeStack"})
+
+        stack.requires.add("otherStack")
+        stack.variables = []
+        self.assertEqual(stack.requires, {"fakeStack"})
+
     def test_stack_requires_circular_ref(self):
         definition = generate_definition(
             base_name="vpc",
@@ -6,6 +6,8 @@ import os
 import queue
 
 import mock
+import yaml
+from yaml.constructor import ConstructorError
 
 import boto3
 
@@ -118,6 +120,37 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(list(config['pre_build'].keys())[0], 'hook2')
         self.assertEqual(config['pre_build']['hook2']['path'], 'foo.bar')
 
+    @unittest.skipUnless(hasattr(yaml, "CSafeLoader"),
+                         "PyYAML was built without libyaml")
+    def test_yaml_to_ordered_dict_loaders(self):
+        raw_config = """
+        defaults: &defaults
+          region: us-east-1
+        stacks:
+          - name: vpc
+            <<: *defaults
+            variables:
+              Cidr: 10.0.0.0/16
+              Cidr: 10.1.0.0/16
+        """
+        configs = [yaml_to_ordered_dict(raw_config, loader)
+                   for loader in (yaml.SafeLoader, yaml.CSafeLoader)]
+        self.assertEqual(configs[0], configs[1])
+        self.assertEqual(configs[1]["stacks"][0]["region"], "us-east-1")
+        self.assertEqual(configs[1]["stacks"][0]["variables"]["Cidr"],
+                         "10.1.0.0/16")
+
+        raw_config = """
+        stacks:
+          vpc:
+            class_path: blueprints.VPC
+          vpc:
+            class_path: blueprints.VPC
+        """
+        for loader in (yaml.SafeLoader, yaml.CSafeLoader):
+            with self.assertRaises(ConstructorError):
+                yaml_to_ordered_dict(raw_config, loader)
+
     def test_get_client_region(self):
         regions = ["us-east-1", "us-west-1", "eu-west-1", "sa-east-1"]
         for region in regions:
@@ -179,6 +212,9 @@ Outputs:
             parse_cloudformation_template(template),
             parsed_template
         )
+        # The intrinsic function tags are only understood in templates.
+        with self.assertRaises(yaml.constructor.ConstructorError):
+            yaml.safe_load("Value: !Ref AWS::Region")
 
     def test_extractors(self):
         self.assertEqual(Extractor('test.zip').archive, 'test.zip')
@@ -5,12 +5,17 @@ from mock import MagicMock
 
 from troposphere import s3
 from stacker.blueprints.variables.types import TroposphereType
-from stacker.variables import Variable
+from stacker.variables import (
+    Variable,
+    VariableValue,
+    resolve_lookups_in_batches,
+)
 from stacker.lookups import register_lookup_handler
+from stacker.lookups.registry import unregister_lookup_handler
 from stacker.stack import Stack
 
 
-from .factories import generate_definition
+from .factories import BatchLookup, generate_definition
 
 
 class TestVariables(unittest.TestCase):
@@ -159,6 +164,49 @@ class TestVariables(unittest.TestCase):
         self.assertTrue(var.resolved)
         self.assertEqual(var.value, "looked up: looked up: resolved")
 
+    def test_variable_parse_unclosed_lookup(self):
+        # Everything up to the last lookup that isn't closed is left as it is.
+        value = VariableValue.parse(
+            "${output a::b} ${output c::d ${output e::f}")
+        self.assertEqual(
+            repr(value),
+            "Concat[Literal<'${output a::b} ${output c::d '>, "
+            "Lookup<Literal<'output'> Literal<'e::f'>>]")
+
+    def test_variable_parse_shared_values(self):
+        raw = "${output fakeStack::FakeOutput}"
+        var1 = Variable("Param1", raw)
+        var2 = Variable("Param2", raw)
+        self.assertIsNot(var1._value, var2._value)
+
+        var1._value._resolve("resolved")
+        self.assertTrue(var1.resolved)
+        self.assertFalse(var2.resolved)
+        self.assertFalse(Variable("Param3", raw).resolved)
+
+    def test_resolve_lookups_in_batches(self):
+        register_lookup_handler("batch", BatchLookup)
+        self.addCleanup(unregister_lookup_handler, "batch")
+        BatchLookup.batches = []
+
+        variables = [
+            Variable("Param1", "${batch a}-${batch ${batch b}}"),
+            Variable("Param2", ["${batch a}", "${batch missing}"]),
+            Variable("Param3", {"key": "${output fakeStack::FakeOutput}"}),
+        ]
+        resolved = resolve_lookups_in_batches(
+            variables, self.context, self.provider)
+        self.assertEqual(resolved, 4)
+        self.assertEqual(BatchLookup.batches,
+                         [["a", "b", "missing"], ["batch:b"]])
+        self.assertEqual(variables[0].value, "batch:a-batch:batch:b")
+        self.assertFalse(variables[1].resolved)
+        self.assertFalse(variables[2].resolved)
+
+        # Lookups that failed in a batch are looked up one at a time.
+        variables[1].resolve(self.context, self.provider)
+        self.assertEqual(variables[1].value, ["batch:a", "one:missing"])
+
     def test_troposphere_type_no_from_dict(self):
         with self.assertRaises(ValueError):
             TroposphereType(object)
@@ -13,14 +13,13 @@ import zipfile
 
 from collections import OrderedDict
 
-import botocore.client
 import botocore.exceptions
 import dateutil
 import yaml
 from yaml.constructor import ConstructorError
 from yaml.nodes import MappingNode
 
-from .awscli_yamlhelper import yaml_parse
+from .awscli_yamlhelper import SafeLoader, yaml_parse
 from stacker.session_cache import get_session
 
 logger = logging.getLogger(__name__)
@@ -229,17 +228,31 @@ def merge_map(a, b):
     return a
 
 
-def yaml_to_ordered_dict(stream, loader=yaml.SafeLoader):
+def yaml_to_ordered_dict(stream, loader=SafeLoader):
     """Provides yaml.load alternative with preserved dictionary order.
 
     Args:
         stream (string): YAML string to load.
         loader (:class:`yaml.loader`): PyYAML loader class. Defaults to safe
-            load.
+            load (with libyaml, when PyYAML was built with it).
 
     Returns:
         OrderedDict: Parsed YAML.
     """
+    return yaml.load(stream, _ordered_unique_loader(loader))
+
+
+# OrderedUniqueLoader classes, by the loader class they're based on.
+_ordered_unique_loaders = {}
+
+
+def _ordered_unique_loader(loader):
+    """Returns an OrderedUniqueLoader based on the given PyYAML loader."""
+    try:
+        return _ordered_unique_loaders[loader]
+    except KeyError:
+        pass
+
     class OrderedUniqueLoader(loader):
         """
         Subclasses the given pyYAML `loader` class.
@@ -312,7 +325,8 @@ def yaml_to_ordered_dict(stream, loader=yaml.SafeLoader):
     OrderedUniqueLoader.add_constructor(
         u'tag:yaml.org,2002:map', OrderedUniqueLoader.construct_yaml_map,
     )
-    return yaml.load(stream, OrderedUniqueLoader)
+    _ordered_unique_loaders[loader] = OrderedUniqueLoader
+    return OrderedUniqueLoader
 
 
 def uppercase_first_letter(s):
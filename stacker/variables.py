@@ -1,5 +1,7 @@
 
+import logging
 import re
+from collections import OrderedDict
 
 from past.builtins import basestring
 from string import Template
@@ -7,8 +9,23 @@ from string import Template
 from .exceptions import InvalidLookupCombination, UnresolvedVariable, \
     UnknownLookupType, FailedVariableLookup, FailedLookup, \
     UnresolvedVariableValue, InvalidLookupConcatenation
+from .lookups.handlers import LookupHandler
 from .lookups.registry import LOOKUP_HANDLERS
 
+logger = logging.getLogger(__name__)
+
+
+# Splits strings into the tokens that make up lookups: their openers and
+# closers, whitespace, and the text in between.
+LOOKUP_TOKENS = re.compile(r'(\$\{|\}|\s+)')
+
+# The most strings that VariableValue.parse keeps the parsed form of.
+PARSE_CACHE_SIZE = 10000
+
+# Parsed strings, by their raw value. Many variables (and stacks) share the
+# same values, so each distinct string is only parsed once.
+_parse_cache = {}
+
 
 class LookupTemplate(Template):
 
@@ -31,6 +48,112 @@ def resolve_variables(variables, context, provider):
         variable.resolve(context, provider)
 
 
+def resolve_lookups_in_batches(variables, context, provider):
+    """Resolve the lookups in a list of variables whose handlers can look up
+    several values at once, with a single call to each handler.
+
+    Only lookups that are ready are resolved: those whose data has no
+    unresolved lookups in it, and that don't depend on other stacks. Since
+    resolving lookups can make the lookups they're nested in ready, this is
+    repeated until no more lookups can be resolved. Lookups that a handler
+    fails to resolve are left for :func:`resolve_variables` to resolve one at
+    a time, so that their errors are reported as usual.
+
+    Args:
+        variables (list of :class:`stacker.variables.Variable`): list of
+            variables
+        context (:class:`stacker.context.Context`): stacker context
+        provider (:class:`stacker.provider.base.BaseProvider`): subclass of the
+            base provider
+
+    Returns:
+        int: the number of lookups that were resolved.
+    """
+    resolved = 0
+    attempted = set()
+    while True:
+        batches = OrderedDict()
+        for variable in variables:
+            for lookup in _iter_lookups(variable._value):
+                if id(lookup) in attempted or not _batchable(lookup):
+                    continue
+                try:
+                    value = lookup.lookup_data.value()
+                except InvalidLookupConcatenation:
+                    continue
+                if not isinstance(value, basestring):
+                    continue
+                attempted.add(id(lookup))
+                batch = batches.setdefault(lookup.handler, OrderedDict())
+                batch.setdefault(value, []).append(lookup)
+
+        progress = 0
+        for handler, batch in batches.items():
+            values = list(batch)
+            try:
+                results = handler.handle_batch(
+                    values, context=context, provider=provider)
+            except Exception as e:
+                logger.debug("Batched %s lookups failed, they'll be looked "
+                             "up one at a time: %s", handler.__name__, e)
+                continue
+            for value, result in zip(values, results):
+                if isinstance(result, Exception):
+                    continue
+                for lookup in batch[value]:
+                    lookup._resolve(result)
+                    progress += 1
+
+        if not progress:
+            return resolved
+        resolved += progress
+
+
+def _iter_lookups(value):
+    """Yields the unresolved lookups in a value, innermost first."""
+    if isinstance(value, VariableValueLookup):
+        for lookup in _iter_lookups(value.lookup_data):
+            yield lookup
+        if not value.resolved():
+            yield value
+    elif isinstance(value, VariableValueDict):
+        for item in value.values():
+            for lookup in _iter_lookups(item):
+                yield lookup
+    elif isinstance(value, (VariableValueList, VariableValueConcatenation)):
+        for item in value:
+            for lookup in _iter_lookups(item):
+                yield lookup
+
+
+def has_batched_lookups(variables):
+    """Whether any of the variables have unresolved lookups whose handlers
+    can look up several values at once."""
+    for variable in variables:
+        for lookup in _iter_lookups(variable._value):
+            if _handles_batches(lookup.handler):
+                return True
+    return False
+
+
+def _handles_batches(handler):
+    """Whether a lookup handler overrides
+    :meth:`stacker.lookups.handlers.LookupHandler.handle_batch`."""
+    if not isinstance(handler, type):
+        return False
+    handle_batch = getattr(handler, "handle_batch", None)
+    return getattr(handle_batch, "__func__", None) not in (
+        None, LookupHandler.handle_batch.__func__)
+
+
+def _batchable(lookup):
+    """Whether a lookup is ready, and its handler can look up several values
+    at once."""
+    return (_handles_batches(lookup.handler) and
+            lookup.lookup_data.resolved() and
+            not lookup.dependencies())
+
+
 class Variable(object):
     """Represents a variable passed to a stack.
 
@@ -131,44 +254,98 @@ class VariableValue(object):
             return VariableValueLiteral(input_object)
         # else:  # str
 
-        tokens = VariableValueConcatenation([
-            VariableValueLiteral(t)
-            for t in re.split(r'(\$\{|\}|\s+)', input_object)
-        ])
+        try:
+            parsed = _parse_cache[input_object]
+        except KeyError:
+            parsed = _parse_string(input_object)
+            if len(_parse_cache) >= PARSE_CACHE_SIZE:
+                _parse_cache.clear()
+            _parse_cache[input_object] = parsed
+        # Lookups hold the state of their resolution, so every Variable gets
+        # its own copy of them.
+        return parsed.copy_unresolved()
+
+    def copy_unresolved(self):
+        """
+        Return a copy of the value, without any lookups in it resolved.
+        Values that can't be resolved are returned as they are.
 
-        opener = '${'
-        closer = '}'
+        Returns:
+            VariableValue
+        """
+        return self
 
-        while True:
-            last_open = None
-            next_close = None
-            for i, t in enumerate(tokens):
-                if not isinstance(t, VariableValueLiteral):
-                    continue
 
-                if t.value() == opener:
-                    last_open = i
-                    next_close = None
-                if last_open is not None and \
-                        t.value() == closer and \
-                        next_close is None:
-                    next_close = i
-
-            if next_close is not None:
-                lookup_data = VariableValueConcatenation(
-                    tokens[(last_open + len(opener) + 1):next_close]
-                )
-                lookup = VariableValueLookup(
-                    lookup_name=tokens[last_open + 1],
-                    lookup_data=lookup_data,
-                )
-                tokens[last_open:(next_close + 1)] = [lookup]
-            else:
-                break
+def _parse_string(value):
+    """Parses the lookups in a string.
+
+    The tokens of the string are matched up in a single pass, using a stack
+    of the lookups that are still open. As with the parser this replaced,
+    the string up to (and including) the last opener that's never closed is
+    left as it is.
+
+    Returns:
+        VariableValue: the simplified value of the string
+    """
+    if '${' not in value:
+        return VariableValueLiteral(value)
+
+    tokens = LOOKUP_TOKENS.split(value)
+
+    unclosed = []
+    for i, token in enumerate(tokens):
+        if token == '${':
+            unclosed.append(i)
+        elif token == '}' and unclosed:
+            unclosed.pop()
+    start = unclosed[-1] + 1 if unclosed else 0
+
+    items = [''.join(tokens[:start])]
+    stack = []
+    for token in tokens[start:]:
+        if token == '${':
+            stack.append(items)
+            items = []
+        elif token == '}' and stack:
+            # items[0] is the name of the lookup, and items[1] separates it
+            # from its data.
+            lookup = VariableValueLookup(
+                lookup_name=VariableValueLiteral(items[0]),
+                lookup_data=_concatenate(items[2:]),
+            )
+            items = stack.pop()
+            items.append(lookup)
+        else:
+            items.append(token)
+    return _concatenate(items)
+
 
-        tokens = tokens.simplified()
+def _concatenate(items):
+    """Joins a list of strings and lookups the way
+    :meth:`VariableValueConcatenation.simplified` would.
 
-        return tokens
+    Returns:
+        VariableValue
+    """
+    values = []
+    text = []
+    for item in items:
+        if isinstance(item, VariableValue):
+            if text:
+                values.append(VariableValueLiteral(''.join(text)))
+                text = []
+            values.append(item)
+        elif item:
+            text.append(item)
+    if text:
+        values.append(VariableValueLiteral(''.join(text)))
+
+    if len(values) == 0:
+        return VariableValueLiteral('')
+    elif len(values) == 1:
+        return values[0]
+    else:
+        return VariableValueConcatenation(values)
 
 
 class VariableValueLiteral(VariableValue):
@@ -231,6 +408,9 @@ class VariableValueList(VariableValue, list):
             for item in self
         ]
 
+    def copy_unresolved(self):
+        return VariableValueList([item.copy_unresolved() for item in self])
+
 
 class VariableValueDict(VariableValue, dict):
     @classmethod
@@ -277,6 +457,12 @@ class VariableValueDict(VariableValue, dict):
             for k, v in self.items()
         }
 
+    def copy_unresolved(self):
+        return VariableValueDict({
+            k: v.copy_unresolved()
+            for k, v in self.items()
+        })
+
 
 class VariableValueConcatenation(VariableValue, list):
     def value(self):
@@ -342,6 +528,12 @@ class VariableValueConcatenation(VariableValue, list):
         else:
             return VariableValueConcatenation(concat)
 
+    def copy_unresolved(self):
+        return VariableValueConcatenation([
+            item.copy_unresolved()
+            for item in self
+        ])
+
 
 class VariableValueLookup(VariableValue):
     def __init__(self, lookup_name, lookup_data, handler=None):
@@ -368,6 +560,9 @@ class VariableValueLookup(VariableValue):
         self.handler = handler
 
     def resolve(self, context, provider):
+        if self._resolved:
+            # e.g. by resolve_lookups_in_batches
+            return
         self.lookup_data.resolve(context, provider)
         try:
             if type(self.handler) == type:
@@ -433,3 +628,10 @@ class VariableValueLookup(VariableValue):
             lookup_name=self.lookup_name,
             lookup_data=self.lookup_data.simplified(),
         )
+
+    def copy_unresolved(self):
+        # The handler is looked up again, in case it's been re-registered.
+        return VariableValueLookup(
+            lookup_name=self.lookup_name,
+            lookup_data=self.lookup_data.copy_unresolved(),
+        )